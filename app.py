@@ -1,5 +1,7 @@
 import os
-from flask import Flask
+from flask import Flask, Response, jsonify
+
+from bot.health import PROMETHEUS_CONTENT_TYPE, health_status, metrics_text
 
 app = Flask(__name__)
 
@@ -9,8 +11,13 @@ def index():
 
 @app.route('/health')
 def health():
-    return "OK", 200
+    status, result = health_status()
+    return jsonify(result), status
+
+@app.route('/metrics')
+def metrics():
+    return Response(metrics_text(), mimetype=PROMETHEUS_CONTENT_TYPE)
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
-    app.run(host="0.0.0.0", port=port)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=port)
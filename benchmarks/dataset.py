@@ -0,0 +1,146 @@
+# Sintetik ma'lumotlar generatori: crm.db ga N klient va M buyurtma qo'shadi.
+#
+#   python -m benchmarks.dataset --clients 100000 --orders 1000000 --db /tmp/crm.db
+#
+# Ishlayotgan bot bazasiga (DB_PATH) faqat --force bilan yoziladi.
+#
+# Taqsimotlar haqiqiyga yaqin: mahsulotlar va klientlar notekis (bir nechtasi juda ommabop),
+# sanalar haftalik mavsumiylik va "portlash" kunlari bilan, manzillar uzun.
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from database.db import DB_PATH
+from database.models import INSERT_TRIGGERS, init_db, rebuild_derived
+
+FRUITS = ["Olma", "Anor", "Uzum", "Shaftoli", "Nok", "Gilos", "Qovun", "Tarvuz", "Behi", "O'rik",
+          "Olxo'ri", "Xurmo", "Anjir", "Limon", "Mandarin", "Apelsin", "Banan", "Kivi", "Yong'oq", "Bodom"]
+VARIETIES = ["", "qizil", "sariq", "oq", "qora", "mayda", "yirik", "quritilgan", "eksport", "mahalliy"]
+# Mahsulot katalogi: ~200 nom, ommaboplik bo'yicha tartiblangan
+PRODUCTS = [f"{fruit} {variety}".strip() for variety in VARIETIES for fruit in FRUITS]
+
+FIRST_NAMES = ["Adham", "Bobur", "Dilnoza", "Jasur", "Madina", "Nodir", "Sardor", "Shahnoza", "Umid", "Zarina",
+               "Aziz", "Feruza", "G'ayrat", "Hilola", "Ibrohim", "Kamola", "Laziz", "Malika", "Otabek", "Sevara"]
+LAST_NAMES = ["Zokirov", "Karimov", "Rahimova", "Tursunov", "Yusupova", "Aliyev", "Qodirov", "Saidova",
+              "Ergashev", "Nazarova", "Xolmatov", "Mirzayeva", "Sobirov", "Abdullayeva", "Hasanov"]
+CITIES = ["Toshkent", "Samarqand", "Buxoro", "Namangan", "Andijon", "Farg'ona", "Xiva", "Qarshi", "Navoiy", "Termiz"]
+STREETS = ["Amir Temur", "Navoiy", "Bobur", "Mustaqillik", "Bog'ishamol", "Chilonzor", "Yunusobod", "Olmazor"]
+LANDMARKS = ["bozor yonida", "maktab ro'parasida", "masjid orqasida", "bekat yaqinida", "poliklinika yonida"]
+
+# Bir tranzaksiyada yoziladigan yozuvlar
+BATCH_SIZE = 50000
+
+
+def zipf_weights(n, s=1.1):
+    return list(itertools.accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+def generate_clients(rng, count, first_phone):
+    for n in range(count):
+        address = (f"{rng.choice(CITIES)} sh., {rng.choice(STREETS)} ko'chasi, {rng.randint(1, 200)}-uy, "
+                   f"{rng.randint(1, 120)}-xonadon, mo'ljal: {rng.choice(LANDMARKS)}")
+        yield (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"+99890{first_phone + n:07d}", address)
+
+
+def day_weights(rng, days):
+    """Kunlik buyurtmalar og'irligi: dam olish kunlari kamroq, ~3% kunlar 'portlash' (x3..x8)."""
+    weights = []
+    for day in range(days):
+        weight = 0.6 if day % 7 in (5, 6) else 1.0
+        if rng.random() < 0.03:
+            weight *= rng.uniform(3, 8)
+        weights.append(weight)
+    return list(itertools.accumulate(weights))
+
+
+def generate_orders(rng, count, first_client, clients, days, end):
+    product_weights = zipf_weights(len(PRODUCTS))
+    days_cum = day_weights(rng, days)
+    start = end - timedelta(days=days)
+    for _ in range(count):
+        # Klientlar ham notekis: kichik id'lilar ko'proq buyurtma beradi
+        client_id = first_client + int(clients * rng.random() ** 3)
+        day = rng.choices(range(days), cum_weights=days_cum)[0]
+        # Ish vaqti atrofida (14:00 ± 3 soat)
+        minutes = min(max(int(rng.gauss(14 * 60, 180)), 0), 24 * 60 - 1)
+        moment = start + timedelta(days=day, minutes=minutes)
+        yield (client_id, rng.choices(PRODUCTS, cum_weights=product_weights)[0],
+               int(rng.lognormvariate(1.5, 0.8)) + 1, moment.strftime("%Y-%m-%d %H:%M"), int(moment.timestamp()))
+
+
+def _insert(conn, sql, rows):
+    while True:
+        batch = list(itertools.islice(rows, BATCH_SIZE))
+        if not batch:
+            return
+        conn.execute("BEGIN")
+        conn.executemany(sql, batch)
+        conn.execute("COMMIT")
+
+
+def is_temporary(path):
+    """Baza vaqtinchalik papkada (benchmark'lar yaratgan) joylashganmi."""
+    tmp = os.path.realpath(tempfile.gettempdir())
+    return os.path.commonpath([os.path.realpath(path), tmp]) == tmp
+
+
+def populate(clients, orders, seed=1, days=365, path=DB_PATH):
+    """
+    Bazaga clients ta klient va orders ta buyurtma qo'shadi (seed bo'yicha takrorlanuvchi).
+    Yuklash paytida qator-qator triggerlar o'chiriladi, qidiruv indeksi va statistika
+    oxirida bir marta qayta quriladi — natija triggerlar bilan yozilgan baza bilan bir xil.
+    """
+    init_db(path)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    # synchronous = OFF faqat vaqtinchalik bazada: uzilish bo'lsa doimiy baza buzilmasligi kerak
+    conn.execute(f"PRAGMA synchronous = {'OFF' if is_temporary(path) else 'NORMAL'}")
+    for trigger in INSERT_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    try:
+        first_client = conn.execute("SELECT COALESCE(MAX(id), 0) FROM clients").fetchone()[0] + 1
+        _insert(conn, "INSERT INTO clients(name, phone, address) VALUES(?,?,?)",
+                generate_clients(rng, clients, first_client))
+        if clients:
+            _insert(conn, "INSERT INTO orders(client_id, product, amount, date, created_at) VALUES(?,?,?,?,?)",
+                    generate_orders(rng, orders, first_client, clients, days, datetime.now()))
+    finally:
+        conn.execute("BEGIN")
+        rebuild_derived(conn.cursor())
+        # Ishlayotgan bot keshlari (eksport, klient raqamlari) eskirganini bilishi uchun
+        for key in ("data_version", "clients_version"):
+            conn.execute("""
+                INSERT INTO settings (key, value) VALUES (?, 1)
+                ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+            """, (key,))
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Sintetik klient/buyurtma generatori")
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=365, help="buyurtmalar shuncha kunga tarqaladi")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="to'ldiriladigan baza (masalan /tmp/crm.db)")
+    parser.add_argument("--force", action="store_true", help=f"--db berilmasa ishlayotgan bazaga ({DB_PATH}) yozish")
+    args = parser.parse_args()
+    if args.db is None:
+        if not args.force:
+            parser.error(f"--db ko'rsating yoki ishlayotgan bazaga ({DB_PATH}) yozish uchun --force qo'shing")
+        args.db = DB_PATH
+
+    started = time.perf_counter()
+    populate(args.clients, args.orders, seed=args.seed, days=args.days, path=args.db)
+    print(f"✅ {args.clients} klient, {args.orders} buyurtma qo'shildi ({time.perf_counter() - started:.1f} s): {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# database/db.py funksiyalari uchun micro-benchmark: har bir o'lchamda alohida vaqtinchalik baza.
+#
+#   python -m benchmarks.db_bench --sizes 1000,100000,1000000 [--export] [--json natija.json]
+#
+# O'lcham = buyurtmalar soni, klientlar = o'lcham / 10. Har bir o'lcham alohida jarayonda
+# ishlaydi (database.db ulanishi DB_PATH ga import paytida bog'lanadi).
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Har bir funksiya kamida shuncha vaqt (yoki MAX_RUNS marta) takrorlanadi
+MIN_TIME = 0.5
+MAX_RUNS = 1000
+
+
+def measure(func):
+    """(birinchi chaqiruv, mediana, minimum) sekundda va takrorlar soni."""
+    times = []
+    total = 0.0
+    while total < MIN_TIME and len(times) < MAX_RUNS:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+    return {"first_ms": times[0] * 1000, "median_ms": statistics.median(times) * 1000,
+            "min_ms": min(times) * 1000, "runs": len(times)}
+
+
+def cases(rows, export):
+    """Nom -> argumentsiz funksiya. Baza allaqachon to'ldirilgan."""
+    from benchmarks.dataset import PRODUCTS
+    from database import db
+
+    rng = random.Random(1)
+    clients = max(1, rows // 10)
+
+    def add_order():
+        db.add_order(rng.randint(1, clients), rng.choice(PRODUCTS), 3)
+
+    def add_bulk():
+        db.add_records_bulk(orders=[(rng.randint(1, clients), rng.choice(PRODUCTS), 3) for _ in range(100)])
+
+    def delete_order():
+        # Oxirgi buyurtmalar o'chiriladi (add_order/add_bulk qo'shganlari)
+        order_id = db.get_orders_page(limit=1, before_id=10 ** 12)[0][0]
+        db.delete_order(order_id)
+
+    def set_session():
+        db.set_session("bench", rng.randint(1, 1000), '{"step": 1}', int(time.time()) + 60)
+
+    def iter_orders():
+        for _ in db.iter_orders():
+            pass
+
+    def export_xlsx():
+        from bot.handlers.stats import write_orders_xlsx
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            write_orders_xlsx(path)
+        finally:
+            os.remove(path)
+
+    result = {
+        "get_setting": lambda: db.get_setting("password_hash"),
+        "get_data_version": db.get_data_version,
+        "is_user_banned": lambda: db.is_user_banned(rng.randint(1, 1000)),
+        "get_clients": db.get_clients,
+        "get_clients_page[first]": lambda: db.get_clients_page(limit=10),
+        "get_clients_page[last]": lambda: db.get_clients_page(limit=10, before_id=10 ** 12),
+        "get_client_ordinal": lambda: db.get_client_ordinal(rng.randint(1, clients)),
+        "get_client_id_by_ordinal": lambda: db.get_client_id_by_ordinal(rng.randint(1, clients)),
+        "resolve_client_ordinals[100]": lambda: db.resolve_client_ordinals(
+            [rng.randint(1, clients) for _ in range(100)]),
+        "get_orders": db.get_orders,
+        "iter_orders": iter_orders,
+        "get_orders_page[first]": lambda: db.get_orders_page(limit=10),
+        "get_orders_page[last]": lambda: db.get_orders_page(limit=10, before_id=10 ** 12),
+        "get_sales_stats": db.get_sales_stats,
+        "search_clients": lambda: db.search_clients(rng.choice(["Adham", "Karimov", "Toshkent", "+99890"])),
+        "search_orders": lambda: db.search_orders(rng.choice(PRODUCTS).split()[0]),
+        "get_session": lambda: db.get_session("bench", rng.randint(1, 1000)),
+    }
+    if export:
+        result["write_orders_xlsx"] = export_xlsx
+    # Yozuvchi funksiyalar oxirida: o'qish natijalari asl o'lchamdagi bazada olinadi
+    result.update({
+        "set_session": set_session,
+        "add_order": add_order,
+        "add_records_bulk[100]": add_bulk,
+        "delete_order": delete_order,
+    })
+    return result
+
+
+def run_size(rows, export):
+    """Joriy jarayonda (DB_PATH allaqachon o'rnatilgan): bazani to'ldirib, hamma funksiyani o'lchaydi."""
+    from benchmarks.dataset import populate
+
+    started = time.perf_counter()
+    populate(max(1, rows // 10), rows)
+    result = {"rows": rows, "populate_s": time.perf_counter() - started, "functions": {}}
+    for name, func in cases(rows, export).items():
+        result["functions"][name] = measure(func)
+    return result
+
+
+def print_table(results):
+    names = list(results[0]["functions"])
+    header = f"{'funksiya (mediana, ms)':<30}" + "".join(f"{r['rows']:>14,}" for r in results)
+    print(header)
+    print("-" * len(header))
+    for name in names:
+        print(f"{name:<30}" + "".join(f"{r['functions'][name]['median_ms']:>14.3f}" for r in results))
+    label = "(baza to'ldirish, s)"
+    print(f"{label:<30}" + "".join(f"{r['populate_s']:>14.1f}" for r in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="database.db micro-benchmark")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="buyurtmalar soni, vergul bilan")
+    parser.add_argument("--export", action="store_true", help="Excel eksportni ham o'lchash (katta bazada sekin)")
+    parser.add_argument("--json", help="natijani JSON faylga yozish")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        with open(args.out, "w") as f:
+            json.dump(run_size(args.child, args.export), f)
+        return
+
+    results = []
+    for rows in (int(size) for size in args.sizes.split(",")):
+        workdir = tempfile.mkdtemp(prefix="orderx_dbbench_")
+        out = os.path.join(workdir, "result.json")
+        command = [sys.executable, "-m", "benchmarks.db_bench", "--child", str(rows), "--out", out]
+        if args.export:
+            command.append("--export")
+        print(f"⏳ {rows:,} buyurtma...", flush=True)
+        subprocess.run(command, check=True, env=dict(os.environ, DB_PATH=os.path.join(workdir, "crm.db")))
+        with open(out) as f:
+            results.append(json.load(f))
+
+    print()
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
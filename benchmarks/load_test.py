@@ -0,0 +1,236 @@
+# Yuklama testi: bot/main.py dagi dispatcher'ga sintetik update'lar yuboriladi,
+# Telegram API o'rniga lokal stub ishlatiladi, baza — vaqtinchalik fayl.
+#
+#   python -m benchmarks.load_test --users 100 --iterations 20 --clients 10000 --orders 100000
+#
+# Natija: har bir ssenariy bo'yicha update'lar soni, xatolar, sekundiga update va kechikish persentillari.
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+
+PASSWORD = "bench1234"
+ADMIN_PHONE = "+998900000000"
+
+# Ssenariy -> og'irligi (foydalanuvchi har iteratsiyada shu nisbatda tanlaydi)
+DEFAULT_MIX = {"order": 40, "list": 20, "search": 15, "delete": 10, "client": 10, "export": 5}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="OrderX bot yuklama testi")
+    parser.add_argument("--users", type=int, default=50, help="bir vaqtda ishlaydigan foydalanuvchilar")
+    parser.add_argument("--iterations", type=int, default=20, help="har bir foydalanuvchi bajaradigan ssenariylar")
+    parser.add_argument("--clients", type=int, default=1000, help="bazadagi klientlar")
+    parser.add_argument("--orders", type=int, default=10000, help="bazadagi buyurtmalar")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="ssenariy=og'irlik, vergul bilan (masalan order=80,list=20)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="stub API javob kechikishi (sekund)")
+    parser.add_argument("--throttle", action="store_true", help="ThrottlingMiddleware ni o'chirmaslik")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="natijani JSON faylga yozish (regressiyalarni solishtirish uchun)")
+    return parser.parse_args(argv)
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+class Simulation:
+    def __init__(self, dp, api, clients, seed):
+        self.dp = dp
+        self.api = api
+        self.clients = clients
+        self.rng = random.Random(seed)
+        self.latencies = {}
+        self.errors = {}
+        self._update_ids = iter(range(1, 10 ** 12))
+        self._new_clients = iter(range(10 ** 6, 10 ** 7))
+
+    def message(self, user, text):
+        from aiogram import types
+        update_id = next(self._update_ids)
+        entities = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}] if text.startswith("/") else []
+        return types.Update(update_id=update_id, message={
+            "message_id": update_id, "date": int(time.time()), "text": text, "entities": entities,
+            "chat": {"id": user, "type": "private"},
+            "from": {"id": user, "is_bot": False, "first_name": f"Bench{user}"},
+        })
+
+    def callback(self, user, data):
+        from aiogram import types
+        update_id = next(self._update_ids)
+        return types.Update(update_id=update_id, callback_query={
+            "id": str(update_id), "chat_instance": "bench", "data": data,
+            "from": {"id": user, "is_bot": False, "first_name": f"Bench{user}"},
+            "message": {"message_id": update_id, "date": int(time.time()), "text": "...",
+                        "chat": {"id": user, "type": "private"}},
+        })
+
+    async def send(self, scenario, update):
+        start = time.perf_counter()
+        try:
+            await self.dp.updates_handler.notify(update)
+        except Exception:
+            self.errors[scenario] = self.errors.get(scenario, 0) + 1
+        self.latencies.setdefault(scenario, []).append(time.perf_counter() - start)
+
+
+# -------------------- Ssenariylar --------------------
+async def login(sim, user):
+    from bot.callbacks import LOGIN
+    await sim.send("login", sim.message(user, "/start"))
+    await sim.send("login", sim.callback(user, LOGIN.pack()))
+    await sim.send("login", sim.message(user, PASSWORD))
+    await sim.send("login", sim.message(user, f"+99891{user:07d}"))
+    await sim.send("login", sim.message(user, f"Bench User {user}"))
+
+
+async def add_order(sim, user):
+    from benchmarks.dataset import PRODUCTS
+    text = f"{sim.rng.randint(1, sim.clients)}, {sim.rng.choice(PRODUCTS)}, {sim.rng.randint(1, 20)}"
+    await sim.send("order", sim.message(user, text))
+
+
+async def add_client(sim, user):
+    await sim.send("client", sim.message(user, f"Bench {user}, +99893{next(sim._new_clients)}, Toshkent"))
+
+
+async def list_clients(sim, user):
+    from bot.callbacks import PAGE
+    await sim.send("list", sim.message(user, "📋 Klientlar ro'yxati"))
+    for _ in range(3):
+        # Keyingi sahifa tugmasi
+        pages = [data for data in sim.api.callbacks(user)
+                 if data.startswith(PAGE.prefix) and PAGE.unpack(data[len(PAGE.prefix):])[1] == "n"]
+        if not pages:
+            break
+        await sim.send("list", sim.callback(user, pages[0]))
+
+
+async def search(sim, user):
+    from benchmarks.dataset import PRODUCTS
+    await sim.send("search", sim.message(user, f"/search {sim.rng.choice(PRODUCTS)}"))
+
+
+async def delete_order(sim, user):
+    from bot.callbacks import DELETE_CHOOSE_ORDER, DELETE_ORDER
+    await sim.send("delete", sim.message(user, "🗑 O'chirish"))
+    await sim.send("delete", sim.callback(user, DELETE_CHOOSE_ORDER.pack()))
+    targets = [data for data in sim.api.callbacks(user) if data.startswith(DELETE_ORDER.prefix)]
+    if targets:
+        await sim.send("delete", sim.callback(user, sim.rng.choice(targets)))
+
+
+async def export(sim, user):
+    await sim.send("export", sim.message(user, "📊 Excel export"))
+
+
+SCENARIOS = {
+    "order": add_order,
+    "client": add_client,
+    "list": list_clients,
+    "search": search,
+    "delete": delete_order,
+    "export": export,
+}
+
+
+async def simulate_user(sim, user, iterations, mix):
+    await login(sim, user)
+    names, weights = zip(*mix.items())
+    for _ in range(iterations):
+        await SCENARIOS[sim.rng.choices(names, weights)[0]](sim, user)
+
+
+def report(sim, elapsed):
+    rows = {}
+    total = 0
+    for scenario, values in sim.latencies.items():
+        values.sort()
+        total += len(values)
+        rows[scenario] = {
+            "updates": len(values),
+            "errors": sim.errors.get(scenario, 0),
+            "per_second": len(values) / elapsed,
+            "p50_ms": percentile(values, 0.5) * 1000,
+            "p90_ms": percentile(values, 0.9) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+    return {"elapsed": elapsed, "updates": total, "per_second": total / elapsed, "scenarios": rows}
+
+
+def print_report(result):
+    print(f"\n{'ssenariy':<10}{'update':>9}{'xato':>6}{'upd/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for scenario, row in sorted(result["scenarios"].items()):
+        print(f"{scenario:<10}{row['updates']:>9}{row['errors']:>6}{row['per_second']:>9.1f}"
+              f"{row['p50_ms']:>9.2f}{row['p90_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}")
+    print(f"\nJami: {result['updates']} update, {result['elapsed']:.2f} s, {result['per_second']:.1f} update/s")
+
+
+async def run(args, mix):
+    # bot.main va database modullari DB_PATH o'rnatilgandan keyin import qilinadi
+    from aiogram import Bot, Dispatcher
+    from aiogram.bot.api import TelegramAPIServer
+    from benchmarks.dataset import populate
+    from benchmarks.stub_api import StubBotAPI
+    from database.db import hash_password, set_setting
+    from database.models import init_db
+    import bot.main as bot_main
+
+    logging.disable(logging.INFO)
+    init_db()
+    started = time.perf_counter()
+    populate(args.clients, args.orders, seed=args.seed)
+    set_setting("password_hash", hash_password(PASSWORD))
+    set_setting("admin_phone", ADMIN_PHONE)
+    print(f"Baza tayyor: {args.clients} klient, {args.orders} buyurtma ({time.perf_counter() - started:.1f} s)")
+
+    api = StubBotAPI(latency=args.api_latency)
+    bot_main.bot.server = TelegramAPIServer.from_base(await api.start())
+    Bot.set_current(bot_main.bot)
+    Dispatcher.set_current(bot_main.dp)
+    if not args.throttle:
+        bot_main.dp.middleware.applications[:] = [
+            m for m in bot_main.dp.middleware.applications if type(m).__name__ != "ThrottlingMiddleware"
+        ]
+
+    sim = Simulation(bot_main.dp, api, args.clients, args.seed)
+    users = range(100000, 100000 + args.users)
+    started = time.perf_counter()
+    await asyncio.gather(*(simulate_user(sim, user, args.iterations, mix) for user in users))
+    elapsed = time.perf_counter() - started
+
+    await bot_main.outbound.close()
+    await (await bot_main.bot.get_session()).close()
+    await api.stop()
+    return report(sim, elapsed)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mix = {}
+    for item in args.mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Noma'lum ssenariy: {name} (mavjud: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+
+    workdir = tempfile.mkdtemp(prefix="orderx_bench_")
+    os.environ["DB_PATH"] = os.path.join(workdir, "crm.db")
+    os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+    os.environ.setdefault("ADMIN_ID", "1")
+
+    result = asyncio.run(run(args, mix))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import asyncio
+import itertools
+import json
+import time
+
+from aiohttp import web
+
+
+class StubBotAPI:
+    """
+    Telegram Bot API'ning lokal o'rinbosari: har bir metodga darhol muvaffaqiyatli javob beradi.
+    Har bir chatga yuborilgan oxirgi klaviatura saqlanadi — simulyatsiya qilingan
+    foydalanuvchilar keyingi callback'ni shundan tanlaydi.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency  # haqiqiy API kechikishini taqlid qilish (sekund)
+        self.calls = {}
+        self.markups = {}
+        self._message_ids = itertools.count(1)
+        self._runner = None
+        self.url = None
+
+    def _message(self, chat_id, form):
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": form.get("text", ""),
+        }
+        if "document" in form:
+            message["document"] = {"file_id": f"stub-file-{message['message_id']}", "file_unique_id": "stub"}
+        return message
+
+    async def handle(self, request):
+        method = request.match_info["method"].lower()
+        form = await request.post()
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        chat_id = int(form["chat_id"]) if form.get("chat_id") else 0
+        if "reply_markup" in form:
+            markup = json.loads(form["reply_markup"])
+            if "inline_keyboard" in markup:
+                self.markups[chat_id] = markup
+
+        if method == "getme":
+            result = {"id": 1, "is_bot": True, "first_name": "Stub", "username": "stub_bot"}
+        elif method in ("sendmessage", "sendphoto", "senddocument", "editmessagetext"):
+            result = self._message(chat_id, form)
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    def callbacks(self, chat_id):
+        """Chatga yuborilgan oxirgi inline klaviaturadagi callback_data'lar."""
+        markup = self.markups.get(chat_id) or {}
+        return [button["callback_data"] for row in markup.get("inline_keyboard", [])
+                for button in row if "callback_data" in button]
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
@@ -0,0 +1,153 @@
+import secrets
+import string
+
+from bot.sessions import create_store
+
+# Inline tugmalar callback_data formati (Telegram limiti — 64 bayt):
+#   <versiya><amal kodi>[.<maydon>.<maydon>...]
+#   versiya  - format o'zgarsa oshiriladi: eski xabarlardagi tugmalar "eskirgan" deb javob oladi
+#   amal     - 1-2 belgili kod (ACTIONS), /perf da amal nomi bilan ko'rinadi
+#   maydon   - int (base62, masalan 1000000 -> "4c92") yoki nuqtasiz qisqa satr
+# Sig'maydigan holat (qidiruv matni, tanlangan qatorlar) serverda saqlanadi: stash() -> token.
+VERSION = "1"
+SEPARATOR = "."
+MAX_LENGTH = 64
+
+ALPHABET = string.digits + string.ascii_letters
+_DIGITS = {char: value for value, char in enumerate(ALPHABET)}
+
+PAYLOAD_TTL = 24 * 60 * 60
+_payloads = create_store("callback_payload", ttl=PAYLOAD_TTL)
+
+
+def encode_int(number):
+    if number < 0:
+        raise ValueError(number)
+    digits = ""
+    while True:
+        number, rest = divmod(number, len(ALPHABET))
+        digits = ALPHABET[rest] + digits
+        if not number:
+            return digits
+
+
+def decode_int(digits):
+    if not digits:
+        raise ValueError(digits)
+    number = 0
+    for char in digits:
+        value = _DIGITS.get(char)
+        if value is None:
+            raise ValueError(digits)
+        number = number * len(ALPHABET) + value
+    return number
+
+
+def _encode_str(value):
+    if not value or SEPARATOR in value:
+        raise ValueError(value)
+    return value
+
+
+FIELD_TYPES = {
+    int: (encode_int, decode_int),
+    str: (_encode_str, str),
+}
+
+
+# -------------------- Server tomonidagi payload --------------------
+async def stash(value):
+    """Katta holatni PAYLOAD_TTL ga saqlaydi; tugmaga qisqa token yoziladi (str maydon)."""
+    key = secrets.randbits(48)
+    await _payloads.set(key, value)
+    return encode_int(key)
+
+
+async def load(token, default=None):
+    """stash() da saqlangan qiymat; token eskirgan yoki noto'g'ri bo'lsa default."""
+    try:
+        key = decode_int(token)
+    except ValueError:
+        return default
+    return await _payloads.get(key, default)
+
+
+async def update(token, value):
+    """stash() tokeni ostidagi qiymatni almashtiradi (masalan, tanlangan qatorlar o'zgarganda)."""
+    await _payloads.set(decode_int(token), value)
+
+
+# -------------------- Amallar --------------------
+ACTIONS = {}  # kod -> Action
+
+
+class Action:
+    def __init__(self, code, name, *fields):
+        self.code = code
+        self.name = name
+        self.fields = fields
+        # Maydonsiz amal — aniq satr, maydonli — prefiks (bot/routing.py)
+        self.prefix = VERSION + code + (SEPARATOR if fields else "")
+
+    def pack(self, *values):
+        if len(values) != len(self.fields):
+            raise TypeError(f"{self.name}: {len(self.fields)} ta maydon kerak")
+        data = self.prefix + SEPARATOR.join(FIELD_TYPES[kind][0](value) for kind, value in zip(self.fields, values))
+        if len(data.encode()) > MAX_LENGTH:
+            raise ValueError(f"{self.name}: callback_data {MAX_LENGTH} baytdan uzun")
+        return data
+
+    def unpack(self, payload):
+        """prefix dan keyingi qism -> maydonlar tuple; noto'g'ri bo'lsa ValueError."""
+        parts = payload.split(SEPARATOR)
+        if len(parts) != len(self.fields):
+            raise ValueError(payload)
+        return tuple(FIELD_TYPES[kind][1](part) for kind, part in zip(self.fields, parts))
+
+
+def action(code, name, *fields):
+    if code in ACTIONS:
+        raise ValueError(f"Kod band: {code} ({ACTIONS[code].name})")
+    if SEPARATOR in code:
+        raise ValueError(code)
+    ACTIONS[code] = Action(code, name, *fields)
+    return ACTIONS[code]
+
+
+def action_name(data):
+    """callback_data -> amal nomi (metrikalar uchun)."""
+    if not data or data[:len(VERSION)] != VERSION:
+        return "stale"
+    item = ACTIONS.get(data[len(VERSION):].split(SEPARATOR, 1)[0])
+    return item.name if item is not None else "unknown"
+
+
+LOGIN = action("l", "login")
+FORGOT_PASSWORD = action("f", "forgot_password")
+CONTINUE_RESET = action("rc", "continue_reset")
+CANCEL_RESET = action("rx", "cancel_reset")
+BACK_TO_MAIN = action("b", "back_to_main")
+CHANGE_PHONE = action("sp", "change_phone")
+CHANGE_PASSWORD = action("sw", "change_password")
+
+BAN_USER = action("ub", "ban_user", int)
+UNBAN_USER = action("uu", "unban_user", int)
+DELETE_USER = action("ud", "delete_user", int)
+
+DELETE_CHOOSE_CLIENT = action("dc", "delete_choose_client")
+DELETE_CHOOSE_ORDER = action("do", "delete_choose_order")
+DELETE_CLIENT = action("xc", "delete_client", int)
+DELETE_ORDER = action("xo", "delete_order", int)
+
+# view, n|p, cursor (id), start (tartib raqami) — bot/handlers/pagination.py
+PAGE = action("p", "page", str, str, int, int)
+# qidiruv matni tokeni (stash), sahifa — bot/handlers/search.py
+SEARCH_PAGE = action("s", "search_page", str, int)
+
+# Bir nechta qatorni tanlab o'chirish (bot/handlers/selection.py): tanlov serverda, tugmada token
+SELECT_START = action("ms", "select_start", str)  # c - klientlar, o - buyurtmalar
+SELECT_TOGGLE = action("mt", "select_toggle", str, int)
+SELECT_PAGE = action("mp", "select_page", str, str, int, int)
+SELECT_DELETE = action("md", "select_delete", str)
+# Sanadan oldingi buyurtmalarni o'chirishni tasdiqlash: unix vaqt
+DELETE_ORDERS_BEFORE = action("xb", "delete_orders_before", int)
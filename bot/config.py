@@ -9,3 +9,33 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 ADMIN_ID = int(os.getenv("ADMIN_ID", 0))
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME")
 
+# Umumiy holat (sessiyalar, throttling, eksport keshi) qayerda saqlanadi:
+# "sqlite" — qayta ishga tushganda saqlanadi va bir nechta worker orasida umumiy;
+# "memory" — faqat shu jarayon xotirasida (testlar, bitta worker)
+SHARED_BACKEND = os.getenv("SHARED_BACKEND", os.getenv("SESSION_BACKEND", "sqlite"))
+
+# Worker nomi (heartbeat va metrikalarda ko'rinadi)
+WORKER_ID = os.getenv("WORKER_ID", "bot")
+
+# Ishga tushirish rejimi: "polling" (standart) yoki "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+# Webhook: Telegram yuboradigan manzil = WEBHOOK_HOST + WEBHOOK_PATH (masalan https://bot.example.com/webhook)
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_URL = WEBHOOK_HOST + WEBHOOK_PATH
+# Telegram har so'rovda X-Telegram-Bot-Api-Secret-Token sarlavhasida yuboradi
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+# Telegram bir vaqtda ochadigan ulanishlar soni (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", 40))
+# Bitta jarayonda bir vaqtda qayta ishlanadigan update'lar
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", 64))
+# Webhook serveri (/health va /metrics ham shu portda)
+WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT = int(os.getenv("PORT", 8000))
+
+# Bir nechta worker (python -m bot.workers N): launcher quyidagilarni o'zi o'rnatadi
+WORKER_COUNT = int(os.getenv("WORKER_COUNT", 1))
+# Bir nechta jarayon bitta portni tinglaydi (SO_REUSEPORT)
+WEBAPP_REUSE_PORT = os.getenv("WEBAPP_REUSE_PORT") == "1"
+# setWebhook faqat bitta worker'da chaqiriladi
+WEBHOOK_SETUP = os.getenv("WEBHOOK_SETUP", "1") == "1"
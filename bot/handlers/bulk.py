@@ -0,0 +1,119 @@
+import re
+import sqlite3
+
+from database.aio import add_records_bulk, resolve_client_ordinals
+
+CLIENT_PHONE_ERROR = (
+    "❌ Telefon raqam noto‘g‘ri formatda.\n"
+    "Klient qo‘shish uchun: `Ism, Telefon` yoki `Ism, Telefon, Manzil`\n"
+    "Misol: `Adham, +998901234567`"
+)
+CLIENT_ADDRESS_PHONE_ERROR = (
+    "❌ Telefon raqam noto‘g‘ri formatda.\n"
+    "Klient qo‘shish uchun: `Ism, Telefon, Manzil`\n"
+    "Misol: `Adham, +998901234567, Samarqand`"
+)
+AMOUNT_ERROR = (
+    "❌ Xato: Miqdor raqam bo‘lishi kerak.\n"
+    "Masalan: `1, Anor, 5` yoki `1, Anor, 3kg`"
+)
+FORMAT_ERROR = (
+    "❌ Noto‘g‘ri format. Iltimos:\n"
+    "• Klient qo‘shish: `Ism, Telefon` yoki `Ism, Telefon, Manzil`\n"
+    "• Buyurtma qo‘shish: `Klient raqami, Mahsulot, Miqdor`\n"
+    "Misol: `Adham, +998901234567, Samarqand` yoki `1, Anor, 3kg`"
+)
+CLIENT_NOT_FOUND_ERROR = "❌ Bunday raqamli klient mavjud emas."
+
+# Bir xabarda qabul qilinadigan qatorlar soni
+MAX_BATCH_LINES = 500
+
+
+def normalize_phone(phone):
+    """'+998 90 123 45 67' -> '+998901234567'; noto'g'ri bo'lsa None."""
+    phone = phone.replace(" ", "")
+    if not (phone.startswith('+') and phone[1:].isdigit() or phone.isdigit()):
+        return None
+    if not phone.startswith('+'):
+        phone = '+' + phone
+    return phone
+
+
+def parse_line(line):
+    """
+    Bitta qatorni tahlil qiladi:
+      ("client", (ism, telefon, manzil)) yoki ("order", (klient_raqami, mahsulot, miqdor)).
+    Xato bo'lsa, foydalanuvchiga ko'rsatiladigan matn bilan ValueError.
+    """
+    parts = [p.strip() for p in line.split(",")]
+
+    if len(parts) == 2:
+        name, phone = parts
+        phone = normalize_phone(phone)
+        if phone is None:
+            raise ValueError(CLIENT_PHONE_ERROR)
+        return "client", (name, phone, "")
+
+    if len(parts) == 3:
+        first, second, third = parts
+        if first.isdigit():
+            amount_digits = re.sub(r'\D', '', third)
+            if not amount_digits:
+                raise ValueError(AMOUNT_ERROR)
+            return "order", (int(first), second, int(amount_digits))
+
+        phone = normalize_phone(second)
+        if phone is None:
+            raise ValueError(CLIENT_ADDRESS_PHONE_ERROR)
+        return "client", (first, phone, third)
+
+    raise ValueError(FORMAT_ERROR)
+
+
+async def save_batch(lines):
+    """
+    Ko'p qatorli xabar: har bir qator alohida tekshiriladi, to'g'rilari
+    bitta tranzaksiyada (executemany) saqlanadi. Hisobot matnini qaytaradi.
+    """
+    # Qator raqamlari xabardagi haqiqiy qatorlarga mos bo'lishi uchun bo'sh qatorlar shu yerda tashlanadi
+    lines = [(number, line) for number, line in enumerate(lines, start=1) if line.strip()]
+    if len(lines) > MAX_BATCH_LINES:
+        return f"❌ Bir xabarda ko'pi bilan {MAX_BATCH_LINES} ta qator yuborish mumkin."
+
+    clients, orders, errors = [], [], []
+    for number, line in lines:
+        try:
+            kind, data = parse_line(line)
+        except ValueError as e:
+            # Hisobotda xatoning faqat birinchi qatori
+            errors.append((number, str(e).splitlines()[0]))
+            continue
+        if kind == "order":
+            orders.append((number, data))
+        else:
+            clients.append(data)
+
+    # Klient raqamlari bitta murojaatda id ga aylantiriladi
+    client_ids = await resolve_client_ordinals([data[0] for _, data in orders])
+    resolved = []
+    for (number, (_, product, amount)), client_id in zip(orders, client_ids):
+        if client_id is None:
+            errors.append((number, CLIENT_NOT_FOUND_ERROR))
+        else:
+            resolved.append((client_id, product, amount))
+    orders = resolved
+    errors.sort()
+    errors = [f"{number}-qator: {error}" for number, error in errors]
+
+    if clients or orders:
+        try:
+            await add_records_bulk(clients, orders)
+        except sqlite3.Error as e:
+            return f"❌ Hech narsa saqlanmadi: {e}"
+
+    text = f"✅ Saqlandi: {len(clients)} ta klient, {len(orders)} ta buyurtma."
+    if errors:
+        text += f"\n\n⚠️ Xato qatorlar ({len(errors)}):\n" + "\n".join(errors[:30])
+        if len(errors) > 30:
+            text += f"\n... va yana {len(errors) - 30} ta"
+    return text
@@ -1,6 +1,8 @@
 from aiogram import types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from database.db import get_clients, delete_client
+from database.aio import get_clients_page, get_client_ordinal, delete_client
+from bot.callbacks import DELETE_CLIENT, SELECT_START, BACK_TO_MAIN
+from bot.handlers.pagination import load_page, add_nav_row, send_page
 
 async def add_client_cmd(message: types.Message):
     await message.answer(
@@ -8,40 +10,51 @@ async def add_client_cmd(message: types.Message):
         "Misol: `Adham, +998901234567, Samarqand sh.`"
     )
 
-async def list_clients_handler(message: types.Message):
-    clients = get_clients()
+async def load_clients_page(direction="n", cursor=0, start=1):
+    clients, start, has_prev, has_next = await load_page(get_clients_page, direction, cursor, start)
+    if clients:
+        # Ko'rsatiladigan raqam buyurtma qo'shishda ishlatiladigan raqam bilan bir xil bo'lsin
+        start = await get_client_ordinal(clients[0][0]) or start
+    return clients, start, has_prev, has_next
+
+async def list_clients_handler(message: types.Message, direction="n", cursor=0, start=1, edit=False):
+    clients, start, has_prev, has_next = await load_clients_page(direction, cursor, start)
     if clients:
         text = "📋 Klientlar ro'yxati:\n\n"
-        for idx, c in enumerate(clients, start=1):
+        for idx, c in enumerate(clients, start=start):
             text += f"{idx}. {c[1]}\n   📞 {c[2]}\n   📍 {c[3] or '—'}\n\n"
-        await message.answer(text)
+        keyboard = InlineKeyboardMarkup(row_width=2)
+        add_nav_row(keyboard, "cl", clients, start, has_prev, has_next)
+        await send_page(message, text, keyboard, edit)
     else:
         await message.answer("⚠️ Hozircha klient yo‘q.")
 
-async def show_clients_for_delete(message: types.Message):
-    clients = get_clients()
+def client_button_text(idx, client):
+    text = f"{idx}. {client[1]} ({client[2]})"
+    return text[:47] + "..." if len(text) > 50 else text
+
+async def show_clients_for_delete(message: types.Message, direction="n", cursor=0, start=1, edit=False):
+    clients, start, has_prev, has_next = await load_clients_page(direction, cursor, start)
     if not clients:
         await message.answer("⚠️ Hozircha klient yo‘q.")
         return
 
     keyboard = InlineKeyboardMarkup(row_width=1)
-    for idx, c in enumerate(clients, start=1):
-        button_text = f"{idx}. {c[1]} ({c[2]})"
-        if len(button_text) > 50:
-            button_text = button_text[:47] + "..."
+    for idx, c in enumerate(clients, start=start):
         keyboard.add(InlineKeyboardButton(
-            text=button_text,
-            callback_data=f"del_client:{c[0]}"
+            text=client_button_text(idx, c),
+            callback_data=DELETE_CLIENT.pack(c[0])
         ))
-    keyboard.add(InlineKeyboardButton("🔙 Ortga", callback_data="back_to_main"))
-    await message.answer("O'chirmoqchi bo'lgan klientni tanlang:", reply_markup=keyboard)
+    add_nav_row(keyboard, "dc", clients, start, has_prev, has_next)
+    keyboard.add(InlineKeyboardButton("☑️ Bir nechtasini tanlash", callback_data=SELECT_START.pack("c")))
+    keyboard.add(InlineKeyboardButton("🔙 Ortga", callback_data=BACK_TO_MAIN.pack()))
+    await send_page(message, "O'chirmoqchi bo'lgan klientni tanlang:", keyboard, edit)
 
-async def delete_client_callback(callback: types.CallbackQuery):
-    client_id = int(callback.data.split(":")[1])
-    success, error = delete_client(client_id)
+async def delete_client_callback(callback: types.CallbackQuery, client_id):
+    success, error = await delete_client(client_id)
     if success:
         await callback.answer("✅ Klient o'chirildi")
         # Xabarni yangilash
         await callback.message.edit_text("Klient o'chirildi.")
     else:
-        await callback.answer("❌ Xatolik: " + (error or "Noma'lum xato"), show_alert=True)
\ No newline at end of file
+        await callback.answer("❌ Xatolik: " + (error or "Noma'lum xato"), show_alert=True)
@@ -0,0 +1,232 @@
+import asyncio
+import csv
+import logging
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiogram import types
+from openpyxl import load_workbook
+
+from bot.handlers.bulk import normalize_phone
+from database.db import import_records
+
+logger = logging.getLogger(__name__)
+
+# Bir tranzaksiyada saqlanadigan qatorlar soni
+CHUNK_SIZE = 500
+# Progress xabari ko'pi bilan shuncha sekundda bir marta yangilanadi
+PROGRESS_INTERVAL = 3
+# Telegram Bot API yuklab olish chegarasi
+MAX_FILE_SIZE = 20 * 1024 * 1024
+
+# Sarlavha nomlari -> ustun
+HEADER_NAMES = {
+    "name": {"ism", "name", "klient", "mijoz", "fio"},
+    "phone": {"telefon", "phone", "tel"},
+    "address": {"manzil", "address"},
+    "product": {"mahsulot", "product"},
+    "amount": {"miqdor", "amount", "soni"},
+}
+# Sarlavha bo'lmasa: ism, telefon, manzil, mahsulot, miqdor
+DEFAULT_COLUMNS = ["name", "phone", "address", "product", "amount"]
+
+_import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import")
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def iter_rows(file_path, filename):
+    """Fayl qatorlarini birma-bir o'qiydi (butun fayl xotiraga yuklanmaydi)."""
+    if filename.lower().endswith(".csv"):
+        with open(file_path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            for row in csv.reader(f, dialect):
+                yield [_cell(v) for v in row]
+    else:
+        wb = load_workbook(file_path, read_only=True)
+        try:
+            for row in wb.active.iter_rows(values_only=True):
+                yield [_cell(v) for v in row]
+        finally:
+            wb.close()
+
+
+def _column_map(first_row):
+    """Birinchi qator sarlavha bo'lsa, ustunlar xaritasini qaytaradi; aks holda None."""
+    columns = {}
+    for index, title in enumerate(first_row):
+        for column, names in HEADER_NAMES.items():
+            if title.lower() in names:
+                columns[column] = index
+    return columns if "phone" in columns else None
+
+
+def parse_record(row, columns):
+    def get(column):
+        index = columns.get(column)
+        return row[index] if index is not None and index < len(row) else ""
+
+    phone = normalize_phone(get("phone"))
+    if phone is None:
+        raise ValueError("telefon noto‘g‘ri")
+    name = get("name") or phone
+    product = get("product") or None
+    amount = None
+    if product:
+        digits = re.sub(r"\D", "", get("amount"))
+        if not digits:
+            raise ValueError("miqdor raqam emas")
+        amount = int(digits)
+    return name, phone, get("address"), product, amount
+
+
+class ImportStopped(Exception):
+    """
+    Import yarmida to'xtadi. Oldingi bo'laklar allaqachon saqlangan (har biri o'z tranzaksiyasida):
+    stats["saved_rows"] ta qator, fayldagi stats["saved_line"]-qatorgacha. Qayta yuklashda shu qatorlarni
+    olib tashlash kerak — klientlar telefon bo'yicha takrorlanmaydi, buyurtmalar esa takrorlanadi.
+    """
+
+    def __init__(self, stats, error):
+        super().__init__(str(error))
+        self.stats = stats
+        self.error = error
+
+
+def run_import(file_path, filename, progress=None):
+    """
+    Faylni bo'laklab import qiladi (worker thread'da chaqiriladi).
+    progress(qatorlar, klientlar, buyurtmalar) har bir bo'lakdan keyin chaqiriladi.
+    Xato bo'lsa ImportStopped: qaysi qatorgacha saqlangani stats da.
+    """
+    stats = {"rows": 0, "clients": 0, "orders": 0, "errors": 0, "saved_rows": 0, "saved_line": 0}
+    columns = None
+    chunk = []
+    line = 0  # fayldagi qator raqami (sarlavha va bo'sh qatorlar bilan)
+
+    def flush():
+        clients, orders = import_records(chunk)
+        stats["clients"] += clients
+        stats["orders"] += orders
+        stats["saved_rows"] = stats["rows"]
+        stats["saved_line"] = line
+        chunk.clear()
+        if progress:
+            progress(stats)
+
+    try:
+        for line, row in enumerate(iter_rows(file_path, filename), start=1):
+            if columns is None:
+                columns = _column_map(row)
+                if columns is not None:
+                    continue  # sarlavha qatori
+                columns = {column: index for index, column in enumerate(DEFAULT_COLUMNS)}
+            if not any(row):
+                continue
+            stats["rows"] += 1
+            try:
+                chunk.append(parse_record(row, columns))
+            except ValueError:
+                stats["errors"] += 1
+                continue
+            if len(chunk) >= CHUNK_SIZE:
+                flush()
+
+        if chunk:
+            flush()
+    except Exception as e:
+        raise ImportStopped(stats, e) from e
+    stats["saved_rows"] = stats["rows"]
+    stats["saved_line"] = line
+    return stats
+
+
+def _progress_text(stats):
+    return (f"⏳ Import: {stats['rows']} qator o'qildi, "
+            f"{stats['clients']} ta yangi klient, {stats['orders']} ta buyurtma...")
+
+
+def _stopped_text(stopped):
+    stats = stopped.stats
+    if not stats["saved_rows"]:
+        return f"❌ Import xatosi: {stopped.error}\nHech narsa saqlanmadi, faylni qayta yuborish mumkin."
+    return (
+        f"❌ Import {stats['saved_line']}-qatordan keyin to'xtadi: {stopped.error}\n"
+        f"Saqlandi: {stats['saved_rows']} qator ({stats['clients']} ta yangi klient, {stats['orders']} ta buyurtma).\n"
+        f"⚠️ Qayta yuborishda fayl {stats['saved_line'] + 1}-qatordan boshlansin (sarlavha qolishi mumkin), "
+        "aks holda saqlangan buyurtmalar takrorlanadi."
+    )
+
+
+async def _wait_progress(future):
+    """Oxirgi progress tahririni kutadi; xatosi (masalan, flood limit) faqat log'ga yoziladi."""
+    if future is None:
+        return
+    try:
+        await asyncio.wrap_future(future)
+    except Exception as e:
+        logger.warning(f"Import progress xabari tahrirlanmadi: {e}")
+
+
+async def import_document(message: types.Message):
+    document = message.document
+    filename = document.file_name or ""
+    if not filename.lower().endswith((".csv", ".xlsx")):
+        await message.answer("❌ Faqat .csv yoki .xlsx fayl qabul qilinadi.")
+        return
+    if document.file_size and document.file_size > MAX_FILE_SIZE:
+        await message.answer("❌ Fayl juda katta (ko'pi bilan 20 MB).")
+        return
+
+    fd, file_path = tempfile.mkstemp(prefix="import_", suffix=os.path.splitext(filename)[1])
+    os.close(fd)
+    status = await message.answer("⏳ Fayl yuklanmoqda...")
+    loop = asyncio.get_running_loop()
+    last_update = [0.0]
+    last_edit = [None]  # oxirgi progress tahriri (concurrent.futures.Future)
+
+    def progress(stats):
+        # Worker thread'dan chaqiriladi: xabar event loop'da, kamdan-kam tahrirlanadi
+        now = time.monotonic()
+        if now - last_update[0] >= PROGRESS_INTERVAL:
+            last_update[0] = now
+            last_edit[0] = asyncio.run_coroutine_threadsafe(status.edit_text(_progress_text(stats)), loop)
+
+    try:
+        await document.download(destination_file=file_path)
+        stats = await loop.run_in_executor(_import_executor, run_import, file_path, filename, progress)
+    except ImportStopped as e:
+        await _wait_progress(last_edit[0])
+        await status.edit_text(_stopped_text(e))
+        return
+    except Exception as e:
+        await _wait_progress(last_edit[0])
+        await status.edit_text(f"❌ Import xatosi: {str(e)}")
+        return
+    finally:
+        os.remove(file_path)
+
+    # Kechikkan progress tahriri yakuniy natijani ustidan yozib yubormasligi uchun
+    await _wait_progress(last_edit[0])
+
+    await status.edit_text(
+        "✅ Import tugadi.\n"
+        f"Qatorlar: {stats['rows']}\n"
+        f"Yangi klientlar: {stats['clients']}\n"
+        f"Buyurtmalar: {stats['orders']}\n"
+        f"Xato qatorlar: {stats['errors']}"
+    )
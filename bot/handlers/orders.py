@@ -1,47 +1,82 @@
+from datetime import datetime
+
 from aiogram import types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from database.db import get_clients, get_orders, delete_order
+from database.aio import (
+    get_clients_page, get_orders_page, delete_order, count_orders_before, delete_orders_before
+)
+from bot.handlers.clients import list_clients_handler
+from bot.callbacks import DELETE_ORDER, DELETE_ORDERS_BEFORE, SELECT_START, BACK_TO_MAIN
+from bot.handlers.pagination import load_page, add_nav_row, send_page
 
 async def add_order_cmd(message: types.Message):
-    clients = get_clients()
-    if not clients:
+    if not await get_clients_page(limit=1):
         await message.answer("⚠️ Avval klient qo‘shing: /add_client")
         return
 
-    text = "Mavjud klientlar:\n"
-    for idx, c in enumerate(clients, start=1):
-        text += f"{idx}. {c[1]} (📞 {c[2]})\n"
-    text += (
-        "\nBuyurtma qo‘shish uchun: `klient_raqami, mahsulot, miqdor`\n"
+    # Klientlar ro'yxati sahifalab ko'rsatiladi (hammasi birdaniga o'qilmaydi)
+    await list_clients_handler(message)
+    await message.answer(
+        "Buyurtma qo‘shish uchun: `klient_raqami, mahsulot, miqdor`\n"
         "Masalan: `1, Anor, 5kg`\n"
         "(Klient raqami yuqoridagi ro'yxatdagi raqam)"
     )
-    await message.answer(text)
 
-async def show_orders_for_delete(message: types.Message):
-    orders = get_orders()
+def order_button_text(idx, order):
+    # order: order_id, client_name, phone, address, product, amount, date
+    text = f"{idx}. {order[1]} - {order[4]} ({order[5]} dona)"
+    return text[:47] + "..." if len(text) > 50 else text
+
+async def show_orders_for_delete(message: types.Message, direction="n", cursor=0, start=1, edit=False):
+    orders, start, has_prev, has_next = await load_page(get_orders_page, direction, cursor, start)
     if not orders:
         await message.answer("📭 Buyurtma mavjud emas.")
         return
 
     keyboard = InlineKeyboardMarkup(row_width=1)
-    for idx, o in enumerate(orders, start=1):
-        # o: order_id, client_name, phone, address, product, amount, date
-        text = f"{idx}. {o[1]} - {o[4]} ({o[5]} dona)"
-        if len(text) > 50:
-            text = text[:47] + "..."
+    for idx, o in enumerate(orders, start=start):
         keyboard.add(InlineKeyboardButton(
-            text=text,
-            callback_data=f"del_order:{o[0]}"
+            text=order_button_text(idx, o),
+            callback_data=DELETE_ORDER.pack(o[0])
         ))
-    keyboard.add(InlineKeyboardButton("🔙 Ortga", callback_data="back_to_main"))
-    await message.answer("O'chirmoqchi bo'lgan buyurtmani tanlang:", reply_markup=keyboard)
+    add_nav_row(keyboard, "do", orders, start, has_prev, has_next)
+    keyboard.add(InlineKeyboardButton("☑️ Bir nechtasini tanlash", callback_data=SELECT_START.pack("o")))
+    keyboard.add(InlineKeyboardButton("🔙 Ortga", callback_data=BACK_TO_MAIN.pack()))
+    await send_page(message, "O'chirmoqchi bo'lgan buyurtmani tanlang:\n"
+                             "(Sanadan oldingi hammasi: /delete_before 2024-01-01)", keyboard, edit)
 
-async def delete_order_callback(callback: types.CallbackQuery):
-    order_id = int(callback.data.split(":")[1])
-    success, error = delete_order(order_id)
+async def delete_order_callback(callback: types.CallbackQuery, order_id):
+    success, error = await delete_order(order_id)
     if success:
         await callback.answer("✅ Buyurtma o'chirildi")
         await callback.message.edit_text("Buyurtma o'chirildi.")
     else:
-        await callback.answer("❌ Xatolik: " + (error or "Noma'lum xato"), show_alert=True)
\ No newline at end of file
+        await callback.answer("❌ Xatolik: " + (error or "Noma'lum xato"), show_alert=True)
+# -------------------- Sanadan oldingi buyurtmalarni o'chirish --------------------
+async def delete_before_cmd(message: types.Message):
+    arg = message.get_args().strip()
+    try:
+        day = datetime.strptime(arg, "%Y-%m-%d")
+    except ValueError:
+        await message.answer("❌ Foydalanish: /delete_before YYYY-MM-DD\nMasalan: /delete_before 2024-01-01")
+        return
+    before = int(day.timestamp())
+    count = await count_orders_before(before)
+    if not count:
+        await message.answer(f"📭 {arg} dan oldingi buyurtma yo'q.")
+        return
+    keyboard = InlineKeyboardMarkup(row_width=1)
+    keyboard.add(
+        InlineKeyboardButton(f"🗑 Ha, {count} ta buyurtmani o'chirish", callback_data=DELETE_ORDERS_BEFORE.pack(before)),
+        InlineKeyboardButton("🔙 Ortga", callback_data=BACK_TO_MAIN.pack())
+    )
+    await message.answer(f"⚠️ {arg} dan oldingi {count} ta buyurtma o'chiriladi. Tasdiqlaysizmi?", reply_markup=keyboard)
+
+async def delete_before_callback(callback: types.CallbackQuery, before):
+    # Hammasi bitta DELETE va bitta tranzaksiyada
+    deleted, error = await delete_orders_before(before)
+    if error:
+        await callback.answer("❌ Xatolik: " + error, show_alert=True)
+        return
+    await callback.answer()
+    await callback.message.edit_text(f"✅ {deleted} ta buyurtma o'chirildi.")
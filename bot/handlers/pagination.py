@@ -0,0 +1,53 @@
+import functools
+
+from aiogram.types import InlineKeyboardButton
+
+from bot.callbacks import PAGE
+
+PAGE_SIZE = 10
+
+# Sahifa tugmalari: callbacks.PAGE (view, n|p, cursor, start)
+#   view   - qaysi ro'yxat (cl - klientlar, dc - klient o'chirish, do - buyurtma o'chirish)
+#   n      - keyingi sahifa: cursor dan katta id lar, start - shu sahifaning birinchi raqami
+#   p      - oldingi sahifa: cursor dan kichik id lar, start - joriy sahifaning birinchi raqami
+
+
+async def load_page(fetch, direction="n", cursor=0, start=1):
+    """
+    fetch - get_clients_page / get_orders_page kabi funksiya.
+    (rows, start, has_prev, has_next) qaytaradi; faqat PAGE_SIZE + 1 ta qator o'qiladi.
+    """
+    if direction == "p":
+        rows = await fetch(before_id=cursor, limit=PAGE_SIZE + 1)
+        if rows:
+            has_prev = len(rows) > PAGE_SIZE
+            rows = rows[-PAGE_SIZE:]
+            return rows, max(start - len(rows), 1), has_prev, True
+        # Oldingi qatorlar o'chirilgan bo'lsa, birinchi sahifaga qaytamiz
+        cursor, start = 0, 1
+
+    rows = await fetch(after_id=cursor, limit=PAGE_SIZE + 1)
+    has_next = len(rows) > PAGE_SIZE
+    return rows[:PAGE_SIZE], start, cursor > 0, has_next
+
+
+def add_nav_row(keyboard, view, rows, start, has_prev, has_next, pack=None):
+    # pack(direction, cursor, start) -> callback_data; odatda PAGE (view bo'yicha)
+    if pack is None:
+        pack = functools.partial(PAGE.pack, view)
+    buttons = []
+    if has_prev:
+        buttons.append(InlineKeyboardButton("⬅️ Oldingi", callback_data=pack("p", rows[0][0], start)))
+    if has_next:
+        buttons.append(InlineKeyboardButton("Keyingi ➡️", callback_data=pack("n", rows[-1][0], start + len(rows))))
+    if buttons:
+        keyboard.row(*buttons)
+    return keyboard
+
+
+async def send_page(message, text, keyboard, edit=False):
+    # Sahifa almashganda yangi xabar emas, mavjud xabar tahrirlanadi
+    if edit:
+        await message.edit_text(text, reply_markup=keyboard)
+    else:
+        await message.answer(text, reply_markup=keyboard)
@@ -0,0 +1,49 @@
+import io
+import json
+
+from aiogram import types
+
+from bot.metrics import metrics
+
+# Hisobotda har bir bo'limdan ko'rsatiladigan qatorlar soni
+PERF_TOP = 10
+
+
+def _ms(seconds):
+    return "∞" if seconds == float("inf") else f"{seconds * 1000:.0f}"
+
+
+def _section(title, histograms):
+    # Eng ko'p umumiy vaqt olganlar birinchi
+    rows = sorted(histograms.items(), key=lambda item: item[1]["sum"], reverse=True)[:PERF_TOP]
+    if not rows:
+        return ""
+    lines = [f"\n{title}:"]
+    for name, h in rows:
+        avg = h["sum"] / h["count"] if h["count"] else 0
+        line = f"• {name}: {h['count']} ta, o'rt. {_ms(avg)} ms, p95 ≤{_ms(h['p95'])} ms"
+        if h["errors"]:
+            line += f", ❗{h['errors']} xato"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def perf_text(snapshot):
+    uptime = snapshot["uptime"]
+    updates = snapshot["counters"].get("updates", 0)
+    text = (f"⏱ Ishlash vaqti: {uptime / 60:.0f} daqiqa\n"
+            f"📨 Update'lar: {updates} ({updates / uptime if uptime else 0:.2f}/s)")
+    text += _section("🧩 Handlerlar", snapshot["histograms"]["handler"])
+    text += _section("🔘 Callback amallari", snapshot["histograms"]["callback"])
+    text += _section("🗄 DB funksiyalari", snapshot["histograms"]["db"])
+    return text
+
+
+async def perf_report(message: types.Message):
+    """/perf — qisqa hisobot; /perf json — to'liq ma'lumot JSON fayl ko'rinishida."""
+    snapshot = metrics.snapshot()
+    if message.get_args().strip().lower() == "json":
+        data = json.dumps(snapshot, indent=2, ensure_ascii=False).encode("utf-8")
+        await message.answer_document(types.InputFile(io.BytesIO(data), filename="perf.json"))
+        return
+    await message.answer(perf_text(snapshot))
@@ -0,0 +1,107 @@
+from aiogram import types
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, InlineQueryResultArticle, InputTextMessageContent
+
+from bot.callbacks import SEARCH_PAGE, stash, load
+from database.aio import search_clients, search_orders, get_client_ordinals
+
+SEARCH_PAGE_SIZE = 5
+INLINE_PAGE_SIZE = 20
+
+
+def _client_line(client, ordinal):
+    number = f"{ordinal}. " if ordinal else ""
+    return f"{number}{client[1]}\n   📞 {client[2]}\n   📍 {client[3] or '—'}"
+
+
+def _order_line(order):
+    # order: order_id, client_name, phone, address, product, amount, date
+    return f"📦 {order[4]} ({order[5]}) - {order[1]}, {order[6]}"
+
+
+async def search_page(text, page):
+    """Klientlar va buyurtmalar bo'yicha natijalar; har biridan SEARCH_PAGE_SIZE + 1 ta o'qiladi."""
+    offset = page * SEARCH_PAGE_SIZE
+    clients = await search_clients(text, SEARCH_PAGE_SIZE + 1, offset)
+    orders = await search_orders(text, SEARCH_PAGE_SIZE + 1, offset)
+    has_next = len(clients) > SEARCH_PAGE_SIZE or len(orders) > SEARCH_PAGE_SIZE
+    return clients[:SEARCH_PAGE_SIZE], orders[:SEARCH_PAGE_SIZE], has_next
+
+
+async def show_search_results(message: types.Message, token, page=0, edit=False):
+    # Qidiruv matni callback_data ga sig'maydi: serverda saqlanadi, tugmada faqat token
+    text = await load(token)
+    if not text:
+        await message.answer("🔎 Qidiruv eskirgan. Qayta qidiring: /search matn")
+        return
+
+    clients, orders, has_next = await search_page(text, page)
+    if not clients and not orders:
+        reply = f"🔎 \"{text}\" bo'yicha hech narsa topilmadi."
+    else:
+        reply = f"🔎 \"{text}\" natijalari ({page + 1}-sahifa):\n"
+        if clients:
+            ordinals = await get_client_ordinals([c[0] for c in clients])
+            reply += "\n👤 Klientlar:\n" + "\n".join(
+                _client_line(c, ordinal) for c, ordinal in zip(clients, ordinals)
+            ) + "\n"
+        if orders:
+            reply += "\n🛍 Buyurtmalar:\n" + "\n".join(_order_line(o) for o in orders)
+
+    keyboard = InlineKeyboardMarkup(row_width=2)
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton("⬅️ Oldingi", callback_data=SEARCH_PAGE.pack(token, page - 1)))
+    if has_next:
+        buttons.append(InlineKeyboardButton("Keyingi ➡️", callback_data=SEARCH_PAGE.pack(token, page + 1)))
+    if buttons:
+        keyboard.row(*buttons)
+
+    if edit:
+        await message.edit_text(reply, reply_markup=keyboard)
+    else:
+        await message.answer(reply, reply_markup=keyboard)
+
+
+async def search_cmd(message: types.Message):
+    text = message.get_args().strip()
+    if not text:
+        await message.answer("🔎 Qidirish uchun: /search matn\nMasalan: /search Adham")
+        return
+    await show_search_results(message, await stash(text))
+
+
+async def search_page_callback(callback: types.CallbackQuery, token, page):
+    await callback.answer()
+    await show_search_results(callback.message, token, page, edit=True)
+
+
+async def inline_search(inline_query: types.InlineQuery):
+    text = inline_query.query.strip()
+    offset = int(inline_query.offset or 0)
+    # Inline rejimda klientlar va buyurtmalar bitta ro'yxatda: avval klientlar, keyin buyurtmalar
+    clients = await search_clients(text, INLINE_PAGE_SIZE, offset)
+    orders = await search_orders(text, INLINE_PAGE_SIZE, offset)
+
+    results = []
+    for c in clients:
+        results.append(InlineQueryResultArticle(
+            id=f"c{c[0]}",
+            title=c[1],
+            description=f"📞 {c[2]}  📍 {c[3] or '—'}",
+            input_message_content=InputTextMessageContent(_client_line(c, None)),
+        ))
+    for o in orders:
+        results.append(InlineQueryResultArticle(
+            id=f"o{o[0]}",
+            title=f"{o[4]} ({o[5]})",
+            description=f"{o[1]}, {o[6]}",
+            input_message_content=InputTextMessageContent(_order_line(o)),
+        ))
+
+    has_next = len(clients) == INLINE_PAGE_SIZE or len(orders) == INLINE_PAGE_SIZE
+    await inline_query.answer(
+        results,
+        cache_time=5,
+        is_personal=True,
+        next_offset=str(offset + INLINE_PAGE_SIZE) if has_next else "",
+    )
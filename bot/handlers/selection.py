@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import weakref
+from collections import namedtuple
+
+from aiogram import types
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from bot.callbacks import SELECT_TOGGLE, SELECT_PAGE, SELECT_DELETE, BACK_TO_MAIN, stash, load, update
+from bot.handlers.clients import load_clients_page, client_button_text
+from bot.handlers.orders import order_button_text
+from bot.handlers.pagination import load_page, add_nav_row, send_page
+from database.aio import get_orders_page, delete_clients, delete_orders
+
+# Bir nechta qatorni tanlab o'chirish. Tanlov serverda (callbacks.stash) saqlanadi:
+#   {"kind": "c" | "o", "ids": [...], "page": [direction, cursor, start]}
+# Tugmalarda faqat token, shuning uchun tanlov sahifalar orasida saqlanib qoladi.
+# "O'chirish" bosilganda hammasi bitta DELETE ... WHERE id IN (...) tranzaksiyasida o'chiriladi.
+# Bitta token bo'yicha load -> o'zgartirish -> update ketma-ket bajariladi (_lock): tez-tez bosilgan
+# ikki tugma bir-birining tanlovini yo'qotmaydi.
+SelectKind = namedtuple("SelectKind", ["load", "label", "delete", "title", "empty", "noun"])
+
+
+async def _load_orders_page(direction="n", cursor=0, start=1):
+    return await load_page(get_orders_page, direction, cursor, start)
+
+
+SELECT_KINDS = {
+    "c": SelectKind(load_clients_page, client_button_text, delete_clients,
+                    "O'chiriladigan klientlarni belgilang:", "⚠️ Hozircha klient yo‘q.", "klient"),
+    "o": SelectKind(_load_orders_page, order_button_text, delete_orders,
+                    "O'chiriladigan buyurtmalarni belgilang:", "📭 Buyurtma mavjud emas.", "buyurtma"),
+}
+
+
+async def show_selection(message: types.Message, token, selection):
+    kind = SELECT_KINDS[selection["kind"]]
+    rows, start, has_prev, has_next = await kind.load(*selection["page"])
+    if not rows:
+        await message.edit_text(kind.empty)
+        return
+
+    selected = set(selection["ids"])
+    keyboard = InlineKeyboardMarkup(row_width=1)
+    for idx, row in enumerate(rows, start=start):
+        mark = "✅" if row[0] in selected else "⬜"
+        keyboard.add(InlineKeyboardButton(
+            text=f"{mark} {kind.label(idx, row)}",
+            callback_data=SELECT_TOGGLE.pack(token, row[0])
+        ))
+    add_nav_row(keyboard, None, rows, start, has_prev, has_next,
+                pack=functools.partial(SELECT_PAGE.pack, token))
+    if selected:
+        keyboard.add(InlineKeyboardButton(
+            f"🗑 Tanlanganlarni o'chirish ({len(selected)})", callback_data=SELECT_DELETE.pack(token)
+        ))
+    keyboard.add(InlineKeyboardButton("🔙 Ortga", callback_data=BACK_TO_MAIN.pack()))
+    await send_page(message, kind.title, keyboard, edit=True)
+
+
+_locks = weakref.WeakValueDictionary()  # token -> asyncio.Lock (ishlatilayotgan paytda saqlanadi)
+
+
+def _lock(token):
+    lock = _locks.get(token)
+    if lock is None:
+        lock = _locks[token] = asyncio.Lock()
+    return lock
+
+
+async def _expired(callback: types.CallbackQuery):
+    await callback.answer("⌛ Tanlov eskirgan. Ro'yxatni qayta oching.", show_alert=True)
+
+
+async def select_start_callback(callback: types.CallbackQuery, kind):
+    if kind not in SELECT_KINDS:
+        await _expired(callback)
+        return
+    selection = {"kind": kind, "ids": [], "page": ["n", 0, 1]}
+    await callback.answer()
+    await show_selection(callback.message, await stash(selection), selection)
+
+
+async def select_toggle_callback(callback: types.CallbackQuery, token, row_id):
+    async with _lock(token):
+        selection = await load(token)
+        if selection is None:
+            await _expired(callback)
+            return
+        if row_id in selection["ids"]:
+            selection["ids"].remove(row_id)
+        else:
+            selection["ids"].append(row_id)
+        await update(token, selection)
+        await callback.answer()
+        await show_selection(callback.message, token, selection)
+
+
+async def select_page_callback(callback: types.CallbackQuery, token, direction, cursor, start):
+    async with _lock(token):
+        selection = await load(token)
+        if selection is None or direction not in ("n", "p"):
+            await _expired(callback)
+            return
+        selection["page"] = [direction, cursor, start]
+        await update(token, selection)
+        await callback.answer()
+        await show_selection(callback.message, token, selection)
+
+
+async def select_delete_callback(callback: types.CallbackQuery, token):
+    async with _lock(token):
+        selection = await load(token)
+        if selection is None:
+            await _expired(callback)
+            return
+        kind = SELECT_KINDS[selection["kind"]]
+        deleted, error = await kind.delete(selection["ids"])
+        if error:
+            await callback.answer("❌ Xatolik: " + error, show_alert=True)
+            return
+        # Tugmalar olib tashlanadi: bir xil tanlov ikki marta o'chirilmaydi
+        selection["ids"] = []
+        await update(token, selection)
+    await callback.answer()
+    await callback.message.edit_text(f"✅ {deleted} ta {kind.noun} o'chirildi.")
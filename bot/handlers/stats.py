@@ -1,44 +1,107 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 from aiogram import types
-from database.db import get_orders
+from aiogram.utils.exceptions import TelegramAPIError
+from database.aio import get_data_version, get_sales_stats
+from database.db import iter_orders
 from openpyxl import Workbook
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-import os
+from bot.sessions import create_store
+from keyboards.menus import get_keyboard
 
-def back_button():
-    keyboard = InlineKeyboardMarkup()
-    keyboard.add(InlineKeyboardButton("🔙 Ortga", callback_data="back_to_main"))
-    return keyboard
+# Eksportlar alohida thread'da, navbat bilan (bir vaqtda bittadan) bajariladi
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
 
-async def export_orders_excel(message: types.Message):
-    orders = get_orders()
-    if not orders:
-        await message.answer("📭 Buyurtma mavjud emas.", reply_markup=back_button())
-        return
+# Oxirgi yuborilgan fayl: ma'lumotlar versiyasi o'zgarmagan bo'lsa, Telegram file_id qayta yuboriladi.
+# Umumiy omborda: bir worker yaratgan fayl boshqalarida ham qayta ishlatiladi.
+_export_cache = create_store("export", ttl=30 * 24 * 60 * 60)
+EXPORT_CACHE_KEY = 0
+
+def write_orders_xlsx(file_path):
+    """
+    Buyurtmalarni DB kursoridan to'g'ridan-to'g'ri faylga yozadi (write-only rejim),
+    shuning uchun xotira sarfi buyurtmalar soniga bog'liq emas.
+    Yozilgan qatorlar sonini qaytaradi.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["№", "Klient", "Telefon", "Manzil", "Mahsulot", "Miqdor", "Sana"])
+
+    count = 0
+    for count, row in enumerate(iter_orders(), start=1):
+        # row: order_id, client_name, phone, address, product, amount, date
+        ws.append([count, row[1], row[2], row[3], row[4], row[5], row[6]])
 
-    # Fayl nomi
-    file_path = "orders.xlsx"
-    
+    wb.save(file_path)
+    return count
+
+async def send_cached_export(message: types.Message, version):
+    cached = await _export_cache.get(EXPORT_CACHE_KEY)
+    if cached is None or cached["version"] != version:
+        return False
     try:
-        wb = Workbook()
-        ws = wb.active
-        ws.append(["№", "Klient", "Telefon", "Manzil", "Mahsulot", "Miqdor", "Sana"])
+        await message.answer_document(
+            cached["file_id"],
+            caption="📊 Buyurtmalar ro‘yxati",
+            reply_markup=get_keyboard("back")
+        )
+    except TelegramAPIError:
+        # file_id yaroqsiz bo'lib qolgan bo'lsa, faylni qaytadan yaratamiz
+        await _export_cache.pop(EXPORT_CACHE_KEY)
+        return False
+    return True
+
+async def export_orders_excel(message: types.Message):
+    # Versiya eksportdan oldin o'qiladi: eksport paytida qo'shilgan ma'lumot keshni eskirtiradi
+    version = await get_data_version()
+    if await send_cached_export(message, version):
+        return
 
-        for idx, row in enumerate(orders, start=1):
-            # row: order_id, client_name, phone, address, product, amount, date
-            ws.append([idx, row[1], row[2], row[3], row[4], row[5], row[6]])
+    # Har bir so'rov uchun alohida vaqtinchalik fayl (parallel eksportlar bir-birini buzmaydi)
+    fd, file_path = tempfile.mkstemp(prefix="orders_", suffix=".xlsx")
+    os.close(fd)
 
-        wb.save(file_path)
+    try:
+        loop = asyncio.get_running_loop()
+        count = await loop.run_in_executor(_export_executor, write_orders_xlsx, file_path)
+        if not count:
+            await message.answer("📭 Buyurtma mavjud emas.", reply_markup=get_keyboard("back"))
+            return
 
         # Faylni yuborish
         with open(file_path, "rb") as file:
-            await message.answer_document(
+            sent = await message.answer_document(
                 types.InputFile(file, filename="buyurtmalar.xlsx"),
                 caption="📊 Buyurtmalar ro‘yxati",
-                reply_markup=back_button()
+                reply_markup=get_keyboard("back")
             )
+        await _export_cache.set(EXPORT_CACHE_KEY, {"version": version, "file_id": sent.document.file_id})
+
+    except Exception as e:
+        await message.answer(f"❌ Xatolik yuz berdi: {str(e)}")
 
-        # Faylni o‘chirish (ixtiyoriy)
+    finally:
         os.remove(file_path)
 
-    except Exception as e:
-        await message.answer(f"❌ Xatolik yuz berdi: {str(e)}")
\ No newline at end of file
+def _rows_text(rows):
+    return "\n".join(f"  {label}: {orders} ta, {amount} miqdor" for label, orders, amount in rows) or "  —"
+
+async def sales_stats(message: types.Message):
+    stats = await get_sales_stats()
+    orders, amount = stats["total"]
+    if not orders:
+        await message.answer("📭 Buyurtma mavjud emas.", reply_markup=get_keyboard("back"))
+        return
+
+    text = (
+        "📈 Statistika\n\n"
+        f"Jami: {orders} ta buyurtma, {amount} miqdor\n\n"
+        f"📅 Kunlar (oxirgi 7 kun):\n{_rows_text(stats['daily'])}\n\n"
+        f"🗓 Haftalar:\n{_rows_text(stats['weekly'])}\n\n"
+        f"📆 Oylar:\n{_rows_text(stats['monthly'])}\n\n"
+        f"🏆 Top mahsulotlar:\n{_rows_text(stats['products'])}\n\n"
+        f"👤 Top klientlar:\n{_rows_text(stats['clients'])}"
+    )
+    await message.answer(text, reply_markup=get_keyboard("back"))
@@ -0,0 +1,56 @@
+import json
+import os
+import sqlite3
+import time
+
+from bot.metrics import render_prometheus
+from database.db import check_db, get_heartbeats, get_row_counts
+
+# Heartbeat shundan eski bo'lsa, bot qotib qolgan hisoblanadi (sekund)
+HEARTBEAT_MAX_AGE = int(os.getenv("HEARTBEAT_MAX_AGE", 30))
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def health_status():
+    """
+    Baza o'qiladimi va bot yaqinda heartbeat yozganmi (demak, yozish ham ishlayapti) — ikkalasi ham tekshiriladi.
+    (http_status, javob_dict) qaytaradi. Sinxron: app.py (Flask) va webhook serveri (thread'da) chaqiradi.
+    """
+    result = {"status": "ok"}
+    try:
+        result["db_latency_ms"] = round(check_db() * 1000, 2)
+        heartbeats = get_heartbeats()
+    except sqlite3.Error as e:
+        return 503, {"status": "fail", "db": str(e)}
+
+    now = time.time()
+    result["workers"] = {worker: round(now - updated_at, 1) for worker, updated_at, _ in heartbeats}
+    if not any(age <= HEARTBEAT_MAX_AGE for age in result["workers"].values()):
+        result["status"] = "fail"
+        result["error"] = "bot heartbeat eskirgan"
+        return 503, result
+    return 200, result
+
+
+def metrics_text():
+    """Barcha worker'lar metrikalari + baza holati, Prometheus text formatida."""
+    now = time.time()
+    lines = []
+    try:
+        probe = check_db()
+        heartbeats = get_heartbeats()
+        counts = get_row_counts()
+    except sqlite3.Error:
+        lines += ["# TYPE orderx_db_up gauge", "orderx_db_up 0"]
+        return "\n".join(lines) + "\n"
+
+    lines += ["# TYPE orderx_db_up gauge", "orderx_db_up 1",
+              "# TYPE orderx_db_probe_seconds gauge", f"orderx_db_probe_seconds {probe}",
+              "# TYPE orderx_db_rows gauge"]
+    lines += [f'orderx_db_rows{{table="{table}"}} {count}' for table, count in counts.items()]
+    lines.append("# TYPE orderx_heartbeat_age_seconds gauge")
+    lines += [f'orderx_heartbeat_age_seconds{{worker="{worker}"}} {now - updated_at}'
+              for worker, updated_at, _ in heartbeats]
+
+    snapshots = [({"worker": worker}, json.loads(snapshot)) for worker, _, snapshot in heartbeats if snapshot]
+    return "\n".join(lines) + "\n" + render_prometheus(snapshots)
@@ -0,0 +1,35 @@
+import asyncio
+import json
+import logging
+
+from bot.metrics import metrics
+from database.aio import save_heartbeat, sync_ban_cache
+
+logger = logging.getLogger(__name__)
+
+# Har necha sekundda heartbeat yoziladi (app.py /health buni kutadi)
+HEARTBEAT_INTERVAL = 5
+
+
+async def heartbeat_loop(worker, outbound, syncs=()):
+    """
+    Event loop kechikishini o'lchaydi va metrikalar bilan birga bazaga yozadi.
+    Loop yoki DB thread'lari qotib qolsa, heartbeat eskiradi va /health 503 qaytaradi.
+    Shu bilan birga boshqa worker'larda qilingan ban/unban o'zgarishlari keshga olinadi;
+    syncs — shunday qo'shimcha keshlar (masalan, AuthCache.sync).
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        try:
+            # sleep kechiksa, loop boshqa ish bilan band bo'lgan
+            metrics.set_gauge("event_loop_lag_seconds", max(loop.time() - start - HEARTBEAT_INTERVAL, 0.0))
+            metrics.set_gauge("outbound_queue_depth", outbound.qsize())
+            await save_heartbeat(worker, json.dumps(metrics.snapshot()))
+            await sync_ban_cache()
+            for sync in syncs:
+                await sync()
+        except Exception:
+            # Har qanday xato: task to'xtasa heartbeat eskiradi va /health qayta ishga tushguncha 503 beradi
+            logger.exception("Heartbeat yozilmadi")
@@ -1,28 +1,51 @@
+import asyncio
+import functools
 import logging
 import random
-import re
 import time
 from logging.handlers import RotatingFileHandler
 
 from aiogram import Bot, Dispatcher, types
 from aiogram.utils import executor
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-from bot.config import BOT_TOKEN, ADMIN_ID, ADMIN_USERNAME
+from bot.config import BOT_TOKEN, ADMIN_ID, ADMIN_USERNAME, WORKER_ID, WORKER_COUNT, BOT_MODE
 from bot.middlewares.throttling import ThrottlingMiddleware
+from bot.middlewares.metrics import PerfMiddleware
+from bot.metrics import metrics
+from bot.heartbeat import heartbeat_loop
+from bot.webhook import start_webhook
+from bot.outbound import OutboundQueue
+from bot.sessions import create_store, FlowStore, AuthCache, current_flow
+from bot.routing import Router
+from bot.callbacks import (
+    LOGIN, FORGOT_PASSWORD, CONTINUE_RESET, CANCEL_RESET, BACK_TO_MAIN, CHANGE_PHONE, CHANGE_PASSWORD,
+    BAN_USER, UNBAN_USER, DELETE_USER, DELETE_CHOOSE_CLIENT, DELETE_CHOOSE_ORDER, DELETE_CLIENT, DELETE_ORDER,
+    PAGE, SEARCH_PAGE, SELECT_START, SELECT_TOGGLE, SELECT_PAGE, SELECT_DELETE, DELETE_ORDERS_BEFORE
+)
+from keyboards.menus import get_keyboard
 from bot.handlers.clients import (
     add_client_cmd, list_clients_handler,
     show_clients_for_delete, delete_client_callback
 )
 from bot.handlers.orders import (
-    add_order_cmd, show_orders_for_delete, delete_order_callback
+    add_order_cmd, show_orders_for_delete, delete_order_callback, delete_before_cmd, delete_before_callback
+)
+from bot.handlers.selection import (
+    select_start_callback, select_toggle_callback, select_page_callback, select_delete_callback
 )
-from bot.handlers.stats import export_orders_excel
-from database.db import (
-    add_client, add_order, get_clients,
+from bot.handlers.stats import export_orders_excel, sales_stats
+from bot.handlers.bulk import parse_line, save_batch, CLIENT_NOT_FOUND_ERROR
+from bot.handlers.imports import import_document
+from bot.handlers.search import search_cmd, search_page_callback, inline_search
+from bot.handlers.perf import perf_report
+from database.models import init_db
+from database.db import set_query_observer
+from database.aio import (
+    add_client, add_order, get_client_id_by_ordinal,
     get_setting, set_setting, hash_password, check_password as db_check_password,
     add_user, get_user, update_user_phone_name, get_all_users,
-    ban_user, unban_user, is_user_banned, delete_user
+    ban_user, unban_user, is_user_banned, delete_user, refresh_ban_cache
 )
 
 # -------------------- Logging sozlash --------------------
@@ -42,16 +65,40 @@ logger = logging.getLogger(__name__)
 bot = Bot(token=BOT_TOKEN)
 dp = Dispatcher(bot)
 
+# Chiquvchi xabarlar navbati (Telegram flood limitlari: chatga ~1 xabar/s, jami ~30 xabar/s).
+# Bir nechta worker bo'lsa, umumiy limit ular orasida teng bo'linadi
+outbound = OutboundQueue(bot, global_rate=30 / WORKER_COUNT)
+
 # Rate limiting middleware (2 sekundda 3 ta so'rov)
 dp.middleware.setup(ThrottlingMiddleware(rate_limit=3, time_limit=2))
-
-# Sessiyalar
-reset_sessions = {}
-change_phone_sessions = {}
-change_password_sessions = {}
-registration_sessions = {}
-authenticated_users = set()
-failed_attempts = {}  # noto'g'ri parol urinishlari
+# Handler va DB funksiyalari vaqtini o'lchash (/perf)
+dp.middleware.setup(PerfMiddleware(metrics))
+set_query_observer(metrics.observe_db)
+
+# Sessiyalar (TTL bilan; SHARED_BACKEND=sqlite bo'lsa qayta ishga tushganda ham saqlanadi va worker'lar orasida umumiy)
+# Sessiya o'zgartirilsa, uni qayta yozish kerak: await reset_sessions.set(user_id, session)
+# Suhbat jarayonlari bitta omborda: foydalanuvchi bir vaqtda faqat bittasida bo'ladi
+conversations = create_store("conversations", ttl=60 * 60)
+reset_sessions = FlowStore(conversations, "reset", ttl=15 * 60)
+change_phone_sessions = FlowStore(conversations, "change_phone", ttl=15 * 60)
+change_password_sessions = FlowStore(conversations, "change_password", ttl=15 * 60)
+registration_sessions = FlowStore(conversations, "registration", ttl=60 * 60)
+# Har xabardagi tekshiruv xotiradan (AuthCache); baza faqat keshda yo'q foydalanuvchi uchun o'qiladi
+authenticated_users = AuthCache(create_store("auth", ttl=30 * 24 * 60 * 60))
+failed_attempts = create_store("failed_attempts", ttl=60 * 60)  # noto'g'ri parol urinishlari
+
+# Tizimga kirmagan va hech qaysi jarayonda bo'lmagan foydalanuvchi: matni parol deb tekshiriladi
+GUEST = "guest"
+
+async def conversation_state(user_id):
+    flow = await current_flow(conversations, user_id)
+    if flow is None and not await authenticated_users.contains(user_id):
+        return GUEST
+    return flow
+
+# Xabar va callback'lar handlerlarga lug'at/prefiks daraxti orqali yo'naltiriladi (bot/routing.py)
+router = Router(state=conversation_state)
+router.setup(dp)
 
 def send_sms_code(phone, code):
     logger.info(f"📱 SMS kod {phone} raqamiga yuborildi: {code}")
@@ -61,98 +108,81 @@ def is_admin(user_id):
     return user_id == ADMIN_ID
 
 def main_menu(user_id=None):
-    keyboard = ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
-    buttons = [
-        KeyboardButton("➕ Klient qo'shish"),
-        KeyboardButton("📋 Klientlar ro'yxati"),
-        KeyboardButton("🛍 Buyurtma qo'shish"),
-        KeyboardButton("📊 Excel export"),
-        KeyboardButton("🗑 O'chirish"),
-        KeyboardButton("⚙️ Sozlamalar"),
-        KeyboardButton("👤 Admin")
-    ]
-    if user_id and is_admin(user_id):
-        buttons.append(KeyboardButton("👥 Foydalanuvchilar"))
-    keyboard.add(*buttons)
-    return keyboard
+    # Tayyor JSON (keyboards/menus.py): har bir javobda qayta qurilmaydi
+    return get_keyboard("main_menu_admin" if user_id and is_admin(user_id) else "main_menu")
 
 def authenticated_only(func):
+    @functools.wraps(func)  # /perf da handler o'z nomi bilan ko'rinsin
     async def wrapper(message: types.Message):
         user_id = message.from_user.id
-        if user_id not in authenticated_users:
+        if not await authenticated_users.contains(user_id):
             await message.answer("⚠️ Avval tizimga kiring. /start ni bosing.")
             return
-        if is_user_banned(user_id):
+        if await is_user_banned(user_id):
             await message.answer("🚫 Siz bloklangansiz. Admin bilan bog‘laning.")
             return
         return await func(message)
     return wrapper
 
 # -------------------- TEST BUYRUGLARI --------------------
-@dp.message_handler(commands=['testadmin'])
+@router.command("testadmin")
 async def test_admin(message: types.Message):
     await message.answer(
         f"Admin ID: {ADMIN_ID}\n"
         f"Sizning ID: {message.from_user.id}"
     )
 
-@dp.message_handler(commands=['checkauth'])
+@router.command("checkauth")
 async def check_auth(message: types.Message):
-    if message.from_user.id in authenticated_users:
+    if await authenticated_users.contains(message.from_user.id):
         await message.answer("✅ Siz autentifikatsiyadan o‘tgansiz")
     else:
         await message.answer("❌ Siz autentifikatsiyadan o‘tmagan")
 
 # -------------------- START --------------------
-@dp.message_handler(commands=['start'])
+@router.command("start")
 async def start_cmd(message: types.Message):
     user_id = message.from_user.id
     logger.info(f"User {user_id} started bot")
 
-    if user_id in registration_sessions:
+    if await registration_sessions.contains(user_id):
         await message.answer("Iltimos, avval ro'yxatdan o'tishni yakunlang.")
         return
 
-    if user_id in reset_sessions:
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("✅ Davom ettirish", callback_data="continue_reset"))
-        keyboard.add(InlineKeyboardButton("❌ Bekor qilish", callback_data="cancel_reset"))
+    if await reset_sessions.contains(user_id):
         await message.answer(
             "Sizda tugallanmagan parolni tiklash jarayoni bor. Davom ettirasizmi?",
-            reply_markup=keyboard
+            reply_markup=get_keyboard("continue_reset")
         )
         return
 
-    if user_id in authenticated_users:
+    if await authenticated_users.contains(user_id):
         await message.answer("👋 Xush kelibsiz! CRM bot.", reply_markup=main_menu(user_id))
         return
 
-    password_hash = get_setting("password_hash")
-    admin_phone = get_setting("admin_phone")
+    password_hash = await get_setting("password_hash")
+    admin_phone = await get_setting("admin_phone")
 
     if not password_hash or not admin_phone:
-        reset_sessions[user_id] = {'step': 'setup_phone'}
+        await reset_sessions.set(user_id, {'step': 'setup_phone'})
         await message.answer(
             "🤖 Bot birinchi marta ishga tushirilmoqda. Iltimos, sozlamalarni kiriting.\n"
             "Telefon raqamingizni xalqaro formatda yozing (masalan: +998901234567):"
         )
         return
 
-    keyboard = InlineKeyboardMarkup()
-    keyboard.add(InlineKeyboardButton("🔐 Kirish", callback_data="login"))
-    keyboard.add(InlineKeyboardButton("❓ Parolni unutdingizmi?", callback_data="forgot_password"))
-    await message.answer("🔒 Botdan foydalanish uchun tizimga kiring.", reply_markup=keyboard)
+    await message.answer("🔒 Botdan foydalanish uchun tizimga kiring.", reply_markup=get_keyboard("login"))
 
 # -------------------- INLINE HANDLERLAR --------------------
-@dp.callback_query_handler(lambda c: c.data == "login")
+@router.action(LOGIN)
 async def process_login(callback: types.CallbackQuery):
     await callback.answer()
     await callback.message.answer("🔐 Parolni kiriting:")
 
-@dp.callback_query_handler(lambda c: c.data == "forgot_password")
+@router.action(FORGOT_PASSWORD)
 async def process_forgot_password(callback: types.CallbackQuery):
     user_id = callback.from_user.id
-    admin_phone = get_setting("admin_phone")
+    admin_phone = await get_setting("admin_phone")
     if admin_phone:
         masked = "*" * (len(admin_phone) - 4) + admin_phone[-4:]
         await callback.message.answer(
@@ -161,14 +191,14 @@ async def process_forgot_password(callback: types.CallbackQuery):
         )
     else:
         await callback.message.answer("📞 Telefon raqamingizni xalqaro formatda yozing:")
-    reset_sessions[user_id] = {'step': 'waiting_phone'}
+    await reset_sessions.set(user_id, {'step': 'waiting_phone'})
     await callback.answer()
 
-@dp.callback_query_handler(lambda c: c.data == "continue_reset")
+@router.action(CONTINUE_RESET)
 async def continue_reset(callback: types.CallbackQuery):
     await callback.answer()
     user_id = callback.from_user.id
-    session = reset_sessions.get(user_id, {})
+    session = await reset_sessions.get(user_id, {})
     step = session.get('step')
     if step == 'waiting_phone':
         await callback.message.answer("📞 Telefon raqamingizni kiriting:")
@@ -177,58 +207,63 @@ async def continue_reset(callback: types.CallbackQuery):
     elif step == 'waiting_new_password':
         await callback.message.answer("🔐 Yangi parolni kiriting (kamida 8 belgi, raqam va harf bo‘lsin):")
     else:
-        del reset_sessions[user_id]
+        await reset_sessions.pop(user_id)
         await callback.message.answer("Bekor qilindi. /start ni bosing.")
 
-@dp.callback_query_handler(lambda c: c.data == "cancel_reset")
+@router.action(CANCEL_RESET)
 async def cancel_reset(callback: types.CallbackQuery):
     user_id = callback.from_user.id
-    if user_id in reset_sessions:
-        del reset_sessions[user_id]
+    await reset_sessions.pop(user_id)
     await callback.answer("Bekor qilindi.")
     await callback.message.answer("Bosh sahifa. /start ni bosing.")
 
-@dp.callback_query_handler(lambda c: c.data == "back_to_main")
+@router.action(BACK_TO_MAIN)
 async def back_to_main(callback: types.CallbackQuery):
     await callback.answer()
     await callback.message.answer("Asosiy menyu:", reply_markup=main_menu(callback.from_user.id))
     await callback.message.delete()
 
+# Eski formatdagi yoki muddati o'tgan tugmalar (bot/callbacks.py: VERSION, stash)
+@router.stale
+async def stale_callback(callback: types.CallbackQuery):
+    await callback.answer("⌛ Bu tugma eskirgan. Menyudan qayta tanlang.", show_alert=True)
+
 # -------------------- PAROLNI TEKSHIRISH (LOGIN) --------------------
-@dp.message_handler(lambda message: message.text and message.from_user.id not in authenticated_users and message.from_user.id not in reset_sessions and message.from_user.id not in change_phone_sessions and message.from_user.id not in change_password_sessions and message.from_user.id not in registration_sessions)
+@router.on_state(GUEST)
 async def handle_password_input(message: types.Message):
     user_id = message.from_user.id
     logger.info(f"Parol tekshirilmoqda: user {user_id}")
-    password_hash = get_setting("password_hash")
+    password_hash = await get_setting("password_hash")
     if password_hash and db_check_password(message.text, password_hash):
         # Urinishlarni tozalash
-        failed_attempts.pop(user_id, None)
-        add_user(
+        await failed_attempts.pop(user_id)
+        await add_user(
             user_id=user_id,
             username=message.from_user.username,
             first_name=message.from_user.first_name,
             last_name=message.from_user.last_name or ""
         )
-        user = get_user(user_id)
+        user = await get_user(user_id)
         if user and user[6] and user[7]:
-            authenticated_users.add(user_id)
+            await authenticated_users.add(user_id)
             await message.answer("✅ Parol to‘g‘ri. Xush kelibsiz!", reply_markup=main_menu(user_id))
         else:
-            registration_sessions[user_id] = {'step': 'waiting_phone'}
+            await registration_sessions.set(user_id, {'step': 'waiting_phone'})
             await message.answer("📱 Iltimos, telefon raqamingizni kiriting (masalan: +998901234567):")
     else:
-        failed_attempts[user_id] = failed_attempts.get(user_id, 0) + 1
-        logger.info(f"User {user_id} noto‘g‘ri parol kiritdi. Urinishlar: {failed_attempts[user_id]}")
-        if failed_attempts[user_id] >= 5:
-            await bot.send_message(ADMIN_ID, f"⚠️ Foydalanuvchi {user_id} 5 marta noto'g'ri parol kiritdi!")
-            failed_attempts[user_id] = 0
+        attempts = await failed_attempts.get(user_id, 0) + 1
+        logger.info(f"User {user_id} noto‘g‘ri parol kiritdi. Urinishlar: {attempts}")
+        if attempts >= 5:
+            outbound.send_message(ADMIN_ID, f"⚠️ Foydalanuvchi {user_id} 5 marta noto'g'ri parol kiritdi!")
+            attempts = 0
+        await failed_attempts.set(user_id, attempts)
         await message.answer("❌ Parol noto‘g‘ri. Qayta urinib ko‘ring yoki 'Parolni unutdingizmi?' tugmasini bosing.")
 
 # -------------------- RO'YXATDAN O'TISH JARAYONI --------------------
-@dp.message_handler(lambda message: message.from_user.id in registration_sessions)
+@router.on_state("registration")
 async def handle_registration(message: types.Message):
     user_id = message.from_user.id
-    session = registration_sessions[user_id]
+    session = await registration_sessions.get(user_id)
     step = session.get('step')
 
     if step == 'waiting_phone':
@@ -240,6 +275,7 @@ async def handle_registration(message: types.Message):
             phone = '+' + phone
         session['phone'] = phone
         session['step'] = 'waiting_name'
+        await registration_sessions.set(user_id, session)
         await message.answer("👤 Endi ism-familiyangizni kiriting (masalan: Adham Zokirov):")
 
     elif step == 'waiting_name':
@@ -248,16 +284,16 @@ async def handle_registration(message: types.Message):
             await message.answer("❌ Ism juda qisqa. Qayta kiriting:")
             return
         phone = session.get('phone')
-        update_user_phone_name(user_id, phone, full_name)
-        authenticated_users.add(user_id)
-        del registration_sessions[user_id]
+        await update_user_phone_name(user_id, phone, full_name)
+        await authenticated_users.add(user_id)
+        await registration_sessions.pop(user_id)
         await message.answer("✅ Ma'lumotlaringiz saqlandi. Endi botdan to‘liq foydalanishingiz mumkin.", reply_markup=main_menu(user_id))
 
 # -------------------- RESET JARAYONI (parolni tiklash) --------------------
-@dp.message_handler(lambda message: message.from_user.id in reset_sessions)
+@router.on_state("reset")
 async def handle_reset(message: types.Message):
     user_id = message.from_user.id
-    session = reset_sessions[user_id]
+    session = await reset_sessions.get(user_id)
     step = session.get('step')
 
     if step == 'setup_phone':
@@ -267,6 +303,7 @@ async def handle_reset(message: types.Message):
             return
         session['phone'] = phone
         session['step'] = 'setup_password'
+        await reset_sessions.set(user_id, session)
         await message.answer("Endi bot uchun parol o'rnating (kamida 8 belgi, raqam va harf bo‘lsin):")
 
     elif step == 'setup_password':
@@ -275,21 +312,21 @@ async def handle_reset(message: types.Message):
             await message.answer("❌ Parol kamida 8 belgidan iborat va raqam hamda harflarni o'z ichiga olishi kerak.")
             return
         hashed = hash_password(password)
-        set_setting("password_hash", hashed)
-        set_setting("admin_phone", session['phone'])
-        add_user(
+        await set_setting("password_hash", hashed)
+        await set_setting("admin_phone", session['phone'])
+        await add_user(
             user_id=user_id,
             username=message.from_user.username,
             first_name=message.from_user.first_name,
             last_name=message.from_user.last_name or ""
         )
-        authenticated_users.add(user_id)
-        del reset_sessions[user_id]
+        await authenticated_users.add(user_id)
+        await reset_sessions.pop(user_id)
         await message.answer("✅ Bot sozlandi! Endi to‘liq foydalanishingiz mumkin.", reply_markup=main_menu(user_id))
 
     elif step == 'waiting_phone':
         phone = message.text.strip()
-        admin_phone = get_setting("admin_phone")
+        admin_phone = await get_setting("admin_phone")
         if phone != admin_phone:
             await message.answer("❌ Bu telefon raqam tizimda mavjud emas. Qayta urinib ko‘ring.")
             return
@@ -297,6 +334,7 @@ async def handle_reset(message: types.Message):
         session['code'] = code
         session['step'] = 'waiting_code'
         session['phone'] = phone
+        await reset_sessions.set(user_id, session)
         send_sms_code(phone, code)
         await message.answer("✅ Sizning telefon raqamingizga 6 xonali kod yuborildi. Kodni kiriting:")
 
@@ -306,6 +344,7 @@ async def handle_reset(message: types.Message):
             await message.answer("❌ Kod noto‘g‘ri. Qayta urinib ko‘ring.")
             return
         session['step'] = 'waiting_new_password'
+        await reset_sessions.set(user_id, session)
         await message.answer("✅ Kod tasdiqlandi. Endi yangi parolni kiriting (kamida 8 belgi, raqam va harf bo‘lsin):")
 
     elif step == 'waiting_new_password':
@@ -314,13 +353,13 @@ async def handle_reset(message: types.Message):
             await message.answer("❌ Parol kamida 8 belgidan iborat va raqam hamda harflarni o'z ichiga olishi kerak.")
             return
         hashed = hash_password(new_pass)
-        set_setting("password_hash", hashed)
-        authenticated_users.add(user_id)
-        del reset_sessions[user_id]
+        await set_setting("password_hash", hashed)
+        await authenticated_users.add(user_id)
+        await reset_sessions.pop(user_id)
         await message.answer("✅ Parol muvaffaqiyatli o‘zgartirildi. Endi tizimga kirdingiz.", reply_markup=main_menu(user_id))
 
 # -------------------- ADMIN TUGMASI (hamma ko‘radi) --------------------
-@dp.message_handler(lambda msg: msg.text == "👤 Admin")
+@router.text("👤 Admin")
 @authenticated_only
 async def handle_admin_button(message: types.Message):
     if ADMIN_USERNAME:
@@ -330,10 +369,7 @@ async def handle_admin_button(message: types.Message):
             "💬 **Murojaat uchun:** Yuqoridagi username orqali yozishingiz mumkin.\n\n"
             "📌 *Eslatma: Admin faqat muhim masalalar bo‘yicha javob beradi.*"
         )
-        keyboard = InlineKeyboardMarkup().add(
-            InlineKeyboardButton("📩 Admin ga yozish", url=f"https://t.me/{ADMIN_USERNAME}")
-        )
-        await message.answer(text, parse_mode="Markdown", reply_markup=keyboard)
+        await message.answer(text, parse_mode="Markdown", reply_markup=get_keyboard("admin_contact"))
     else:
         await message.answer(
             "❌ **Admin maʼlumoti mavjud emas.**\n"
@@ -342,39 +378,33 @@ async def handle_admin_button(message: types.Message):
         )
 
 # -------------------- SOZLAMALAR MENYUSI --------------------
-@dp.message_handler(lambda msg: msg.text == "⚙️ Sozlamalar")
+@router.text("⚙️ Sozlamalar")
 @authenticated_only
 async def handle_settings_button(message: types.Message):
-    keyboard = InlineKeyboardMarkup(row_width=1)
-    keyboard.add(
-        InlineKeyboardButton("📱 Telefon raqamni o'zgartirish", callback_data="change_phone"),
-        InlineKeyboardButton("🔐 Parolni o'zgartirish", callback_data="change_password"),
-        InlineKeyboardButton("🔙 Ortga", callback_data="back_to_main")
-    )
-    await message.answer("⚙️ Sozlamalar:", reply_markup=keyboard)
+    await message.answer("⚙️ Sozlamalar:", reply_markup=get_keyboard("settings"))
 
-@dp.callback_query_handler(lambda c: c.data == "change_phone")
+@router.action(CHANGE_PHONE)
 async def change_phone_start(callback: types.CallbackQuery):
     user_id = callback.from_user.id
-    change_phone_sessions[user_id] = {'step': 'waiting_new_phone'}
+    await change_phone_sessions.set(user_id, {'step': 'waiting_new_phone'})
     await callback.answer()
     await callback.message.answer(
         "📱 Yangi telefon raqamingizni xalqaro formatda yozing (masalan: +998901234567):"
     )
 
-@dp.callback_query_handler(lambda c: c.data == "change_password")
+@router.action(CHANGE_PASSWORD)
 async def change_password_start(callback: types.CallbackQuery):
     user_id = callback.from_user.id
-    change_password_sessions[user_id] = {'step': 'waiting_old_password'}
+    await change_password_sessions.set(user_id, {'step': 'waiting_old_password'})
     await callback.answer()
     await callback.message.answer("🔐 Eski parolni kiriting:")
 
 # -------------------- TELEFON RAQAMNI O‘ZGARTIRISH --------------------
-@dp.message_handler(lambda message: message.from_user.id in change_phone_sessions)
+@router.on_state("change_phone")
 @authenticated_only
 async def handle_change_phone(message: types.Message):
     user_id = message.from_user.id
-    session = change_phone_sessions[user_id]
+    session = await change_phone_sessions.get(user_id)
     step = session.get('step')
 
     if step == 'waiting_new_phone':
@@ -386,6 +416,7 @@ async def handle_change_phone(message: types.Message):
         session['new_phone'] = new_phone
         session['code'] = code
         session['step'] = 'waiting_code'
+        await change_phone_sessions.set(user_id, session)
         send_sms_code(new_phone, code)
         await message.answer("✅ Yangi raqamingizga 6 xonali kod yuborildi. Kodni kiriting:")
 
@@ -394,23 +425,24 @@ async def handle_change_phone(message: types.Message):
         if user_code != session.get('code'):
             await message.answer("❌ Kod noto‘g‘ri. Qayta urinib ko‘ring.")
             return
-        set_setting("admin_phone", session['new_phone'])
-        del change_phone_sessions[user_id]
+        await set_setting("admin_phone", session['new_phone'])
+        await change_phone_sessions.pop(user_id)
         await message.answer("✅ Telefon raqam muvaffaqiyatli o‘zgartirildi.", reply_markup=main_menu(user_id))
 
 # -------------------- PAROLNI O‘ZGARTIRISH --------------------
-@dp.message_handler(lambda message: message.from_user.id in change_password_sessions)
+@router.on_state("change_password")
 @authenticated_only
 async def handle_change_password(message: types.Message):
     user_id = message.from_user.id
-    session = change_password_sessions[user_id]
+    session = await change_password_sessions.get(user_id)
     step = session.get('step')
-    password_hash = get_setting("password_hash")
+    password_hash = await get_setting("password_hash")
 
     if step == 'waiting_old_password':
         old_pass = message.text.strip()
         if db_check_password(old_pass, password_hash):
             session['step'] = 'waiting_new_password'
+            await change_password_sessions.set(user_id, session)
             await message.answer("✅ Eski parol to‘g‘ri. Endi yangi parolni kiriting (kamida 8 belgi, raqam va harf bo‘lsin):")
         else:
             await message.answer("❌ Eski parol noto‘g‘ri. Qayta urinib ko‘ring.")
@@ -421,12 +453,12 @@ async def handle_change_password(message: types.Message):
             await message.answer("❌ Parol kamida 8 belgidan iborat va raqam hamda harflarni o'z ichiga olishi kerak.")
             return
         new_hashed = hash_password(new_pass)
-        set_setting("password_hash", new_hashed)
-        del change_password_sessions[user_id]
+        await set_setting("password_hash", new_hashed)
+        await change_password_sessions.pop(user_id)
         await message.answer("✅ Parol muvaffaqiyatli o‘zgartirildi!", reply_markup=main_menu(user_id))
 
 # -------------------- FOYDALANUVCHILAR TUGMASI (faqat admin) --------------------
-@dp.message_handler(lambda msg: msg.text == "👥 Foydalanuvchilar")
+@router.text("👥 Foydalanuvchilar")
 @authenticated_only
 async def handle_users_button(message: types.Message):
     if not is_admin(message.from_user.id):
@@ -436,7 +468,7 @@ async def handle_users_button(message: types.Message):
 
 # -------------------- ADMIN BUYRUGLARI (inline tugmalar bilan) --------------------
 async def list_users(message: types.Message):
-    users = get_all_users()
+    users = await get_all_users()
     if not users:
         await message.answer("📭 Hozircha foydalanuvchilar yo'q.")
         return
@@ -460,14 +492,15 @@ async def list_users(message: types.Message):
 
         keyboard = InlineKeyboardMarkup(row_width=2)
         if is_banned:
-            keyboard.add(InlineKeyboardButton("🔓 Blokdan chiqarish", callback_data=f"unban_{user_id}"))
+            keyboard.add(InlineKeyboardButton("🔓 Blokdan chiqarish", callback_data=UNBAN_USER.pack(user_id)))
         else:
-            keyboard.add(InlineKeyboardButton("🔒 Bloklash", callback_data=f"ban_{user_id}"))
-        keyboard.add(InlineKeyboardButton("❌ O'chirish", callback_data=f"delete_{user_id}"))
+            keyboard.add(InlineKeyboardButton("🔒 Bloklash", callback_data=BAN_USER.pack(user_id)))
+        keyboard.add(InlineKeyboardButton("❌ O'chirish", callback_data=DELETE_USER.pack(user_id)))
 
-        await message.answer(text, reply_markup=keyboard)
+        # Navbat orqali: handler darhol qaytadi, xabarlar flood limitiga mos tezlikda yuboriladi
+        outbound.send_message(message.chat.id, text, reply_markup=keyboard)
 
-@dp.message_handler(commands=['users'])
+@router.command("users")
 @authenticated_only
 async def users_command(message: types.Message):
     if not is_admin(message.from_user.id):
@@ -475,45 +508,40 @@ async def users_command(message: types.Message):
         return
     await list_users(message)
 
-@dp.callback_query_handler(lambda c: c.data.startswith('ban_') and c.data.split('_')[1].isdigit())
-async def ban_user_callback(callback: types.CallbackQuery):
+@router.action(BAN_USER)
+async def ban_user_callback(callback: types.CallbackQuery, target_id):
     if not is_admin(callback.from_user.id):
         await callback.answer("⛔ Faqat admin uchun!", show_alert=True)
         return
-    target_id = int(callback.data.split('_')[1])
-    ban_user(target_id)
-    if target_id in authenticated_users:
-        authenticated_users.remove(target_id)
+    await ban_user(target_id)
+    await authenticated_users.discard(target_id)
     await callback.answer(f"✅ Foydalanuvchi {target_id} bloklandi")
     await callback.message.edit_reply_markup(reply_markup=None)
     await callback.message.edit_text(callback.message.text + "\n\n🚫 Bloklangan")
 
-@dp.callback_query_handler(lambda c: c.data.startswith('unban_') and c.data.split('_')[1].isdigit())
-async def unban_user_callback(callback: types.CallbackQuery):
+@router.action(UNBAN_USER)
+async def unban_user_callback(callback: types.CallbackQuery, target_id):
     if not is_admin(callback.from_user.id):
         await callback.answer("⛔ Faqat admin uchun!", show_alert=True)
         return
-    target_id = int(callback.data.split('_')[1])
-    unban_user(target_id)
+    await unban_user(target_id)
     await callback.answer(f"✅ Foydalanuvchi {target_id} blokdan chiqarildi")
     await callback.message.edit_reply_markup(reply_markup=None)
     await callback.message.edit_text(callback.message.text + "\n\n✅ Blokdan chiqarilgan")
 
-@dp.callback_query_handler(lambda c: c.data.startswith('delete_') and c.data.split('_')[1].isdigit())
-async def delete_user_callback(callback: types.CallbackQuery):
+@router.action(DELETE_USER)
+async def delete_user_callback(callback: types.CallbackQuery, target_id):
     if not is_admin(callback.from_user.id):
         await callback.answer("⛔ Faqat admin uchun!", show_alert=True)
         return
-    target_id = int(callback.data.split('_')[1])
-    delete_user(target_id)
-    if target_id in authenticated_users:
-        authenticated_users.remove(target_id)
+    await delete_user(target_id)
+    await authenticated_users.discard(target_id)
     await callback.answer(f"✅ Foydalanuvchi {target_id} o'chirildi")
     await callback.message.edit_reply_markup(reply_markup=None)
     await callback.message.edit_text(callback.message.text + "\n\n❌ O'chirilgan")
 
 # Eski /ban va /unban buyruqlari
-@dp.message_handler(commands=['ban'])
+@router.command("ban")
 @authenticated_only
 async def ban_user_cmd(message: types.Message):
     if not is_admin(message.from_user.id):
@@ -525,14 +553,13 @@ async def ban_user_cmd(message: types.Message):
         return
     try:
         target_id = int(args[0])
-        ban_user(target_id)
-        if target_id in authenticated_users:
-            authenticated_users.remove(target_id)
+        await ban_user(target_id)
+        await authenticated_users.discard(target_id)
         await message.answer(f"✅ Foydalanuvchi {target_id} bloklandi.")
     except ValueError:
         await message.answer("❌ user_id son bo‘lishi kerak.")
 
-@dp.message_handler(commands=['unban'])
+@router.command("unban")
 @authenticated_only
 async def unban_user_cmd(message: types.Message):
     if not is_admin(message.from_user.id):
@@ -544,162 +571,253 @@ async def unban_user_cmd(message: types.Message):
         return
     try:
         target_id = int(args[0])
-        unban_user(target_id)
+        await unban_user(target_id)
         await message.answer(f"✅ Foydalanuvchi {target_id} blokdan chiqarildi.")
     except ValueError:
         await message.answer("❌ user_id son bo‘lishi kerak.")
 
 # -------------------- O'CHIRISH CALLBACKLARI (client/order) --------------------
-@dp.callback_query_handler(lambda c: c.data == "delete_choose_client")
+@router.action(DELETE_CHOOSE_CLIENT)
 async def process_delete_client_choice(callback: types.CallbackQuery):
-    if callback.from_user.id not in authenticated_users:
+    if not await authenticated_users.contains(callback.from_user.id):
         await callback.answer("Avval tizimga kiring.", show_alert=True)
         return
     await callback.answer()
     await show_clients_for_delete(callback.message)
 
-@dp.callback_query_handler(lambda c: c.data == "delete_choose_order")
+@router.action(DELETE_CHOOSE_ORDER)
 async def process_delete_order_choice(callback: types.CallbackQuery):
-    if callback.from_user.id not in authenticated_users:
+    if not await authenticated_users.contains(callback.from_user.id):
         await callback.answer("Avval tizimga kiring.", show_alert=True)
         return
     await callback.answer()
     await show_orders_for_delete(callback.message)
 
-@dp.callback_query_handler(lambda c: c.data.startswith("del_client:"))
-async def process_delete_client(callback: types.CallbackQuery):
-    if callback.from_user.id not in authenticated_users:
+@router.action(DELETE_CLIENT)
+async def process_delete_client(callback: types.CallbackQuery, client_id):
+    if not await authenticated_users.contains(callback.from_user.id):
+        await callback.answer("Avval tizimga kiring.", show_alert=True)
+        return
+    await delete_client_callback(callback, client_id)
+
+@router.action(DELETE_ORDER)
+async def process_delete_order(callback: types.CallbackQuery, order_id):
+    if not await authenticated_users.contains(callback.from_user.id):
+        await callback.answer("Avval tizimga kiring.", show_alert=True)
+        return
+    await delete_order_callback(callback, order_id)
+
+# -------------------- BIR NECHTASINI TANLAB O'CHIRISH --------------------
+@router.action(SELECT_START)
+async def process_select_start(callback: types.CallbackQuery, kind):
+    if not await authenticated_users.contains(callback.from_user.id):
+        await callback.answer("Avval tizimga kiring.", show_alert=True)
+        return
+    await select_start_callback(callback, kind)
+
+@router.action(SELECT_TOGGLE)
+async def process_select_toggle(callback: types.CallbackQuery, token, row_id):
+    if not await authenticated_users.contains(callback.from_user.id):
+        await callback.answer("Avval tizimga kiring.", show_alert=True)
+        return
+    await select_toggle_callback(callback, token, row_id)
+
+@router.action(SELECT_PAGE)
+async def process_select_page(callback: types.CallbackQuery, token, direction, cursor, start):
+    if not await authenticated_users.contains(callback.from_user.id):
         await callback.answer("Avval tizimga kiring.", show_alert=True)
         return
-    await delete_client_callback(callback)
+    await select_page_callback(callback, token, direction, cursor, start)
 
-@dp.callback_query_handler(lambda c: c.data.startswith("del_order:"))
-async def process_delete_order(callback: types.CallbackQuery):
-    if callback.from_user.id not in authenticated_users:
+@router.action(SELECT_DELETE)
+async def process_select_delete(callback: types.CallbackQuery, token):
+    if not await authenticated_users.contains(callback.from_user.id):
         await callback.answer("Avval tizimga kiring.", show_alert=True)
         return
-    await delete_order_callback(callback)
+    await select_delete_callback(callback, token)
+
+# -------------------- SANADAN OLDINGI BUYURTMALARNI O'CHIRISH --------------------
+# Hamma buyurtmalarni birdaniga o'chiradi: /users va /ban kabi faqat admin uchun
+@router.command("delete_before")
+@authenticated_only
+async def delete_before_command(message: types.Message):
+    if not is_admin(message.from_user.id):
+        await message.answer("⛔ Bu buyruq faqat admin uchun.")
+        return
+    await delete_before_cmd(message)
+
+@router.action(DELETE_ORDERS_BEFORE)
+async def process_delete_orders_before(callback: types.CallbackQuery, before):
+    user_id = callback.from_user.id
+    if not is_admin(user_id):
+        await callback.answer("⛔ Faqat admin uchun!", show_alert=True)
+        return
+    if not await authenticated_users.contains(user_id) or await is_user_banned(user_id):
+        await callback.answer("Avval tizimga kiring.", show_alert=True)
+        return
+    await delete_before_callback(callback, before)
+
+# -------------------- SAHIFALASH (keyingi/oldingi) --------------------
+PAGE_VIEWS = {
+    "cl": list_clients_handler,
+    "dc": show_clients_for_delete,
+    "do": show_orders_for_delete,
+}
+
+@router.action(PAGE)
+async def process_page(callback: types.CallbackQuery, view, direction, cursor, start):
+    if not await authenticated_users.contains(callback.from_user.id):
+        await callback.answer("Avval tizimga kiring.", show_alert=True)
+        return
+    if view not in PAGE_VIEWS or direction not in ("n", "p"):
+        await stale_callback(callback)
+        return
+    await callback.answer()
+    await PAGE_VIEWS[view](callback.message, direction, cursor, start, edit=True)
 
 # -------------------- REPLY TUGMALAR --------------------
-@dp.message_handler(lambda msg: msg.text == "➕ Klient qo'shish")
+@router.text("➕ Klient qo'shish")
 @authenticated_only
 async def handle_add_client_button(message: types.Message):
     await add_client_cmd(message)
 
-@dp.message_handler(lambda msg: msg.text == "📋 Klientlar ro'yxati")
+@router.text("📋 Klientlar ro'yxati")
 @authenticated_only
 async def handle_list_clients_button(message: types.Message):
     await list_clients_handler(message)
 
-@dp.message_handler(lambda msg: msg.text == "🛍 Buyurtma qo'shish")
+@router.text("🛍 Buyurtma qo'shish")
 @authenticated_only
 async def handle_add_order_button(message: types.Message):
     await add_order_cmd(message)
 
-@dp.message_handler(lambda msg: msg.text == "📊 Excel export")
+@router.text("📊 Excel export")
 @authenticated_only
 async def handle_export_button(message: types.Message):
     await export_orders_excel(message)
 
-@dp.message_handler(lambda msg: msg.text == "🗑 O'chirish")
+@router.text("🗑 O'chirish")
 @authenticated_only
 async def handle_delete_button(message: types.Message):
-    keyboard = InlineKeyboardMarkup(row_width=2)
-    keyboard.add(
-        InlineKeyboardButton("👤 Klient o'chirish", callback_data="delete_choose_client"),
-        InlineKeyboardButton("📦 Buyurtma o'chirish", callback_data="delete_choose_order")
-    )
-    await message.answer("Nimani o'chirmoqchisiz?", reply_markup=keyboard)
+    await message.answer("Nimani o'chirmoqchisiz?", reply_markup=get_keyboard("delete_choose"))
+
+# -------------------- STATISTIKA --------------------
+@router.command("stats")
+@authenticated_only
+async def stats_command(message: types.Message):
+    await sales_stats(message)
+
+# -------------------- PERF (faqat admin) --------------------
+@router.command("perf")
+@authenticated_only
+async def perf_command(message: types.Message):
+    if not is_admin(message.from_user.id):
+        await message.answer("⛔ Bu buyruq faqat admin uchun.")
+        return
+    await perf_report(message)
+
+# -------------------- QIDIRUV (/search va inline rejim) --------------------
+@router.command("search")
+@authenticated_only
+async def search_command(message: types.Message):
+    await search_cmd(message)
+
+@router.action(SEARCH_PAGE)
+async def process_search_page(callback: types.CallbackQuery, token, page):
+    if not await authenticated_users.contains(callback.from_user.id):
+        await callback.answer("Avval tizimga kiring.", show_alert=True)
+        return
+    await search_page_callback(callback, token, page)
+
+@dp.inline_handler()
+async def inline_search_handler(inline_query: types.InlineQuery):
+    user_id = inline_query.from_user.id
+    if not await authenticated_users.contains(user_id) or await is_user_banned(user_id):
+        await inline_query.answer([], cache_time=5, is_personal=True)
+        return
+    await inline_search(inline_query)
 
 # -------------------- UNIVERSAL HANDLER (vergul bilan yozilgan matnlar) --------------------
-@dp.message_handler(lambda message: "," in message.text)
+@router.fallback(lambda message: message.text is not None and "," in message.text)
 @authenticated_only
 async def universal_input(message: types.Message):
-    parts = [p.strip() for p in message.text.split(",")]
+    lines = [line for line in message.text.splitlines() if line.strip()]
 
-    if len(parts) == 2:
-        name, phone = parts
-        phone = phone.replace(" ", "")
-        if not (phone.startswith('+') and phone[1:].isdigit() or phone.isdigit()):
-            await message.answer(
-                "❌ Telefon raqam noto‘g‘ri formatda.\n"
-                "Klient qo‘shish uchun: `Ism, Telefon` yoki `Ism, Telefon, Manzil`\n"
-                "Misol: `Adham, +998901234567`",
-                reply_markup=main_menu(message.from_user.id)
-            )
-            return
-        if not phone.startswith('+'):
-            phone = '+' + phone
-        address = ""
-        add_client(name, phone, address)
+    # Bir nechta qator: jadvaldan nusxalangan ro'yxat, bitta tranzaksiyada saqlanadi
+    if len(lines) > 1:
+        report = await save_batch(message.text.splitlines())
+        await message.answer(report, reply_markup=main_menu(message.from_user.id))
+        return
+
+    try:
+        kind, data = parse_line(lines[0])
+    except ValueError as e:
+        await message.answer(str(e), reply_markup=main_menu(message.from_user.id))
+        return
+
+    if kind == "client":
+        name, phone, address = data
+        await add_client(name, phone, address)
         await message.answer(f"✅ Klient qo‘shildi: {name}", reply_markup=main_menu(message.from_user.id))
+        return
 
-    elif len(parts) == 3:
-        first, second, third = parts
-        if first.isdigit():
-            client_index = int(first)
-            product = second
-            amount_str = third
-            amount_digits = re.sub(r'\D', '', amount_str)
-            if not amount_digits:
-                await message.answer(
-                    "❌ Xato: Miqdor raqam bo‘lishi kerak.\n"
-                    "Masalan: `1, Anor, 5` yoki `1, Anor, 3kg`",
-                    reply_markup=main_menu(message.from_user.id)
-                )
-                return
-            amount = int(amount_digits)
-            clients = get_clients()
-            if 1 <= client_index <= len(clients):
-                client_id = clients[client_index-1][0]
-                add_order(client_id, product, amount)
-                await message.answer(f"✅ Buyurtma qo‘shildi: {product} ({amount})", reply_markup=main_menu(message.from_user.id))
-            else:
-                await message.answer("❌ Bunday raqamli klient mavjud emas.", reply_markup=main_menu(message.from_user.id))
-        else:
-            name, phone, address = first, second, third
-            phone = phone.replace(" ", "")
-            if not (phone.startswith('+') and phone[1:].isdigit() or phone.isdigit()):
-                await message.answer(
-                    "❌ Telefon raqam noto‘g‘ri formatda.\n"
-                    "Klient qo‘shish uchun: `Ism, Telefon, Manzil`\n"
-                    "Misol: `Adham, +998901234567, Samarqand`",
-                    reply_markup=main_menu(message.from_user.id)
-                )
-                return
-            if not phone.startswith('+'):
-                phone = '+' + phone
-            add_client(name, phone, address)
-            await message.answer(f"✅ Klient qo‘shildi: {name}", reply_markup=main_menu(message.from_user.id))
+    client_index, product, amount = data
+    client_id = await get_client_id_by_ordinal(client_index)
+    if client_id is not None:
+        await add_order(client_id, product, amount)
+        await message.answer(f"✅ Buyurtma qo‘shildi: {product} ({amount})", reply_markup=main_menu(message.from_user.id))
     else:
-        await message.answer(
-            "❌ Noto‘g‘ri format. Iltimos:\n"
-            "• Klient qo‘shish: `Ism, Telefon` yoki `Ism, Telefon, Manzil`\n"
-            "• Buyurtma qo‘shish: `Klient raqami, Mahsulot, Miqdor`\n"
-            "Misol: `Adham, +998901234567, Samarqand` yoki `1, Anor, 3kg`",
-            reply_markup=main_menu(message.from_user.id)
-        )
+        await message.answer(CLIENT_NOT_FOUND_ERROR, reply_markup=main_menu(message.from_user.id))
+
+# -------------------- IMPORT (CSV/XLSX fayl) --------------------
+@router.fallback(lambda message: message.document is not None)
+@authenticated_only
+async def handle_import_document(message: types.Message):
+    await import_document(message)
 
 # -------------------- MATNLI KOMANDALAR --------------------
-@dp.message_handler(commands=['add_client'])
+@router.command("add_client")
 @authenticated_only
 async def add_client_command(message: types.Message):
     await add_client_cmd(message)
 
-@dp.message_handler(commands=['clients'])
+@router.command("clients")
 @authenticated_only
 async def clients_command(message: types.Message):
     await list_clients_handler(message)
 
-@dp.message_handler(commands=['add_order'])
+@router.command("add_order")
 @authenticated_only
 async def add_order_command(message: types.Message):
     await add_order_cmd(message)
 
-@dp.message_handler(commands=['export'])
+@router.command("export")
 @authenticated_only
 async def export_command(message: types.Message):
     await export_orders_excel(message)
 
+async def on_startup(dp):
+    # Sxema yangilanishlarini qo'llash (indekslar, yangi ustunlar)
+    init_db()
+    # Bloklanganlar ro'yxatini oldindan yuklash
+    await refresh_ban_cache()
+    await authenticated_users.sync()
+    # Holatni app.py (/health, /metrics) uchun bazaga yozib turish
+    dp["heartbeat"] = asyncio.create_task(heartbeat_loop(WORKER_ID, outbound, syncs=[authenticated_users.sync]))
+
+async def on_shutdown(dp):
+    heartbeat = dp["heartbeat"]
+    heartbeat.cancel()
+    try:
+        await heartbeat
+    except asyncio.CancelledError:
+        pass
+    # Navbatda qolgan xabarlarni yuborib bo'lish
+    await outbound.close()
+
 if __name__ == "__main__":
-    executor.start_polling(dp, skip_updates=True)
\ No newline at end of file
+    if BOT_MODE == "webhook":
+        # Webhook + /health + /metrics bitta jarayon va portda
+        start_webhook(dp, on_startup=on_startup, on_shutdown=on_shutdown)
+    else:
+        executor.start_polling(dp, skip_updates=True, on_startup=on_startup, on_shutdown=on_shutdown)
\ No newline at end of file
@@ -0,0 +1,158 @@
+import threading
+import time
+from bisect import bisect_left
+
+# Gistogramma chegaralari (sekund)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "errors")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # oxirgisi: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Taxminiy kvantil: q ga yetgan birinchi bucket chegarasi."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "errors": self.errors,
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.counts)),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """
+    Bot ichidagi o'lchovlar: handlerlar, callback amallari va DB funksiyalari
+    bo'yicha chaqiruvlar soni, kechikish gistogrammasi va xatolar.
+    DB thread'laridan ham chaqiriladi, shuning uchun qulf bilan.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {"handler": {}, "callback": {}, "db": {}}
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def observe(self, kind, name, seconds, error=False):
+        with self._lock:
+            group = self.histograms[kind]
+            histogram = group.get(name)
+            if histogram is None:
+                histogram = group[name] = Histogram()
+            histogram.observe(seconds, error)
+
+    def observe_db(self, name, seconds):
+        self.observe("db", name, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime": time.time() - self.started_at,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": {
+                    kind: {name: h.to_dict() for name, h in group.items()}
+                    for kind, group in self.histograms.items()
+                },
+            }
+
+
+metrics = Metrics()
+
+
+# -------------------- Prometheus formati --------------------
+# snapshot gistogramma turi -> (metrika nomi, label nomi)
+HISTOGRAM_NAMES = {
+    "handler": ("orderx_handler_duration_seconds", "handler"),
+    "callback": ("orderx_callback_duration_seconds", "prefix"),
+    "db": ("orderx_db_query_duration_seconds", "function"),
+}
+GAUGE_HELP = {
+    "event_loop_lag_seconds": "Event loop kechikishi (heartbeat sleep'i qanchaga kechikdi).",
+    "outbound_queue_depth": "Yuborilishini kutayotgan chiquvchi xabarlar.",
+}
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def render_prometheus(snapshots):
+    """
+    snapshots: [(labels, snapshot), ...] — har bir worker uchun Metrics.snapshot() natijasi.
+    Prometheus text formatidagi satrni qaytaradi.
+    """
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_labels(labels)} {value}")
+
+    family("orderx_uptime_seconds", "gauge", "Bot jarayoni ishlagan vaqt.",
+           [("", labels, s["uptime"]) for labels, s in snapshots])
+    family("orderx_updates_total", "counter", "Qabul qilingan Telegram update'lari.",
+           [("", labels, s["counters"].get("updates", 0)) for labels, s in snapshots])
+    gauges = sorted({name for _, s in snapshots for name in s["gauges"]})
+    for gauge in gauges:
+        family(f"orderx_{gauge}", "gauge", GAUGE_HELP.get(gauge, gauge),
+               [("", labels, s["gauges"][gauge]) for labels, s in snapshots if gauge in s["gauges"]])
+
+    for kind, (name, label) in HISTOGRAM_NAMES.items():
+        samples, errors = [], []
+        for labels, s in snapshots:
+            for key, h in s["histograms"].get(kind, {}).items():
+                series = {**labels, label: key}
+                cumulative = 0
+                for bound, count in h["buckets"].items():
+                    cumulative += count
+                    samples.append(("_bucket", {**series, "le": bound}, cumulative))
+                samples.append(("_sum", series, h["sum"]))
+                samples.append(("_count", series, h["count"]))
+                errors.append(("", series, h["errors"]))
+        family(name, "histogram", f"{label} bo'yicha bajarilish vaqti.", samples)
+        if kind != "db":
+            family(name.replace("_duration_seconds", "_errors_total"), "counter",
+                   f"{label} bo'yicha xatolar soni.", errors)
+
+    return "\n".join(lines) + "\n"
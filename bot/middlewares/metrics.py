@@ -0,0 +1,62 @@
+import sys
+import time
+from aiogram import types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from bot.callbacks import action_name
+from bot.metrics import metrics as default_metrics
+
+
+class PerfMiddleware(BaseMiddleware):
+    """
+    Har bir handler (va callback amali) uchun chaqiruvlar soni, kechikish va xatolarni yozadi.
+    ThrottlingMiddleware dan keyin o'rnatiladi: bekor qilingan so'rovlar hisobga kirmaydi.
+    """
+
+    def __init__(self, metrics=default_metrics):
+        self.metrics = metrics
+        super().__init__()
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        self.metrics.inc("updates")
+
+    def _start(self, data):
+        data["_perf"] = (current_handler.get(None), time.perf_counter())
+
+    def _finish(self, data, callback_data=None):
+        started = data.pop("_perf", None)
+        if started is None:
+            return
+        handler, start = started
+        elapsed = time.perf_counter() - start
+        # Router orqali kelgan update'lar uchun haqiqiy handler data["route"] da (bot/routing.py).
+        # U oxirida o'qiladi: suhbat holati bo'yicha handler shu middleware'dan keyin aniqlanadi
+        if "route" in data:
+            if data["route"] is None:
+                return  # hech qaysi handlerga tushmadi
+            handler = data["route"].handler
+        name = getattr(handler, "__name__", "unknown")
+        # post_process handler'ning finally blokida chaqiriladi: xato bo'lsa exc_info da turadi
+        error = sys.exc_info()[1] is not None
+        self.metrics.observe("handler", name, elapsed, error)
+        if callback_data is not None:
+            self.metrics.observe("callback", action_name(callback_data), elapsed, error)
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        self._start(data)
+
+    async def on_post_process_message(self, message: types.Message, results, data: dict):
+        self._finish(data)
+
+    async def on_process_callback_query(self, callback: types.CallbackQuery, data: dict):
+        self._start(data)
+
+    async def on_post_process_callback_query(self, callback: types.CallbackQuery, results, data: dict):
+        self._finish(data, callback.data)
+
+    async def on_process_inline_query(self, inline_query: types.InlineQuery, data: dict):
+        self._start(data)
+
+    async def on_post_process_inline_query(self, inline_query: types.InlineQuery, results, data: dict):
+        self._finish(data)
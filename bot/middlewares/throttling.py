@@ -1,30 +1,200 @@
 import time
-from collections import defaultdict
+from collections import OrderedDict
 from aiogram import types
 from aiogram.dispatcher.handler import CancelHandler
 from aiogram.dispatcher.middlewares import BaseMiddleware
 
+from bot.config import SHARED_BACKEND, WORKER_COUNT
+from database.aio import consume_token, purge_throttle
+
+THROTTLED_TEXT = "⏳ Juda ko'p so'rov yubordingiz. Biroz kuting."
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated", "warned")
+
+    def __init__(self, capacity, now):
+        self.tokens = capacity
+        self.updated = now
+        self.warned = False
+
+
+class BucketTable:
+    """
+    Kalit (user/chat) bo'yicha token bucket'lar.
+    Har bir tekshiruv O(1); uzoq vaqt faol bo'lmagan yoki eng eski yozuvlar o'chiriladi,
+    shuning uchun xotira ko'rilgan foydalanuvchilar soniga qarab o'smaydi.
+    """
+
+    def __init__(self, capacity, rate, max_size=10000):
+        self.capacity = capacity
+        self.rate = rate  # sekundiga qo'shiladigan token
+        self.max_size = max_size
+        # Shuncha vaqt ishlatilmagan bucket baribir to'la - uni o'chirish hech narsani o'zgartirmaydi
+        self.ttl = capacity / rate
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def get(self, key, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.capacity, now)
+        else:
+            self._buckets.move_to_end(key)
+        self._evict(now)
+        return bucket
+
+    def consume(self, bucket, now):
+        bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.rate)
+        bucket.updated = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return True
+        return False
+
+    def _evict(self, now):
+        buckets = self._buckets
+        while len(buckets) > self.max_size:
+            buckets.popitem(last=False)
+        # OrderedDict oxirgi murojaat tartibida: boshidagilar eng eski
+        while buckets:
+            bucket = next(iter(buckets.values()))
+            if now - bucket.updated < self.ttl:
+                break
+            buckets.popitem(last=False)
+
+
+def _global_table(limit):
+    """Butun bot uchun bucket (sekundiga limit); limit None bo'lsa global cheklov yo'q."""
+    return BucketTable(limit, limit, 1) if limit else None
+
+
+class MemoryLimiter:
+    """Bucket'lar shu jarayon xotirasida: har bir tekshiruv O(1), lekin worker'lar orasida umumiy emas."""
+
+    def __init__(self, user_limit, chat_limit, global_limit, time_limit, max_tracked):
+        self.users = BucketTable(user_limit, user_limit / time_limit, max_tracked)
+        self.chats = BucketTable(chat_limit, chat_limit / time_limit, max_tracked)
+        self.global_bucket = _global_table(global_limit)
+
+    async def allow(self, user_id, chat_id):
+        """(ruxsat, ogohlantirish kerakmi) qaytaradi."""
+        now = time.monotonic()
+        user = self.users.get(user_id, now)
+        if not self.users.consume(user, now):
+            # Cheklov davomida foydalanuvchiga faqat bir marta javob beramiz
+            warn = not user.warned
+            user.warned = True
+            return False, warn
+        user.warned = False
+        # Chat yoki global limit — foydalanuvchining aybi emas: "juda tez" deb ogohlantirilmaydi
+        allowed = (
+            (chat_id is None or self.chats.consume(self.chats.get(chat_id, now), now))
+            and (self.global_bucket is None or self.global_bucket.consume(self.global_bucket.get(None, now), now))
+        )
+        return allowed, False
+
+
+class SQLiteLimiter:
+    """
+    Faqat foydalanuvchi bucket'i bazada (worker'lar orasida umumiy). Chat va global bucket'lar shu jarayonda,
+    limit WORKER_COUNT ga bo'linadi (OutboundQueue kabi) — umumiy "g" qatori har update'da qayta yozilmaydi.
+    Cheklangan foydalanuvchi keyingi token kelguncha xotirada eslab qolinadi: uning so'rovlari bazaga bormaydi.
+    """
+
+    PURGE_EVERY = 1000  # shuncha tekshiruvdan keyin eskirgan bucket'lar tozalanadi
+
+    def __init__(self, user_limit, chat_limit, global_limit, time_limit, max_tracked):
+        self.user = (user_limit, user_limit / time_limit)
+        # Sig'im kamida 1 token, aks holda worker ko'p bo'lganda hech narsa o'tmaydi
+        chat_limit = max(chat_limit / WORKER_COUNT, 1)
+        self.chats = BucketTable(chat_limit, chat_limit / time_limit, max_tracked)
+        self.global_bucket = _global_table(global_limit and max(global_limit / WORKER_COUNT, 1))
+        self.time_limit = time_limit
+        self.max_tracked = max_tracked
+        self._blocked = OrderedDict()  # user_id -> cheklov tugaydigan vaqt (time.monotonic())
+        self._checks = 0
+
+    def _block(self, user_id, until):
+        self._blocked[user_id] = until
+        self._blocked.move_to_end(user_id)
+        while len(self._blocked) > self.max_tracked:
+            self._blocked.popitem(last=False)
+
+    def _local(self, table, key, now):
+        """Jarayon ichidagi bucket: ruxsat bo'lmasa keyingi tokengacha sekund, aks holda None."""
+        bucket = table.get(key, now)
+        if table.consume(bucket, now):
+            return None
+        return (1 - bucket.tokens) / table.rate
+
+    async def allow(self, user_id, chat_id):
+        now = time.monotonic()
+        until = self._blocked.get(user_id)
+        if until is not None:
+            if until > now:
+                return False, False  # ogohlantirish cheklov boshlanganda yuborilgan
+            del self._blocked[user_id]
+
+        self._checks += 1
+        if self._checks % self.PURGE_EVERY == 0:
+            await purge_throttle(time.time() - self.time_limit * 10)
+        allowed, warn, wait = await consume_token(f"u:{user_id}", *self.user, time.time())
+        if not allowed:
+            self._block(user_id, now + wait)
+            return False, warn
+
+        wait = self._local(self.chats, chat_id, now) if chat_id is not None else None
+        if wait is None and self.global_bucket is not None:
+            wait = self._local(self.global_bucket, None, now)
+        if wait is not None:
+            # Chat/global limit: foydalanuvchi ogohlantirilmaydi, lekin keyingi tokengacha bazaga bormaydi
+            self._block(user_id, now + wait)
+            return False, False
+        return True, False
+
+
+LIMITERS = {
+    "memory": MemoryLimiter,
+    "sqlite": SQLiteLimiter,
+}
+
+
 class ThrottlingMiddleware(BaseMiddleware):
-    def __init__(self, rate_limit=3, time_limit=2):
+    def __init__(self, rate_limit=3, time_limit=2, chat_rate_limit=None, global_rate_limit=None, max_tracked=10000,
+                 backend=None):
         """
-        rate_limit: nechta so'rovga ruxsat
+        rate_limit: nechta so'rovga ruxsat (bitta foydalanuvchi)
         time_limit: qancha vaqt oralig'ida (sekund)
+        chat_rate_limit: bitta chat uchun time_limit ichida ruxsat (standart: rate_limit * 2)
+        global_rate_limit: butun bot uchun sekundiga ruxsat etilgan so'rovlar (standart: cheklanmagan;
+                           past qiymat bir-biriga aloqasi yo'q foydalanuvchilarning oddiy so'rovlarini ham kesadi)
+        max_tracked: xotirada saqlanadigan user/chat bucket'lar soni ("memory" uchun)
+        backend: "memory" yoki "sqlite" (worker'lar orasida umumiy limit). Standart: bir nechta worker
+                 bo'lsa SHARED_BACKEND, bitta jarayonda "memory" — bo'lishadigan hech narsa yo'q,
+                 har update'da bazaga yozish esa flood paytida haqiqiy yozuvlar bilan navbat talashadi.
         """
+        if backend is None:
+            backend = SHARED_BACKEND if WORKER_COUNT > 1 else "memory"
         self.rate_limit = rate_limit
         self.time_limit = time_limit
-        self.user_last_time = defaultdict(list)
+        chat_rate_limit = chat_rate_limit or rate_limit * 2
+        self.limiter = LIMITERS[backend](rate_limit, chat_rate_limit, global_rate_limit, time_limit, max_tracked)
         super().__init__()
 
     async def on_process_message(self, message: types.Message, data: dict):
-        user_id = message.from_user.id
-        now = time.time()
-        
-        # Foydalanuvchining so'nggi so'rovlari vaqtlarini tozalash
-        self.user_last_time[user_id] = [t for t in self.user_last_time[user_id] if now - t < self.time_limit]
-        
-        if len(self.user_last_time[user_id]) >= self.rate_limit:
-            # So'rovlar soni chegaradan oshdi
-            await message.answer("⏳ Juda ko'p so'rov yubordingiz. Biroz kuting.")
+        allowed, warn = await self.limiter.allow(message.from_user.id, message.chat.id)
+        if not allowed:
+            if warn:
+                await message.answer(THROTTLED_TEXT)
             raise CancelHandler()  # So'rovni bekor qilish
-        
-        self.user_last_time[user_id].append(now)
\ No newline at end of file
+
+    async def on_process_callback_query(self, callback: types.CallbackQuery, data: dict):
+        chat_id = callback.message.chat.id if callback.message else None
+        allowed, warn = await self.limiter.allow(callback.from_user.id, chat_id)
+        if not allowed:
+            # Callback'ga baribir javob beriladi, aks holda tugma "yuklanmoqda" holatida qoladi
+            await callback.answer(THROTTLED_TEXT if warn else None)
+            raise CancelHandler()
@@ -0,0 +1,193 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+
+from aiogram.utils.exceptions import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096
+
+
+def _consume_exception(future):
+    # Natijasi kutilmagan future'lar uchun "exception was never retrieved" ogohlantirishini oldini olish
+    if not future.cancelled():
+        future.exception()
+
+
+class _Item:
+    __slots__ = ("text", "kwargs", "futures", "retries")
+
+    def __init__(self, text, kwargs, future):
+        self.text = text
+        self.kwargs = kwargs
+        self.futures = [future]
+        self.retries = 0
+
+    def finish(self, result=None, exception=None):
+        for future in self.futures:
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+    def can_merge(self, other):
+        # Faqat tugmasiz/parametrsiz oddiy matnlar birlashtiriladi
+        return (
+            not self.kwargs and not other.kwargs
+            and len(self.text) + 2 + len(other.text) <= MAX_MESSAGE_LENGTH
+        )
+
+
+class OutboundQueue:
+    """
+    Chiquvchi xabarlar navbati: Telegram flood limitlariga rioya qiladi.
+    - har bir chatga per_chat_interval sekundda ko'pi bilan bitta xabar
+    - butun bot bo'yicha sekundiga global_rate ta xabar
+    - 429 (RetryAfter) bo'lsa, ko'rsatilgan vaqt kutiladi va qayta yuboriladi
+    - bitta chatga navbatda turgan oddiy matnlar bitta xabarga birlashtiriladi
+    - so'rovlar javobi kutilmasdan alohida task'larda yuboriladi (bir vaqtda ko'pi bilan max_in_flight ta),
+      shuning uchun tezlik API kechikishiga (1 / RTT) bog'liq emas; bitta chatga esa baribir navbat bilan
+    """
+
+    def __init__(self, bot, per_chat_interval=1.0, global_rate=30, max_retries=5, max_in_flight=30):
+        self.bot = bot
+        self.per_chat_interval = per_chat_interval
+        self.global_interval = 1.0 / global_rate
+        self.max_retries = max_retries
+        self.max_in_flight = max_in_flight
+        self._pending = {}      # chat_id -> deque[_Item]
+        self._last_sent = {}    # chat_id -> oxirgi yuborilgan vaqt
+        self._schedule = []     # heap: (vaqt, tartib, chat_id)
+        self._counter = itertools.count()
+        self._next_global = 0.0
+        self._wakeup = None
+        self._worker = None
+        self._slots = None      # asyncio.Semaphore(max_in_flight), loop ichida yaratiladi
+        self._in_flight = set()
+
+    def qsize(self):
+        return sum(len(items) for items in self._pending.values())
+
+    def send_message(self, chat_id, text, **kwargs):
+        """
+        Xabarni navbatga qo'yadi va asyncio.Future qaytaradi (natija - yuborilgan Message).
+        Natijani kutish shart emas: handler darhol qaytishi mumkin.
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        future.add_done_callback(_consume_exception)
+        item = _Item(text, kwargs, future)
+        items = self._pending.get(chat_id)
+        if items is None:
+            items = self._pending[chat_id] = deque()
+            ready_at = self._last_sent.get(chat_id, 0.0) + self.per_chat_interval
+            self._push(chat_id, max(ready_at, time.monotonic()))
+        if items and items[-1].can_merge(item):
+            last = items[-1]
+            last.text += "\n\n" + item.text
+            last.futures.append(future)
+        else:
+            items.append(item)
+        return future
+
+    def _push(self, chat_id, ready_at):
+        heapq.heappush(self._schedule, (ready_at, next(self._counter), chat_id))
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            if not self._schedule:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            ready_at, _, chat_id = self._schedule[0]
+            now = time.monotonic()
+            if ready_at > now:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), ready_at - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._schedule)
+
+            # Global tezlik: xabarlar orasida kamida global_interval
+            delay = self._next_global - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_global = max(now, self._next_global) + self.global_interval
+
+            # Javob kutilmaydi: keyingi xabar tezlik bo'yicha darhol navbatga chiqadi.
+            # Chat jadvalga faqat yuborish tugagach qaytadi, shuning uchun bitta chatda tartib saqlanadi
+            await self._slots.acquire()
+            task = asyncio.get_running_loop().create_task(self._send_next(chat_id))
+            self._in_flight.add(task)
+            task.add_done_callback(self._sent)
+
+    def _sent(self, task):
+        self._in_flight.discard(task)
+        self._slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Outbound xatosi: {task.exception()!r}")
+
+    async def _send_next(self, chat_id):
+        # Yuborilayotgan xabar navbatdan olinadi, shunda unga yangi matn qo'shilib qolmaydi
+        items = self._pending[chat_id]
+        item = items.popleft()
+        try:
+            result = await self.bot.send_message(chat_id, item.text, **item.kwargs)
+        except RetryAfter as e:
+            item.retries += 1
+            if item.retries <= self.max_retries:
+                logger.info(f"Flood limit: {chat_id} uchun {e.timeout} s kutiladi")
+                items.appendleft(item)
+                now = time.monotonic()
+                self._last_sent[chat_id] = now
+                self._push(chat_id, now + e.timeout)
+                return
+            item.finish(exception=e)
+        except Exception as e:
+            logger.warning(f"Xabar {chat_id} ga yuborilmadi: {e}")
+            item.finish(exception=e)
+        else:
+            item.finish(result=result)
+
+        now = time.monotonic()
+        self._last_sent[chat_id] = now
+        if items:
+            self._push(chat_id, now + self.per_chat_interval)
+        else:
+            del self._pending[chat_id]
+            self._prune(now)
+
+    def _prune(self, now):
+        # Interval o'tib ketgan chatlar haqidagi ma'lumot endi kerak emas
+        if len(self._last_sent) > 10000:
+            self._last_sent = {
+                chat_id: sent for chat_id, sent in self._last_sent.items()
+                if now - sent < self.per_chat_interval
+            }
+
+    async def close(self, timeout=10):
+        """Navbatdagi xabarlar yuborilishini kutadi va ishchini to'xtatadi."""
+        futures = [f for items in self._pending.values() for item in items for f in item.futures]
+        futures += self._in_flight
+        if futures:
+            await asyncio.wait(futures, timeout=timeout)
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for task in list(self._in_flight):
+            task.cancel()
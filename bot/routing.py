@@ -0,0 +1,193 @@
+from collections import namedtuple
+
+from aiogram import types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+# Topilgan yo'nalish: handler va unga uzatiladigan argumentlar (callback payload)
+Route = namedtuple("Route", ["handler", "args"])
+
+
+class _Node:
+    __slots__ = ("children", "exact", "prefix")
+
+    def __init__(self):
+        self.children = {}
+        self.exact = None   # handler: callback_data aynan shu satr
+        self.prefix = None  # (handler, parser): shu satr + payload, parser(payload) -> argumentlar tuple
+
+
+class Router:
+    """
+    Update'larni handlerlarga O(1) da yo'naltiradi (aiogram'ning filtrlarni ketma-ket tekshirishi o'rniga):
+      - buyruqlar va reply tugma matnlari — lug'atdan;
+      - callback_data — prefiks daraxtidan (eng uzun mos prefiks), payload tipga o'giriladi;
+      - suhbat holati (parol tiklash, ro'yxatdan o'tish, ...) — await state(user_id) bitta chaqiruvi,
+        faqat middleware'lardan (throttling) keyin va faqat buyruq bo'lmagan matnli xabarlar uchun.
+
+    Xabarlar uchun tartib: buyruq -> suhbat holati -> reply tugma -> fallback (ketma-ket, oz sonli).
+    Dispatcher'da bitta message va bitta callback handler ro'yxatdan o'tadi; haqiqiy handler
+    data["route"] ga yoziladi (PerfMiddleware uni shu nom bilan o'lchaydi).
+    """
+
+    def __init__(self, state=None):
+        self.state = state  # await state(user_id) -> holat nomi yoki None
+        self.commands = {}
+        self.texts = {}
+        self.states = {}
+        self.fallbacks = []
+        self.stale_callback = None
+        self._callbacks = _Node()
+
+    # -------------------- Ro'yxatdan o'tkazish (dekoratorlar) --------------------
+    def command(self, *names):
+        def decorator(handler):
+            for name in names:
+                self.commands[name.lower()] = handler
+            return handler
+        return decorator
+
+    def text(self, *texts):
+        def decorator(handler):
+            for text in texts:
+                self.texts[text] = handler
+            return handler
+        return decorator
+
+    def on_state(self, *names):
+        """Faqat matnli xabarlar uchun: state(user_id) shu nomlardan birini qaytarsa."""
+        def decorator(handler):
+            for name in names:
+                self.states[name] = handler
+            return handler
+        return decorator
+
+    def fallback(self, predicate):
+        """Yuqoridagilarga tushmagan xabarlar uchun, ro'yxatdan o'tish tartibida tekshiriladi."""
+        def decorator(handler):
+            self.fallbacks.append((predicate, handler))
+            return handler
+        return decorator
+
+    def _register_callback(self, prefix, handler, parser):
+        node = self._callbacks
+        for char in prefix:
+            node = node.children.setdefault(char, _Node())
+        if parser is None:
+            node.exact = handler
+        else:
+            node.prefix = (handler, parser)
+
+    def callback(self, prefix, parser=None):
+        """
+        parser berilmasa — callback_data aynan prefix ga teng bo'lishi kerak.
+        parser berilsa — prefix dan keyingi qism parser(payload) bilan o'giriladi va handler(callback, payload)
+        chaqiriladi; ValueError bo'lsa, callback hech qaysi handlerga tushmaydi.
+        """
+        def decorator(handler):
+            self._register_callback(prefix, handler, parser and (lambda payload: (parser(payload),)))
+            return handler
+        return decorator
+
+    def action(self, item):
+        """bot/callbacks.py dagi amal: maydonlari handler(callback, *maydonlar) ga uziladi."""
+        def decorator(handler):
+            self._register_callback(item.prefix, handler, item.unpack if item.fields else None)
+            return handler
+        return decorator
+
+    def stale(self, handler):
+        """Hech qaysi amalga mos kelmagan callback'lar (eski versiya, eskirgan tugmalar) uchun."""
+        self.stale_callback = handler
+        return handler
+
+    # -------------------- Qidirish --------------------
+    def route_message(self, message: types.Message):
+        """Buyruq, reply tugma yoki fallback — faqat lug'atlar, bazaga murojaat yo'q (filtr bosqichi)."""
+        text = message.text
+        if text is not None:
+            if message.is_command():
+                handler = self.commands.get(message.get_command(pure=True).lower())
+                if handler is not None:
+                    return Route(handler, ())
+            handler = self.texts.get(text)
+            if handler is not None:
+                return Route(handler, ())
+        for predicate, handler in self.fallbacks:
+            if predicate(message):
+                return Route(handler, ())
+        return None
+
+    def needs_state(self, message: types.Message):
+        """Ma'lum buyruq bo'lmagan matnli xabarni suhbat holati o'ziga olishi mumkin."""
+        if message.text is None or self.state is None or not self.states:
+            return False
+        return not (message.is_command() and message.get_command(pure=True).lower() in self.commands)
+
+    async def route_state(self, message: types.Message, route):
+        """Suhbat holati bo'yicha handler (holat reply tugma va fallback'dan ustun), aks holda route."""
+        handler = self.states.get(await self.state(message.from_user.id))
+        return Route(handler, ()) if handler is not None else route
+
+    async def resolve_message(self, message: types.Message):
+        """Filtr va middleware bosqichlari birgalikda: yakuniy Route yoki None."""
+        route = self.route_message(message)
+        if self.needs_state(message):
+            route = await self.route_state(message, route)
+        return route
+
+    def route_callback(self, data):
+        node = self._callbacks
+        match = None
+        for index, char in enumerate(data):
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.prefix is not None:
+                match = (node.prefix, index + 1)
+        else:
+            if node.exact is not None:
+                return Route(node.exact, ())
+        if match is not None:
+            (handler, parser), end = match
+            try:
+                return Route(handler, parser(data[end:]))
+            except ValueError:
+                pass
+        return Route(self.stale_callback, ()) if self.stale_callback is not None else None
+
+    # -------------------- Dispatcher bilan bog'lash --------------------
+    def setup(self, dp):
+        # Filtrlar middleware'lardan oldin ishlaydi: bu yerda faqat lug'atlar. Suhbat holati (bazadan o'qiladi)
+        # _StateMiddleware da — ThrottlingMiddleware flood'ni tashlab yuborganidan keyin.
+        async def message_filter(message: types.Message):
+            route = self.route_message(message)
+            if route is None and not self.needs_state(message):
+                return False
+            return {"route": route}
+
+        async def callback_filter(callback: types.CallbackQuery):
+            route = self.route_callback(callback.data or "")
+            return {"route": route} if route is not None else False
+
+        async def dispatch_message(message: types.Message, route):
+            if route is not None:
+                return await route.handler(message, *route.args)
+
+        async def dispatch_callback(callback: types.CallbackQuery, route):
+            return await route.handler(callback, *route.args)
+
+        dp.middleware.setup(_StateMiddleware(self))
+        dp.register_message_handler(dispatch_message, message_filter, content_types=types.ContentTypes.ANY)
+        dp.register_callback_query_handler(dispatch_callback, callback_filter)
+
+
+class _StateMiddleware(BaseMiddleware):
+    """Router.setup() da oxirgi bo'lib o'rnatiladi: holat faqat o'tkazib yuborilgan xabarlar uchun o'qiladi."""
+
+    def __init__(self, router):
+        self.router = router
+        super().__init__()
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        if "route" in data and self.router.needs_state(message):
+            data["route"] = await self.router.route_state(message, data["route"])
@@ -0,0 +1,191 @@
+import json
+import time
+from collections import OrderedDict
+
+from bot.config import SHARED_BACKEND
+from database import aio
+
+
+class SessionStore:
+    """
+    Sessiyalar ombori uchun umumiy interfeys. Barcha metodlar await qilinadi:
+    SQLite ombori so'rovlarni DB thread'larida bajaradi (database.aio), event loop to'xtamaydi.
+        await store.get(key), await store.set(key, value), await store.pop(key), await store.contains(key)
+    Qiymat o'zgartirilsa, uni qayta yozish kerak: `await store.set(key, session)`.
+    """
+
+    def __init__(self, namespace, ttl):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    async def get(self, key, default=None):
+        raise NotImplementedError
+
+    async def set(self, key, value):
+        raise NotImplementedError
+
+    async def pop(self, key, default=None):
+        raise NotImplementedError
+
+    async def contains(self, key):
+        return await self.get(key) is not None
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Jarayon xotirasidagi sessiyalar, TTL bilan.
+    Barcha yozuvlar uchun TTL bir xil, shuning uchun yozilish tartibi = tugash tartibi:
+    eskirganlar ro'yxat boshidan O(1) da o'chiriladi.
+    """
+
+    def __init__(self, namespace, ttl):
+        super().__init__(namespace, ttl)
+        self._data = OrderedDict()  # key -> (value, expires_at)
+
+    def _evict(self, now):
+        while self._data:
+            value, expires_at = next(iter(self._data.values()))
+            if expires_at > now:
+                break
+            self._data.popitem(last=False)
+
+    async def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None or item[1] <= time.time():
+            return default
+        return item[0]
+
+    async def set(self, key, value):
+        now = time.time()
+        self._data[key] = (value, now + self.ttl)
+        self._data.move_to_end(key)
+        self._evict(now)
+
+    async def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        if item is None or item[1] <= time.time():
+            return default
+        return item[0]
+
+    def __len__(self):
+        self._evict(time.time())
+        return len(self._data)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite'dagi sessiyalar: bot qayta ishga tushganda saqlanib qoladi va
+    bir nechta jarayon (worker) orasida umumiy bo'ladi. Qiymatlar JSON ko'rinishida.
+    """
+
+    PURGE_EVERY = 1000  # shuncha yozuvdan keyin eskirgan sessiyalar tozalanadi
+
+    def __init__(self, namespace, ttl):
+        super().__init__(namespace, ttl)
+        self._writes = 0
+
+    async def get(self, key, default=None):
+        value = await aio.get_session(self.namespace, key)
+        return default if value is None else json.loads(value)
+
+    async def set(self, key, value):
+        await aio.set_session(self.namespace, key, json.dumps(value), int(time.time() + self.ttl))
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            await aio.purge_expired_sessions()
+
+    async def pop(self, key, default=None):
+        value = await self.get(key)
+        await aio.delete_session(self.namespace, key)
+        return default if value is None else value
+
+
+class FlowStore(SessionStore):
+    """
+    Suhbat jarayoni (parol tiklash, ro'yxatdan o'tish, ...) sessiyalari. Barcha jarayonlar bitta
+    umumiy `conversations` omborida turadi: foydalanuvchi bir vaqtda faqat bitta jarayonda bo'ladi
+    va uning holati bitta so'rov bilan aniqlanadi (current_flow). Har bir jarayonning o'z TTL i bor.
+    """
+
+    def __init__(self, conversations, flow, ttl):
+        super().__init__(flow, ttl)
+        self.conversations = conversations
+
+    async def get(self, key, default=None):
+        item = await self.conversations.get(key)
+        if item is None or item["flow"] != self.namespace or item["expires_at"] <= time.time():
+            return default
+        return item["data"]
+
+    async def set(self, key, value):
+        await self.conversations.set(key, {"flow": self.namespace, "data": value, "expires_at": time.time() + self.ttl})
+
+    async def pop(self, key, default=None):
+        value = await self.get(key)
+        if value is None:
+            return default
+        await self.conversations.pop(key)
+        return value
+
+
+async def current_flow(conversations, key):
+    """Foydalanuvchi hozir qaysi jarayonda (FlowStore nomi) yoki None."""
+    item = await conversations.get(key)
+    if item is None or item["expires_at"] <= time.time():
+        return None
+    return item["flow"]
+
+
+class AuthCache:
+    """
+    Kirgan foydalanuvchilar shu jarayon xotirasida (ban keshi kabi): har xabardagi tekshiruv — lug'atdan qidirish.
+    Manba — store (qiymat: kirish tugaydigan vaqt); keshda yo'q foydalanuvchi bir marta store'dan o'qiladi.
+    Chiqarish (discard) auth_version ni oshiradi; boshqa worker'lar sync() da o'zgarishni ko'rib keshni tozalaydi.
+    """
+
+    RECHECK = 60  # eski formatdagi (True) yozuv shuncha sekunddan keyin qayta o'qiladi
+
+    def __init__(self, store):
+        self.store = store
+        self._expires = {}  # user_id -> kirish tugaydigan vaqt
+        self._version = None
+
+    async def contains(self, key):
+        now = time.time()
+        expires_at = self._expires.get(key)
+        if expires_at is not None:
+            if expires_at > now:
+                return True
+            del self._expires[key]
+        value = await self.store.get(key)
+        if value is None:
+            return False
+        self._expires[key] = value if isinstance(value, float) else now + self.RECHECK
+        return True
+
+    async def add(self, key):
+        expires_at = time.time() + self.store.ttl
+        await self.store.set(key, expires_at)
+        self._expires[key] = expires_at
+
+    async def discard(self, key):
+        self._expires.pop(key, None)
+        await self.store.pop(key)
+        await aio.bump_auth_version()
+
+    async def sync(self):
+        """auth_version o'zgargan bo'lsa (boshqa worker kimnidir chiqargan) keshni tozalaydi."""
+        version = await aio.get_auth_version()
+        if version != self._version:
+            self._expires.clear()
+            self._version = version
+
+
+BACKENDS = {
+    "memory": MemorySessionStore,
+    "sqlite": SQLiteSessionStore,
+}
+
+
+def create_store(namespace, ttl, backend=SHARED_BACKEND):
+    return BACKENDS[backend](namespace, ttl)
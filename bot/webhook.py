@@ -0,0 +1,76 @@
+import asyncio
+import logging
+
+from aiohttp import web
+from aiogram.dispatcher.webhook import WebhookRequestHandler
+from aiogram.utils.executor import Executor
+
+from bot.config import (
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_MAX_CONNECTIONS,
+    MAX_CONCURRENT_UPDATES, WEBAPP_HOST, WEBAPP_PORT, WEBAPP_REUSE_PORT, WEBHOOK_SETUP
+)
+from bot.health import PROMETHEUS_CONTENT_TYPE, health_status, metrics_text
+from database.aio import run
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class LimitedWebhookHandler(WebhookRequestHandler):
+    """
+    Telegram update'larini qabul qiladi: maxfiy token tekshiriladi va
+    bir vaqtda ko'pi bilan MAX_CONCURRENT_UPDATES ta update qayta ishlanadi
+    (qolganlari navbatda kutadi, Telegram esa javobni kutib turadi).
+    """
+
+    async def post(self):
+        if WEBHOOK_SECRET and self.request.headers.get(SECRET_HEADER) != WEBHOOK_SECRET:
+            raise web.HTTPUnauthorized()
+        async with self.request.app["update_slots"]:
+            return await super().post()
+
+
+async def health_view(request):
+    status, result = await run(health_status)
+    return web.json_response(result, status=status)
+
+
+async def metrics_view(request):
+    text = await run(metrics_text)
+    return web.Response(body=text.encode("utf-8"), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
+
+async def _set_webhook(dp):
+    await dp.bot.set_webhook(
+        WEBHOOK_URL,
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+        secret_token=WEBHOOK_SECRET or None,
+    )
+    logger.info(f"Webhook o'rnatildi: {WEBHOOK_URL}")
+
+
+def start_webhook(dp, on_startup=None, on_shutdown=None):
+    """
+    Botni webhook rejimida ishga tushiradi: bitta aiohttp serveri update'larni,
+    /health va /metrics ni bitta portda xizmat qiladi.
+    Bir nechta nusxa load balancer ortida ishlashi mumkin, shuning uchun
+    to'xtashda webhook o'chirilmaydi va kutilayotgan update'lar tashlab yuborilmaydi.
+    """
+    if not WEBHOOK_URL.startswith("https://"):
+        raise RuntimeError("Webhook rejimi uchun WEBHOOK_HOST https:// bilan boshlanishi kerak")
+
+    web_app = web.Application()
+    web_app["update_slots"] = asyncio.Semaphore(MAX_CONCURRENT_UPDATES)
+    web_app.router.add_get("/health", health_view)
+    web_app.router.add_get("/metrics", metrics_view)
+
+    executor = Executor(dp, skip_updates=False)
+    if on_startup:
+        executor.on_startup(on_startup)
+    if WEBHOOK_SETUP:
+        executor.on_startup(_set_webhook)
+    if on_shutdown:
+        executor.on_shutdown(on_shutdown)
+    executor.set_webhook(WEBHOOK_PATH, request_handler=LimitedWebhookHandler, web_app=web_app)
+    executor.run_app(host=WEBAPP_HOST, port=WEBAPP_PORT, reuse_port=WEBAPP_REUSE_PORT or None)
@@ -0,0 +1,62 @@
+# Bir nechta bot worker'ini ishga tushirish: python -m bot.workers [N]
+#
+# Har bir worker alohida jarayon (o'z event loop'i bilan) webhook rejimida ishlaydi,
+# hammasi bitta portni tinglaydi (SO_REUSEPORT) va holatni SQLite orqali bo'lishadi.
+# Long polling'da faqat bitta jarayon update olishi mumkin, shuning uchun bu yerda faqat webhook.
+import os
+import signal
+import subprocess
+import sys
+
+from bot.config import SHARED_BACKEND, WEBHOOK_URL, WORKER_ID
+from database.models import init_db
+
+
+def spawn_worker(index, count):
+    env = dict(
+        os.environ,
+        BOT_MODE="webhook",
+        WORKER_ID=f"{WORKER_ID}-{index}",
+        WORKER_COUNT=str(count),
+        WEBAPP_REUSE_PORT="1",
+        # setWebhook bir marta yetarli
+        WEBHOOK_SETUP="1" if index == 0 else "0",
+    )
+    return subprocess.Popen([sys.executable, "-m", "bot.main"], env=env)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    if SHARED_BACKEND != "sqlite":
+        sys.exit("❌ Bir nechta worker uchun SHARED_BACKEND=sqlite bo'lishi kerak.")
+    if not WEBHOOK_URL.startswith("https://"):
+        sys.exit("❌ Bir nechta worker faqat webhook rejimida ishlaydi: WEBHOOK_HOST ni o'rnating.")
+
+    # Sxema bir marta, worker'lar ishga tushishidan oldin yangilanadi
+    init_db()
+    workers = [spawn_worker(index, count) for index in range(count)]
+
+    def stop(signum, frame):
+        for worker in workers:
+            if worker.poll() is None:
+                worker.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Bitta worker to'xtasa, qolganlari ham to'xtatiladi (orkestrator butun guruhni qayta ishga tushiradi)
+    exit_code = 0
+    while workers:
+        pid, status = os.wait()
+        finished = [worker for worker in workers if worker.pid == pid]
+        if not finished:
+            continue
+        workers.remove(finished[0])
+        finished[0].returncode = os.waitstatus_to_exitcode(status)
+        exit_code = exit_code or finished[0].returncode
+        stop(None, None)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
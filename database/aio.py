@@ -0,0 +1,106 @@
+"""
+database.db funksiyalarining async (await qilinadigan) ekvivalentlari.
+
+Handlerlar shu moduldan foydalanadi: har bir so'rov alohida DB thread'larida
+bajariladi, shuning uchun sekin so'rov event loop'ni to'xtatib qo'ymaydi.
+Skriptlar uchun sinxron database.db API o'zgarmagan.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from database import db
+from database.connection import READER_POOL_SIZE
+
+# Bir vaqtda navbatda turishi mumkin bo'lgan so'rovlar soni (navbat chegarasi)
+MAX_PENDING = 256
+
+# O'quvchi ulanishlar soni + bitta yozuvchi
+_executor = ThreadPoolExecutor(max_workers=READER_POOL_SIZE + 1, thread_name_prefix="db")
+_slots = asyncio.Semaphore(MAX_PENDING)
+
+
+async def run(func, *args, **kwargs):
+    """Sinxron funksiyani DB thread'ida bajaradi; navbat to'lsa, joy bo'shashini kutadi."""
+    async with _slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def _async(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+    return wrapper
+
+
+# Parol funksiyalari DB'ga murojaat qilmaydi, ular o'zgarishsiz qoladi
+hash_password = db.hash_password
+check_password = db.check_password
+
+# -------------------- Settings --------------------
+get_setting = _async(db.get_setting)
+set_setting = _async(db.set_setting)
+get_data_version = _async(db.get_data_version)
+get_auth_version = _async(db.get_auth_version)
+bump_auth_version = _async(db.bump_auth_version)
+
+# -------------------- Users --------------------
+add_user = _async(db.add_user)
+get_user = _async(db.get_user)
+update_user_phone_name = _async(db.update_user_phone_name)
+get_all_users = _async(db.get_all_users)
+ban_user = _async(db.ban_user)
+unban_user = _async(db.unban_user)
+delete_user = _async(db.delete_user)
+refresh_ban_cache = _async(db.refresh_ban_cache)
+sync_ban_cache = _async(db.sync_ban_cache)
+
+
+async def is_user_banned(user_id):
+    # Eng ko'p bajariladigan tekshiruv: kesh yangi bo'lsa, thread'ga o'tmasdan javob beriladi
+    banned = db.cached_banned_ids()
+    if banned is None:
+        return await run(db.is_user_banned, user_id)
+    return user_id in banned
+
+# -------------------- Clients --------------------
+add_client = _async(db.add_client)
+get_clients = _async(db.get_clients)
+get_clients_page = _async(db.get_clients_page)
+delete_client = _async(db.delete_client)
+delete_clients = _async(db.delete_clients)
+get_client_id_by_ordinal = _async(db.get_client_id_by_ordinal)
+get_client_ordinal = _async(db.get_client_ordinal)
+resolve_client_ordinals = _async(db.resolve_client_ordinals)
+get_client_ordinals = _async(db.get_client_ordinals)
+
+# -------------------- Orders --------------------
+add_order = _async(db.add_order)
+add_records_bulk = _async(db.add_records_bulk)
+get_orders = _async(db.get_orders)
+get_orders_page = _async(db.get_orders_page)
+delete_order = _async(db.delete_order)
+delete_orders = _async(db.delete_orders)
+count_orders_before = _async(db.count_orders_before)
+delete_orders_before = _async(db.delete_orders_before)
+
+# -------------------- Statistics --------------------
+get_sales_stats = _async(db.get_sales_stats)
+
+# -------------------- Search --------------------
+search_clients = _async(db.search_clients)
+search_orders = _async(db.search_orders)
+
+# -------------------- Sessions --------------------
+get_session = _async(db.get_session)
+set_session = _async(db.set_session)
+delete_session = _async(db.delete_session)
+purge_expired_sessions = _async(db.purge_expired_sessions)
+
+# -------------------- Throttling --------------------
+consume_token = _async(db.consume_token)
+purge_throttle = _async(db.purge_throttle)
+
+# -------------------- Health --------------------
+save_heartbeat = _async(db.save_heartbeat)
@@ -0,0 +1,126 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Ulanishlar soni va SQLite sozlamalari
+READER_POOL_SIZE = 4
+BUSY_TIMEOUT = 5.0               # sekund, qulf bo'shashini kutish
+CACHE_SIZE_KB = 16 * 1024        # har bir ulanish uchun sahifa keshi (16 MB)
+MMAP_SIZE = 128 * 1024 * 1024    # 128 MB
+
+
+def _configure(conn):
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+
+
+class ConnectionManager:
+    """
+    Bitta yozuvchi (writer) va bir nechta o'quvchi (reader) ulanishlar to'plami.
+    Ulanishlar bir marta ochilib sozlanadi va barcha funksiyalar uchun qayta ishlatiladi.
+    fork qilingan jarayon ota jarayon ulanishlaridan foydalanmaydi - o'zinikini ochadi.
+    """
+
+    def __init__(self, path, readers=READER_POOL_SIZE):
+        self.path = path
+        self.readers = readers
+        self._lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+        self._pool = queue.LifoQueue()
+        self._all_readers = []
+        self._pid = os.getpid()
+
+    def _check_pid(self):
+        # SQLite ulanishini fork'dan keyin ishlatib bo'lmaydi: eskilari yopilmasdan tashlab yuboriladi
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._writer = None
+            self._writer_lock = threading.RLock()
+            self._writer_depth = 0
+            self._pool = queue.LifoQueue()
+            self._all_readers = []
+            self._pid = os.getpid()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT,
+            check_same_thread=False,
+            isolation_level=None,  # tranzaksiyalarni o'zimiz boshqaramiz
+        )
+        _configure(conn)
+        return conn
+
+    def _acquire_reader(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all_readers) < self.readers:
+                conn = self._connect()
+                self._all_readers.append(conn)
+                return conn
+        return self._pool.get()
+
+    @contextmanager
+    def reader(self):
+        self._check_pid()
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """
+        Yozish tranzaksiyasi: blok muvaffaqiyatli tugasa COMMIT, xatoda ROLLBACK.
+        Ichma-ich chaqirilsa, faqat tashqi blok tranzaksiyani boshqaradi.
+        """
+        self._check_pid()
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            conn = self._writer
+            if self._writer_depth:
+                self._writer_depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._writer_depth -= 1
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            self._writer_depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                try:
+                    conn.execute("COMMIT")
+                except sqlite3.Error:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                self._writer_depth = 0
+
+    def close(self):
+        with self._writer_lock, self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers = []
+            self._pool = queue.LifoQueue()
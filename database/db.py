@@ -1,27 +1,92 @@
+import atexit
+import functools
+from array import array
+from bisect import bisect_left
 import sqlite3
+import threading
+import time
 from datetime import datetime
 import hashlib
+import os
+import re
 
-DB_PATH = "database/crm.db"
+from database.connection import ConnectionManager
 
-def _enable_foreign_keys(conn):
-    conn.execute("PRAGMA foreign_keys = ON")
+# Benchmark va testlar boshqa faylni ko'rsatishi mumkin
+DB_PATH = os.getenv("DB_PATH", "database/crm.db")
+
+# Barcha funksiyalar uchun umumiy ulanishlar (har chaqiruvda connect/close qilinmaydi)
+_db = ConnectionManager(DB_PATH)
+atexit.register(_db.close)
+
+# -------------------- Instrumentation --------------------
+# observer(funksiya_nomi, sekund) — har bir ochiq DB funksiyasidan keyin chaqiriladi (bot/metrics.py).
+# Ichki chaqiruvlar (_get_setting, _refresh_ban_cache, ...) o'lchanmaydi: vaqt ikki marta hisoblanmaydi.
+# iter_orders generator: vaqti iste'molchi tomonda o'tadi, shuning uchun o'lchanmaydi
+_query_observer = None
+
+def set_query_observer(observer):
+    global _query_observer
+    _query_observer = observer
+
+def _timed(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        observer = _query_observer
+        if observer is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            observer(func.__name__, time.perf_counter() - start)
+    return wrapper
 
 # -------------------- Settings --------------------
-def get_setting(key):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-    row = cursor.fetchone()
-    conn.close()
+def _get_setting(key):
+    with _db.reader() as conn:
+        row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
     return row[0] if row else None
 
+@_timed
+def get_setting(key):
+    return _get_setting(key)
+
+@_timed
 def set_setting(key, value):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
-    conn.commit()
-    conn.close()
+    with _db.writer() as conn:
+        conn.execute("REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+# Ma'lumotlar versiyasi: klient/buyurtma qo'shilsa yoki o'chirilsa oshiriladi (kesh uchun).
+# clients_version faqat klientlar ro'yxati o'zgarganda oshadi.
+def _bump_version(conn, key):
+    conn.execute("""
+        INSERT INTO settings (key, value) VALUES (?, 1)
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    """, (key,))
+
+def _bump_data_version(conn, clients=False):
+    _bump_version(conn, "data_version")
+    if clients:
+        _bump_version(conn, "clients_version")
+
+def _get_version(key):
+    row = _get_setting(key)
+    return int(row) if row else 0
+
+@_timed
+def get_data_version():
+    return _get_version("data_version")
+
+# Kirgan foydalanuvchi chiqarilganda (ban, o'chirish) oshiriladi: worker'lar auth keshini tozalaydi
+@_timed
+def get_auth_version():
+    return _get_version("auth_version")
+
+@_timed
+def bump_auth_version():
+    with _db.writer() as conn:
+        _bump_version(conn, "auth_version")
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
@@ -30,131 +95,493 @@ def check_password(password, hashed):
     return hash_password(password) == hashed
 
 # -------------------- Users --------------------
+@_timed
 def add_user(user_id, username, first_name, last_name):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     joined_at = datetime.now().strftime("%Y-%m-%d %H:%M")
-    cursor.execute("""
-        INSERT OR IGNORE INTO users (user_id, username, first_name, last_name, joined_at)
-        VALUES (?, ?, ?, ?, ?)
-    """, (user_id, username, first_name, last_name, joined_at))
-    conn.commit()
-    conn.close()
+    with _db.writer() as conn:
+        conn.execute("""
+            INSERT OR IGNORE INTO users (user_id, username, first_name, last_name, joined_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (user_id, username, first_name, last_name, joined_at))
 
+@_timed
 def get_user(user_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT user_id, username, first_name, last_name, is_banned, joined_at, phone, full_name FROM users WHERE user_id = ?", (user_id,))
-    user = cursor.fetchone()
-    conn.close()
-    return user
+    with _db.reader() as conn:
+        return conn.execute("SELECT user_id, username, first_name, last_name, is_banned, joined_at, phone, full_name FROM users WHERE user_id = ?", (user_id,)).fetchone()
 
+@_timed
 def update_user_phone_name(user_id, phone, full_name):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE users SET phone = ?, full_name = ? WHERE user_id = ?", (phone, full_name, user_id))
-    conn.commit()
-    conn.close()
+    with _db.writer() as conn:
+        conn.execute("UPDATE users SET phone = ?, full_name = ? WHERE user_id = ?", (phone, full_name, user_id))
 
+@_timed
 def get_all_users():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT user_id, username, first_name, last_name, is_banned, joined_at, phone, full_name FROM users")
-    users = cursor.fetchall()
-    conn.close()
-    return users
+    with _db.reader() as conn:
+        return conn.execute("SELECT user_id, username, first_name, last_name, is_banned, joined_at, phone, full_name FROM users").fetchall()
 
+@_timed
 def ban_user(user_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE users SET is_banned = 1 WHERE user_id = ?", (user_id,))
-    conn.commit()
-    conn.close()
+    with _ban_lock:
+        with _db.writer() as conn:
+            conn.execute("UPDATE users SET is_banned = 1 WHERE user_id = ?", (user_id,))
+            _bump_version(conn, "bans_version")
+        _ban_cache["ids"].add(user_id)
 
+@_timed
 def unban_user(user_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE users SET is_banned = 0 WHERE user_id = ?", (user_id,))
-    conn.commit()
-    conn.close()
+    with _ban_lock:
+        with _db.writer() as conn:
+            conn.execute("UPDATE users SET is_banned = 0 WHERE user_id = ?", (user_id,))
+            _bump_version(conn, "bans_version")
+        _ban_cache["ids"].discard(user_id)
 
+@_timed
 def is_user_banned(user_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT is_banned FROM users WHERE user_id = ?", (user_id,))
-    row = cursor.fetchone()
-    conn.close()
-    return row[0] == 1 if row else False
+    banned = cached_banned_ids()
+    if banned is None:
+        banned = _refresh_ban_cache()
+    return user_id in banned
 
+@_timed
 def delete_user(user_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
-    conn.commit()
-    conn.close()
+    with _ban_lock:
+        with _db.writer() as conn:
+            conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+            _bump_version(conn, "bans_version")
+        _ban_cache["ids"].discard(user_id)
+
+# -------------------- Ban cache --------------------
+# Bloklangan foydalanuvchilar xotirada: har bir xabardagi tekshiruv - to'plamdan qidirish.
+# ban/unban/delete keshni darhol yangilaydi va bans_version ni oshiradi; boshqa jarayonlar
+# (worker'lar) o'zgarishni sync_ban_cache() orqali ko'radi, eng kechi BAN_CACHE_TTL sekundda.
+BAN_CACHE_TTL = 60
+_ban_lock = threading.Lock()
+_ban_cache = {"ids": set(), "loaded_at": None, "version": None}
+
+def _refresh_ban_cache():
+    with _ban_lock:
+        # Versiya avval o'qiladi: oradagi o'zgarish keyingi sync'da yana qayta o'qishga olib keladi
+        version = _get_version("bans_version")
+        with _db.reader() as conn:
+            ids = {row[0] for row in conn.execute("SELECT user_id FROM users WHERE is_banned = 1")}
+        _ban_cache.update(ids=ids, loaded_at=time.monotonic(), version=version)
+    return ids
+
+@_timed
+def refresh_ban_cache():
+    return _refresh_ban_cache()
+
+@_timed
+def sync_ban_cache():
+    """bans_version o'zgargan bo'lsa keshni qayta o'qiydi; yangilangan bo'lsa True."""
+    if _get_version("bans_version") == _ban_cache["version"]:
+        return False
+    _refresh_ban_cache()
+    return True
+
+def cached_banned_ids():
+    # Kesh yangi bo'lsa to'plamni, eskirgan bo'lsa None qaytaradi
+    loaded_at = _ban_cache["loaded_at"]
+    if loaded_at is None or time.monotonic() - loaded_at > BAN_CACHE_TTL:
+        return None
+    return _ban_cache["ids"]
 
 # -------------------- Clients --------------------
+@_timed
 def add_client(name, phone, address=""):
-    conn = sqlite3.connect(DB_PATH)
-    _enable_foreign_keys(conn)
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO clients(name, phone, address) VALUES(?,?,?)", (name, phone, address))
-    conn.commit()
-    conn.close()
+    with _db.writer() as conn:
+        conn.execute("INSERT INTO clients(name, phone, address) VALUES(?,?,?)", (name, phone, address))
+        _bump_data_version(conn, clients=True)
 
+@_timed
 def get_clients():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, phone, address FROM clients")
-    clients = cursor.fetchall()
-    conn.close()
-    return clients
+    with _db.reader() as conn:
+        return conn.execute("SELECT id, name, phone, address FROM clients ORDER BY id").fetchall()
+
+@_timed
+def get_clients_page(after_id=0, limit=10, before_id=None):
+    # Keyset pagination: after_id dan keyingi yoki before_id dan oldingi `limit` ta klient (id bo'yicha)
+    with _db.reader() as conn:
+        if before_id is not None:
+            rows = conn.execute("SELECT id, name, phone, address FROM clients WHERE id < ? ORDER BY id DESC LIMIT ?",
+                                (before_id, limit)).fetchall()
+            rows.reverse()
+            return rows
+        return conn.execute("SELECT id, name, phone, address FROM clients WHERE id > ? ORDER BY id LIMIT ?",
+                            (after_id, limit)).fetchall()
 
+@_timed
 def delete_client(client_id):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        _enable_foreign_keys(conn)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM clients WHERE id = ?", (client_id,))
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
+        with _db.writer() as conn:
+            cursor = conn.execute("DELETE FROM clients WHERE id = ?", (client_id,))
+            success = cursor.rowcount > 0
+            if success:
+                _bump_data_version(conn, clients=True)
         return success, None
     except sqlite3.Error as e:
         return False, str(e)
 
-# -------------------- Orders --------------------
-def add_order(client_id, product, amount):
-    conn = sqlite3.connect(DB_PATH)
-    _enable_foreign_keys(conn)
-    cursor = conn.cursor()
-    date = datetime.now().strftime("%Y-%m-%d %H:%M")
-    cursor.execute("INSERT INTO orders(client_id, product, amount, date) VALUES(?,?,?,?)",
-                   (client_id, product, amount, date))
-    conn.commit()
-    conn.close()
+@_timed
+def delete_clients(client_ids):
+    """Tanlangan klientlar (buyurtmalari bilan, ON DELETE CASCADE) bitta tranzaksiyada: (o'chirilganlar soni, xato)."""
+    return _delete_by_ids("clients", client_ids, clients=True)
 
-def get_orders():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
+# -------------------- Client ordinals --------------------
+# Ro'yxatdagi tartib raqami (1, 2, ...) <-> client id. Klientlar id bo'yicha tartiblangan,
+# shuning uchun raqam = id lar massividagi o'rin. Massiv ixcham (array) va faqat
+# clients_version o'zgarganda (klient qo'shilganda/o'chirilganda) qayta o'qiladi.
+_client_ids = (None, array("q"))  # (clients_version, id lar)
+
+def _client_id_array():
+    global _client_ids
+    version = _get_version("clients_version")
+    cached_version, ids = _client_ids
+    if cached_version != version:
+        with _db.reader() as conn:
+            ids = array("q", (row[0] for row in conn.execute("SELECT id FROM clients ORDER BY id")))
+        _client_ids = (version, ids)
+    return ids
+
+@_timed
+def get_client_id_by_ordinal(ordinal):
+    ids = _client_id_array()
+    if 1 <= ordinal <= len(ids):
+        return ids[ordinal - 1]
+    return None
+
+@_timed
+def resolve_client_ordinals(ordinals):
+    # Bir nechta raqamni bir marta o'qilgan massiv bo'yicha id ga aylantirish (topilmasa None)
+    ids = _client_id_array()
+    return [ids[n - 1] if 1 <= n <= len(ids) else None for n in ordinals]
+
+def _client_ordinals(client_ids):
+    ids = _client_id_array()
+    ordinals = []
+    for client_id in client_ids:
+        index = bisect_left(ids, client_id)
+        ordinals.append(index + 1 if index < len(ids) and ids[index] == client_id else None)
+    return ordinals
+
+@_timed
+def get_client_ordinals(client_ids):
+    return _client_ordinals(client_ids)
+
+@_timed
+def get_client_ordinal(client_id):
+    return _client_ordinals([client_id])[0]
+
+# -------------------- Orders --------------------
+# o: order_id, client_name, phone, address, product, amount, date
+_ORDERS_SELECT = """
     SELECT orders.id, clients.name, clients.phone, clients.address, orders.product, orders.amount, orders.date
     FROM orders
     JOIN clients ON orders.client_id = clients.id
-    """)
-    orders = cursor.fetchall()
-    conn.close()
-    return orders
+"""
+
+@_timed
+def add_order(client_id, product, amount):
+    created_at = int(time.time())
+    date = datetime.fromtimestamp(created_at).strftime("%Y-%m-%d %H:%M")
+    with _db.writer() as conn:
+        conn.execute("INSERT INTO orders(client_id, product, amount, date, created_at) VALUES(?,?,?,?,?)",
+                     (client_id, product, amount, date, created_at))
+        _bump_data_version(conn)
+
+@_timed
+def add_records_bulk(clients=(), orders=()):
+    """
+    Ko'p klient va buyurtmani bitta tranzaksiyada qo'shadi (executemany, bitta fsync).
+    clients: [(name, phone, address)], orders: [(client_id, product, amount)]
+    """
+    created_at = int(time.time())
+    date = datetime.fromtimestamp(created_at).strftime("%Y-%m-%d %H:%M")
+    with _db.writer() as conn:
+        if clients:
+            conn.executemany("INSERT INTO clients(name, phone, address) VALUES(?,?,?)", clients)
+        if orders:
+            conn.executemany("INSERT INTO orders(client_id, product, amount, date, created_at) VALUES(?,?,?,?,?)",
+                             [(client_id, product, amount, date, created_at) for client_id, product, amount in orders])
+        _bump_data_version(conn, clients=bool(clients))
+
+@_timed
+def import_records(records):
+    """
+    Import bo'lagini bitta tranzaksiyada saqlaydi.
+    records: [(name, phone, address, product, amount)], telefon normallashtirilgan;
+    product None bo'lsa faqat klient. Telefon bo'yicha mavjud klient qayta qo'shilmaydi.
+    (yangi klientlar soni, qo'shilgan buyurtmalar soni) qaytaradi.
+    """
+    created_at = int(time.time())
+    date = datetime.fromtimestamp(created_at).strftime("%Y-%m-%d %H:%M")
 
+    def phone_ids(conn, phones):
+        placeholders = ",".join("?" * len(phones))
+        return dict(conn.execute(
+            f"SELECT phone, MIN(id) FROM clients WHERE phone IN ({placeholders}) GROUP BY phone", phones
+        ).fetchall())
+
+    with _db.writer() as conn:
+        ids = phone_ids(conn, list({r[1] for r in records}))
+        new_clients = {}
+        for name, phone, address, _, _ in records:
+            if phone not in ids and phone not in new_clients:
+                new_clients[phone] = (name, phone, address)
+        if new_clients:
+            conn.executemany("INSERT INTO clients(name, phone, address) VALUES(?,?,?)", new_clients.values())
+            ids.update(phone_ids(conn, list(new_clients)))
+
+        orders = [(ids[phone], product, amount, date, created_at)
+                  for _, phone, _, product, amount in records if product]
+        if orders:
+            conn.executemany("INSERT INTO orders(client_id, product, amount, date, created_at) VALUES(?,?,?,?,?)",
+                             orders)
+        if new_clients or orders:
+            _bump_data_version(conn, clients=bool(new_clients))
+    return len(new_clients), len(orders)
+
+@_timed
+def get_orders():
+    with _db.reader() as conn:
+        return conn.execute(_ORDERS_SELECT).fetchall()
+
+def iter_orders(batch_size=1000):
+    # Eksport uchun: hamma buyurtmalarni xotiraga yuklamasdan, bo'laklab o'qish
+    with _db.reader() as conn:
+        cursor = conn.execute(_ORDERS_SELECT + " ORDER BY orders.id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+@_timed
+def get_orders_page(after_id=0, limit=10, before_id=None):
+    # get_orders() bilan bir xil ustunlar, lekin faqat bitta sahifa (orders.id bo'yicha)
+    with _db.reader() as conn:
+        if before_id is not None:
+            rows = conn.execute(_ORDERS_SELECT + " WHERE orders.id < ? ORDER BY orders.id DESC LIMIT ?",
+                                (before_id, limit)).fetchall()
+            rows.reverse()
+            return rows
+        return conn.execute(_ORDERS_SELECT + " WHERE orders.id > ? ORDER BY orders.id LIMIT ?",
+                            (after_id, limit)).fetchall()
+
+@_timed
 def delete_order(order_id):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        _enable_foreign_keys(conn)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM orders WHERE id = ?", (order_id,))
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
+        with _db.writer() as conn:
+            cursor = conn.execute("DELETE FROM orders WHERE id = ?", (order_id,))
+            success = cursor.rowcount > 0
+            if success:
+                _bump_data_version(conn)
         return success, None
     except sqlite3.Error as e:
-        return False, str(e)
\ No newline at end of file
+        return False, str(e)
+
+@_timed
+def delete_orders(order_ids):
+    """Tanlangan buyurtmalar bitta tranzaksiyada: (o'chirilganlar soni, xato)."""
+    return _delete_by_ids("orders", order_ids)
+
+@_timed
+def count_orders_before(created_before):
+    with _db.reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM orders WHERE created_at < ?", (created_before,)).fetchone()[0]
+
+@_timed
+def delete_orders_before(created_before):
+    """created_before (unix vaqt) dan oldingi barcha buyurtmalar bitta DELETE bilan: (soni, xato)."""
+    try:
+        with _db.writer() as conn:
+            deleted = conn.execute("DELETE FROM orders WHERE created_at < ?", (created_before,)).rowcount
+            if deleted:
+                _bump_data_version(conn)
+        return deleted, None
+    except sqlite3.Error as e:
+        return 0, str(e)
+
+# Bir so'rovdagi parametrlar soni (eski SQLite versiyalarida chegara 999)
+DELETE_CHUNK = 500
+
+def _delete_by_ids(table, ids, clients=False):
+    # Hamma bo'laklar bitta yozuvchi tranzaksiyasida: bitta commit (fsync), yarim o'chirilgan holat yo'q
+    ids = sorted(set(ids))
+    try:
+        with _db.writer() as conn:
+            deleted = 0
+            for i in range(0, len(ids), DELETE_CHUNK):
+                chunk = ids[i:i + DELETE_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                deleted += conn.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", chunk).rowcount
+            if deleted:
+                _bump_data_version(conn, clients=clients)
+        return deleted, None
+    except sqlite3.Error as e:
+        return 0, str(e)
+
+# -------------------- Statistics --------------------
+@_timed
+def get_sales_stats(days=7, weeks=4, months=6, top=5):
+    """
+    Rollup jadvallardan hisobot (orders jadvali o'qilmaydi).
+    Kunlik/haftalik/oylik yig'indilar sales_daily dan, eng yaxshilar indeks bo'yicha olinadi.
+    """
+    with _db.reader() as conn:
+        total = conn.execute("SELECT COALESCE(SUM(orders), 0), COALESCE(SUM(amount), 0) FROM sales_daily").fetchone()
+        daily = conn.execute("""
+            SELECT day, orders, amount FROM sales_daily
+            WHERE day > date('now', 'localtime', ?)
+            ORDER BY day DESC
+        """, (f"-{days} days",)).fetchall()
+        weekly = conn.execute("""
+            SELECT strftime('%Y-%W', day) AS week, SUM(orders), SUM(amount) FROM sales_daily
+            WHERE day > date('now', 'localtime', ?)
+            GROUP BY week ORDER BY week DESC LIMIT ?
+        """, (f"-{weeks * 7} days", weeks)).fetchall()
+        monthly = conn.execute("""
+            SELECT strftime('%Y-%m', day) AS month, SUM(orders), SUM(amount) FROM sales_daily
+            WHERE day >= date('now', 'localtime', 'start of month', ?)
+            GROUP BY month ORDER BY month DESC
+        """, (f"-{months - 1} months",)).fetchall()
+        products = conn.execute(
+            "SELECT product, orders, amount FROM sales_products ORDER BY amount DESC LIMIT ?", (top,)
+        ).fetchall()
+        clients = conn.execute("""
+            SELECT clients.name, sales_clients.orders, sales_clients.amount
+            FROM sales_clients
+            JOIN clients ON clients.id = sales_clients.client_id
+            ORDER BY sales_clients.amount DESC LIMIT ?
+        """, (top,)).fetchall()
+    return {
+        "total": total,
+        "daily": daily,
+        "weekly": weekly,
+        "monthly": monthly,
+        "products": products,
+        "clients": clients,
+    }
+
+# -------------------- Search (FTS5) --------------------
+def _fts_query(text):
+    # Foydalanuvchi matni FTS sintaksisiga: har bir so'z prefiks sifatida, hammasi (AND)
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+@_timed
+def search_clients(text, limit=10, offset=0):
+    query = _fts_query(text)
+    if not query:
+        return []
+    with _db.reader() as conn:
+        return conn.execute("""
+            SELECT clients.id, clients.name, clients.phone, clients.address
+            FROM clients_fts
+            JOIN clients ON clients.id = clients_fts.rowid
+            WHERE clients_fts MATCH ?
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        """, (query, limit, offset)).fetchall()
+
+@_timed
+def search_orders(text, limit=10, offset=0):
+    query = _fts_query(text)
+    if not query:
+        return []
+    with _db.reader() as conn:
+        return conn.execute(_ORDERS_SELECT + """
+            JOIN orders_fts ON orders_fts.rowid = orders.id
+            WHERE orders_fts MATCH ?
+            ORDER BY orders_fts.rank
+            LIMIT ? OFFSET ?
+        """, (query, limit, offset)).fetchall()
+
+# -------------------- Sessions --------------------
+@_timed
+def get_session(namespace, key):
+    with _db.reader() as conn:
+        row = conn.execute("SELECT value FROM sessions WHERE namespace = ? AND key = ? AND expires_at > ?",
+                           (namespace, key, int(time.time()))).fetchone()
+    return row[0] if row else None
+
+@_timed
+def set_session(namespace, key, value, expires_at):
+    with _db.writer() as conn:
+        conn.execute("REPLACE INTO sessions (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                     (namespace, key, value, expires_at))
+
+@_timed
+def delete_session(namespace, key):
+    with _db.writer() as conn:
+        cursor = conn.execute("DELETE FROM sessions WHERE namespace = ? AND key = ?", (namespace, key))
+        return cursor.rowcount > 0
+
+@_timed
+def purge_expired_sessions():
+    with _db.writer() as conn:
+        return conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (int(time.time()),)).rowcount
+
+# -------------------- Throttling --------------------
+@_timed
+def consume_token(key, capacity, rate, now):
+    """
+    Umumiy bucket'dan bitta token oladi (worker'lar orasida atomar, bitta tranzaksiya).
+    (ruxsat, ogohlantirish kerakmi, keyingi tokengacha sekund) qaytaradi.
+    """
+    with _db.writer() as conn:
+        row = conn.execute("SELECT tokens, updated, warned FROM throttle WHERE key = ?", (key,)).fetchone()
+        tokens, updated, warned = row or (capacity, now, 0)
+        tokens = min(capacity, tokens + max(now - updated, 0) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        warn = not allowed and not warned
+        conn.execute("REPLACE INTO throttle (key, tokens, updated, warned) VALUES (?, ?, ?, ?)",
+                     (key, tokens, now, 0 if allowed else 1))
+    return allowed, warn, 0 if allowed else (1 - tokens) / rate
+
+@_timed
+def purge_throttle(before):
+    # Uzoq ishlatilmagan bucket'lar baribir to'la: o'chirish natijani o'zgartirmaydi
+    with _db.writer() as conn:
+        return conn.execute("DELETE FROM throttle WHERE updated < ?", (before,)).rowcount
+
+# -------------------- Health --------------------
+# Bir kundan eski heartbeat'lar (to'xtatilgan worker'lar) o'chiriladi
+HEARTBEAT_RETENTION = 24 * 60 * 60
+
+@_timed
+def save_heartbeat(worker, snapshot):
+    now = time.time()
+    with _db.writer() as conn:
+        conn.execute("REPLACE INTO heartbeats (worker, updated_at, snapshot) VALUES (?, ?, ?)",
+                     (worker, now, snapshot))
+        conn.execute("DELETE FROM heartbeats WHERE updated_at < ?", (now - HEARTBEAT_RETENTION,))
+
+def get_heartbeats():
+    """[(worker, updated_at, snapshot_json), ...]"""
+    with _db.reader() as conn:
+        return conn.execute("SELECT worker, updated_at, snapshot FROM heartbeats ORDER BY worker").fetchall()
+
+def check_db():
+    """
+    O'quvchi ulanishda SELECT 1 (baza ochilmasa sqlite3.Error); sarflangan vaqtni qaytaradi.
+    Yozish qulfi olinmaydi: yozuvlar ishlayotganini heartbeat yoshi ko'rsatadi.
+    """
+    start = time.perf_counter()
+    with _db.reader() as conn:
+        conn.execute("SELECT 1").fetchone()
+    return time.perf_counter() - start
+
+def get_row_counts():
+    # /metrics har scrape'da chaqiradi: katta jadvallar sanalmaydi — buyurtmalar sales_daily yig'indisidan,
+    # klientlar keshlangan id massividan (clients_version o'zgargandagina qayta o'qiladi)
+    clients = len(_client_id_array())
+    with _db.reader() as conn:
+        return {
+            "users": conn.execute("SELECT COUNT(*) FROM users").fetchone()[0],
+            "clients": clients,
+            "orders": conn.execute("SELECT COALESCE(SUM(orders), 0) FROM sales_daily").fetchone()[0],
+            "sessions": conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0],
+        }
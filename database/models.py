@@ -1,66 +1,298 @@
 import sqlite3
 
-conn = sqlite3.connect("database/crm.db")
-cursor = conn.cursor()
-
-# Clients jadvali
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS clients(
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    phone TEXT,
-    address TEXT
-)
-""")
-
-# Orders jadvali
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS orders(
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    client_id INTEGER,
-    product TEXT,
-    amount INTEGER,
-    date TEXT,
-    FOREIGN KEY(client_id) REFERENCES clients(id) ON DELETE CASCADE
-)
-""")
-
-# Settings jadvali
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS settings(
-    key TEXT PRIMARY KEY,
-    value TEXT
-)
-""")
-
-# Users jadvali (telefon va full_name ustunlari bilan)
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS users(
-    user_id INTEGER PRIMARY KEY,
-    username TEXT,
-    first_name TEXT,
-    last_name TEXT,
-    is_banned INTEGER DEFAULT 0,
-    joined_at TEXT,
-    phone TEXT,
-    full_name TEXT
-)
-""")
-
-# Mavjud jadvalga ustunlar qo'shish (agar mavjud bo'lmasa)
-cursor.execute("PRAGMA table_info(users)")
-columns = [col[1] for col in cursor.fetchall()]
-if 'phone' not in columns:
-    cursor.execute("ALTER TABLE users ADD COLUMN phone TEXT")
-if 'full_name' not in columns:
-    cursor.execute("ALTER TABLE users ADD COLUMN full_name TEXT")
-
-# Standart settings qiymatlari
-cursor.execute("SELECT COUNT(*) FROM settings")
-if cursor.fetchone()[0] == 0:
-    cursor.execute("INSERT INTO settings (key, value) VALUES (?, ?)", ("password_hash", ""))
-    cursor.execute("INSERT INTO settings (key, value) VALUES (?, ?)", ("admin_phone", ""))
-
-conn.commit()
-conn.close()
-print("✅ Database ready.")
\ No newline at end of file
+from database.db import DB_PATH
+
+
+# -------------------- 1-versiya: asosiy jadvallar --------------------
+def _create_base_tables(cursor):
+    # Clients jadvali
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS clients(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        phone TEXT,
+        address TEXT
+    )
+    """)
+
+    # Orders jadvali
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS orders(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        client_id INTEGER,
+        product TEXT,
+        amount INTEGER,
+        date TEXT,
+        FOREIGN KEY(client_id) REFERENCES clients(id) ON DELETE CASCADE
+    )
+    """)
+
+    # Settings jadvali
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS settings(
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """)
+
+    # Users jadvali (telefon va full_name ustunlari bilan)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS users(
+        user_id INTEGER PRIMARY KEY,
+        username TEXT,
+        first_name TEXT,
+        last_name TEXT,
+        is_banned INTEGER DEFAULT 0,
+        joined_at TEXT,
+        phone TEXT,
+        full_name TEXT
+    )
+    """)
+
+    # Mavjud jadvalga ustunlar qo'shish (agar mavjud bo'lmasa)
+    cursor.execute("PRAGMA table_info(users)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if 'phone' not in columns:
+        cursor.execute("ALTER TABLE users ADD COLUMN phone TEXT")
+    if 'full_name' not in columns:
+        cursor.execute("ALTER TABLE users ADD COLUMN full_name TEXT")
+
+    # Standart settings qiymatlari
+    cursor.execute("SELECT COUNT(*) FROM settings")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute("INSERT INTO settings (key, value) VALUES (?, ?)", ("password_hash", ""))
+        cursor.execute("INSERT INTO settings (key, value) VALUES (?, ?)", ("admin_phone", ""))
+
+
+# -------------------- 2-versiya: created_at va indekslar --------------------
+def _add_orders_created_at(cursor):
+    # created_at - unix vaqt (sekund), saralash va sana bo'yicha filtrlash uchun
+    cursor.execute("PRAGMA table_info(orders)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if 'created_at' not in columns:
+        cursor.execute("ALTER TABLE orders ADD COLUMN created_at INTEGER")
+
+    # Eski yozuvlar: "%Y-%m-%d %H:%M" mahalliy vaqtdan unix vaqtga
+    cursor.execute("""
+    UPDATE orders
+    SET created_at = CAST(strftime('%s', date, 'utc') AS INTEGER)
+    WHERE created_at IS NULL AND date IS NOT NULL
+    """)
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_client_id ON orders(client_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_phone ON clients(phone)")
+
+
+# -------------------- 3-versiya: sessiyalar --------------------
+def _create_sessions(cursor):
+    # Suhbat holatlari (parol tiklash, ro'yxatdan o'tish, ...) va kirgan foydalanuvchilar
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sessions(
+        namespace TEXT NOT NULL,
+        key INTEGER NOT NULL,
+        value TEXT,
+        expires_at INTEGER NOT NULL,
+        PRIMARY KEY(namespace, key)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)")
+
+
+# -------------------- 4-versiya: to'liq matnli qidiruv (FTS5) --------------------
+def _create_search_index(cursor):
+    # Tashqi kontentli FTS5 jadvallar: matn clients/orders da, indeks triggerlar bilan yangilanadi
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(
+        name, phone, address,
+        content='clients', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5(
+        product,
+        content='orders', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS clients_fts_ai AFTER INSERT ON clients BEGIN
+        INSERT INTO clients_fts(rowid, name, phone, address) VALUES (new.id, new.name, new.phone, new.address);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS clients_fts_ad AFTER DELETE ON clients BEGIN
+        INSERT INTO clients_fts(clients_fts, rowid, name, phone, address)
+        VALUES ('delete', old.id, old.name, old.phone, old.address);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS clients_fts_au AFTER UPDATE ON clients BEGIN
+        INSERT INTO clients_fts(clients_fts, rowid, name, phone, address)
+        VALUES ('delete', old.id, old.name, old.phone, old.address);
+        INSERT INTO clients_fts(rowid, name, phone, address) VALUES (new.id, new.name, new.phone, new.address);
+    END
+    """)
+
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS orders_fts_ai AFTER INSERT ON orders BEGIN
+        INSERT INTO orders_fts(rowid, product) VALUES (new.id, new.product);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS orders_fts_ad AFTER DELETE ON orders BEGIN
+        INSERT INTO orders_fts(orders_fts, rowid, product) VALUES ('delete', old.id, old.product);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS orders_fts_au AFTER UPDATE OF product ON orders BEGIN
+        INSERT INTO orders_fts(orders_fts, rowid, product) VALUES ('delete', old.id, old.product);
+        INSERT INTO orders_fts(rowid, product) VALUES (new.id, new.product);
+    END
+    """)
+
+    # Mavjud ma'lumotlarni indekslash
+    cursor.execute("INSERT INTO clients_fts(clients_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO orders_fts(orders_fts) VALUES ('rebuild')")
+
+
+# -------------------- 5-versiya: statistika (rollup jadvallar) --------------------
+def _create_sales_rollups(cursor):
+    # Buyurtmalar qo'shilganda/o'chirilganda triggerlar yig'indilarni yangilaydi,
+    # hisobot esa butun orders jadvalini emas, faqat shu kichik jadvallarni o'qiydi
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sales_daily(
+        day TEXT PRIMARY KEY,
+        orders INTEGER NOT NULL DEFAULT 0,
+        amount INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sales_products(
+        product TEXT PRIMARY KEY,
+        orders INTEGER NOT NULL DEFAULT 0,
+        amount INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sales_clients(
+        client_id INTEGER PRIMARY KEY,
+        orders INTEGER NOT NULL DEFAULT 0,
+        amount INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_products_amount ON sales_products(amount)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_clients_amount ON sales_clients(amount)")
+
+    day = "date(COALESCE({row}.created_at, strftime('%s', {row}.date, 'utc')), 'unixepoch', 'localtime')"
+    add = """
+        INSERT INTO sales_daily(day, orders, amount) VALUES ({day}, 1, COALESCE({row}.amount, 0))
+        ON CONFLICT(day) DO UPDATE SET orders = orders + 1, amount = amount + excluded.amount;
+        INSERT INTO sales_products(product, orders, amount) VALUES (COALESCE({row}.product, ''), 1, COALESCE({row}.amount, 0))
+        ON CONFLICT(product) DO UPDATE SET orders = orders + 1, amount = amount + excluded.amount;
+        INSERT INTO sales_clients(client_id, orders, amount) VALUES ({row}.client_id, 1, COALESCE({row}.amount, 0))
+        ON CONFLICT(client_id) DO UPDATE SET orders = orders + 1, amount = amount + excluded.amount;
+    """
+    remove = """
+        UPDATE sales_daily SET orders = orders - 1, amount = amount - COALESCE({row}.amount, 0) WHERE day = {day};
+        DELETE FROM sales_daily WHERE day = {day} AND orders <= 0;
+        UPDATE sales_products SET orders = orders - 1, amount = amount - COALESCE({row}.amount, 0)
+        WHERE product = COALESCE({row}.product, '');
+        DELETE FROM sales_products WHERE product = COALESCE({row}.product, '') AND orders <= 0;
+        UPDATE sales_clients SET orders = orders - 1, amount = amount - COALESCE({row}.amount, 0)
+        WHERE client_id = {row}.client_id;
+        DELETE FROM sales_clients WHERE client_id = {row}.client_id AND orders <= 0;
+    """
+    new = add.format(row="new", day=day.format(row="new"))
+    old = remove.format(row="old", day=day.format(row="old"))
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS orders_sales_ai AFTER INSERT ON orders BEGIN {new} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS orders_sales_ad AFTER DELETE ON orders BEGIN {old} END")
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS orders_sales_au
+    AFTER UPDATE OF client_id, product, amount, date, created_at ON orders
+    BEGIN {old} {new} END
+    """)
+
+    # Mavjud buyurtmalar bo'yicha boshlang'ich qiymatlar
+    cursor.execute("DELETE FROM sales_daily")
+    cursor.execute("DELETE FROM sales_products")
+    cursor.execute("DELETE FROM sales_clients")
+    cursor.execute(f"""
+    INSERT INTO sales_daily(day, orders, amount)
+    SELECT {day.format(row="orders")}, COUNT(*), COALESCE(SUM(amount), 0) FROM orders GROUP BY 1
+    """)
+    cursor.execute("""
+    INSERT INTO sales_products(product, orders, amount)
+    SELECT COALESCE(product, ''), COUNT(*), COALESCE(SUM(amount), 0) FROM orders GROUP BY 1
+    """)
+    cursor.execute("""
+    INSERT INTO sales_clients(client_id, orders, amount)
+    SELECT client_id, COUNT(*), COALESCE(SUM(amount), 0) FROM orders WHERE client_id IS NOT NULL GROUP BY 1
+    """)
+
+
+# -------------------- 6-versiya: bot heartbeat (health/metrics uchun) --------------------
+def _create_heartbeats(cursor):
+    # Bot jarayoni har bir necha sekundda o'z holatini yozadi, app.py shu yerdan o'qiydi
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS heartbeats(
+        worker TEXT PRIMARY KEY,
+        updated_at REAL NOT NULL,
+        snapshot TEXT
+    ) WITHOUT ROWID
+    """)
+
+
+# -------------------- 7-versiya: umumiy throttling bucket'lari --------------------
+def _create_throttle(cursor):
+    # Bir nechta worker bitta limitni bo'lishishi uchun token bucket'lar bazada
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS throttle(
+        key TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated REAL NOT NULL,
+        warned INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """)
+
+
+# Tartib muhim: N-element bajarilgach PRAGMA user_version = N bo'ladi
+MIGRATIONS = [
+    _create_base_tables,
+    _add_orders_created_at,
+    _create_sessions,
+    _create_search_index,
+    _create_sales_rollups,
+    _create_heartbeats,
+    _create_throttle,
+]
+
+
+# Katta hajmdagi yuklashda (benchmarks/dataset.py) shu triggerlar vaqtincha o'chiriladi:
+# har bir qator uchun indeks yangilash o'rniga, oxirida rebuild_derived() bir marta qayta quradi
+INSERT_TRIGGERS = ("clients_fts_ai", "orders_fts_ai", "orders_sales_ai")
+
+
+def rebuild_derived(cursor):
+    """Qidiruv indeksi va statistika jadvallarini noldan quradi, o'chirilgan triggerlarni tiklaydi."""
+    _create_search_index(cursor)
+    _create_sales_rollups(cursor)
+
+
+def init_db(path=DB_PATH):
+    """Sxemani oxirgi versiyaga yangilaydi (bajarilgan yangilanishlar qayta ishlamaydi)."""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(cursor)
+        cursor.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    init_db()
+    print("✅ Database ready.")
@@ -0,0 +1,109 @@
+from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+
+from bot.callbacks import (
+    LOGIN, FORGOT_PASSWORD, CONTINUE_RESET, CANCEL_RESET, BACK_TO_MAIN, CHANGE_PHONE, CHANGE_PASSWORD,
+    DELETE_CHOOSE_CLIENT, DELETE_CHOOSE_ORDER
+)
+from bot.config import ADMIN_USERNAME
+
+# O'zgarmas klaviaturalar: har biri birinchi so'ralganda bir marta quriladi va JSON ko'rinishida saqlanadi.
+# aiogram reply_markup sifatida berilgan satrni o'zgartirmasdan yuboradi, shuning uchun har bir javobda
+# KeyboardButton obyektlari yaratilmaydi va qayta serializatsiya qilinmaydi.
+_builders = {}
+_cache = {}
+
+
+def keyboard(name):
+    def decorator(build):
+        _builders[name] = build
+        return build
+    return decorator
+
+
+def get_keyboard(name):
+    """Nomi bo'yicha tayyor klaviatura (JSON satr): reply_markup=get_keyboard("settings")."""
+    markup = _cache.get(name)
+    if markup is None:
+        markup = _cache[name] = _builders[name]().as_json()
+    return markup
+
+
+# -------------------- Asosiy menyu (reply tugmalar) --------------------
+MAIN_MENU_BUTTONS = [
+    "➕ Klient qo'shish",
+    "📋 Klientlar ro'yxati",
+    "🛍 Buyurtma qo'shish",
+    "📊 Excel export",
+    "🗑 O'chirish",
+    "⚙️ Sozlamalar",
+    "👤 Admin",
+]
+ADMIN_MENU_BUTTONS = ["👥 Foydalanuvchilar"]
+
+
+def _main_menu(buttons):
+    markup = ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
+    markup.add(*(KeyboardButton(text) for text in buttons))
+    return markup
+
+
+@keyboard("main_menu")
+def main_menu():
+    return _main_menu(MAIN_MENU_BUTTONS)
+
+
+@keyboard("main_menu_admin")
+def main_menu_admin():
+    return _main_menu(MAIN_MENU_BUTTONS + ADMIN_MENU_BUTTONS)
+
+
+# -------------------- Inline menyular --------------------
+@keyboard("login")
+def login_menu():
+    markup = InlineKeyboardMarkup()
+    markup.add(InlineKeyboardButton("🔐 Kirish", callback_data=LOGIN.pack()))
+    markup.add(InlineKeyboardButton("❓ Parolni unutdingizmi?", callback_data=FORGOT_PASSWORD.pack()))
+    return markup
+
+
+@keyboard("continue_reset")
+def continue_reset_menu():
+    markup = InlineKeyboardMarkup()
+    markup.add(InlineKeyboardButton("✅ Davom ettirish", callback_data=CONTINUE_RESET.pack()))
+    markup.add(InlineKeyboardButton("❌ Bekor qilish", callback_data=CANCEL_RESET.pack()))
+    return markup
+
+
+@keyboard("settings")
+def settings_menu():
+    markup = InlineKeyboardMarkup(row_width=1)
+    markup.add(
+        InlineKeyboardButton("📱 Telefon raqamni o'zgartirish", callback_data=CHANGE_PHONE.pack()),
+        InlineKeyboardButton("🔐 Parolni o'zgartirish", callback_data=CHANGE_PASSWORD.pack()),
+        InlineKeyboardButton("🔙 Ortga", callback_data=BACK_TO_MAIN.pack())
+    )
+    return markup
+
+
+@keyboard("delete_choose")
+def delete_choose_menu():
+    markup = InlineKeyboardMarkup(row_width=2)
+    markup.add(
+        InlineKeyboardButton("👤 Klient o'chirish", callback_data=DELETE_CHOOSE_CLIENT.pack()),
+        InlineKeyboardButton("📦 Buyurtma o'chirish", callback_data=DELETE_CHOOSE_ORDER.pack())
+    )
+    return markup
+
+
+@keyboard("back")
+def back_menu():
+    markup = InlineKeyboardMarkup()
+    markup.add(InlineKeyboardButton("🔙 Ortga", callback_data=BACK_TO_MAIN.pack()))
+    return markup
+
+
+@keyboard("admin_contact")
+def admin_contact_menu():
+    return InlineKeyboardMarkup().add(
+        InlineKeyboardButton("📩 Admin ga yozish", url=f"https://t.me/{ADMIN_USERNAME}")
+    )
@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+from array import array
+
+import pytest
+
+# Modullar import paytida sozlamalarni o'qiydi: testlar vaqtinchalik baza va xotiradagi omborlar bilan ishlaydi
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="orderx_tests_"), "crm.db"))
+os.environ["SHARED_BACKEND"] = "memory"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """database.db har test uchun yangi, oxirgi sxemadagi bazaga ulanadi (keshlar ham toza)."""
+    from database import db, models
+    from database.connection import ConnectionManager
+
+    path = str(tmp_path / "crm.db")
+    models.init_db(path)
+    manager = ConnectionManager(path)
+    monkeypatch.setattr(db, "_db", manager)
+    monkeypatch.setattr(db, "_client_ids", (None, array("q")))
+    monkeypatch.setattr(db, "_ban_cache", {"ids": set(), "loaded_at": None, "version": None})
+    yield db
+    manager.close()
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from bot import callbacks
+from bot.callbacks import Action, MAX_LENGTH, decode_int, encode_int
+
+
+@pytest.mark.parametrize("number", [0, 1, 61, 62, 3843, 3844, 1000000, 2 ** 48 - 1, 2 ** 63])
+def test_base62_round_trip(number):
+    assert decode_int(encode_int(number)) == number
+
+
+def test_base62_is_compact():
+    assert encode_int(61) == "Z"
+    assert encode_int(62) == "10"
+    assert len(encode_int(2 ** 48 - 1)) == 9
+
+
+@pytest.mark.parametrize("digits", ["", "-1", "1.2", "ab c", "ё"])
+def test_decode_rejects_bad_digits(digits):
+    with pytest.raises(ValueError):
+        decode_int(digits)
+
+
+def test_encode_rejects_negative():
+    with pytest.raises(ValueError):
+        encode_int(-1)
+
+
+def test_pack_unpack_round_trip():
+    item = Action("zt", "test", str, str, int, int)
+    data = item.pack("cl", "n", 123456, 7)
+
+    assert data.startswith(item.prefix)
+    assert item.unpack(data[len(item.prefix):]) == ("cl", "n", 123456, 7)
+
+
+def test_pack_without_fields_is_exact():
+    item = Action("zx", "test")
+    assert item.pack() == callbacks.VERSION + "zx"
+
+
+def test_pack_respects_64_byte_limit():
+    item = Action("zt", "test", str)
+    prefix_length = len(item.prefix)
+
+    assert len(item.pack("a" * (MAX_LENGTH - prefix_length)).encode()) == MAX_LENGTH
+    with pytest.raises(ValueError):
+        item.pack("a" * (MAX_LENGTH - prefix_length + 1))
+    # Limit baytlarda: ko'p baytli belgilar ham hisobga olinadi
+    with pytest.raises(ValueError):
+        item.pack("ё" * (MAX_LENGTH // 2))
+
+
+def test_pack_checks_field_count():
+    with pytest.raises(TypeError):
+        Action("zt", "test", int).pack()
+
+
+@pytest.mark.parametrize("value", ["", "a.b"])
+def test_pack_rejects_bad_str_field(value):
+    with pytest.raises(ValueError):
+        Action("zt", "test", str).pack(value)
+
+
+@pytest.mark.parametrize("payload", ["", "1", "1.2.3", "x!", "1."])
+def test_unpack_rejects_bad_payloads(payload):
+    with pytest.raises(ValueError):
+        Action("zt", "test", int, int).unpack(payload)
+
+
+def test_action_codes_are_unique():
+    with pytest.raises(ValueError):
+        callbacks.action(callbacks.BACK_TO_MAIN.code, "duplicate")
+    with pytest.raises(ValueError):
+        callbacks.action("z.z", "separator")
+
+
+def test_action_name():
+    assert callbacks.action_name(callbacks.DELETE_ORDER.pack(5)) == "delete_order"
+    assert callbacks.action_name("delete_order_5") == "stale"
+    assert callbacks.action_name(callbacks.VERSION + "??") == "unknown"
+    assert callbacks.action_name(None) == "stale"
+
+
+def test_stash_load_update():
+    async def scenario():
+        token = await callbacks.stash({"ids": [1]})
+        assert await callbacks.load(token) == {"ids": [1]}
+        await callbacks.update(token, {"ids": [1, 2]})
+        assert await callbacks.load(token) == {"ids": [1, 2]}
+        assert await callbacks.load("!bad", default="x") == "x"
+        assert await callbacks.load(encode_int(0)) is None
+        return token
+
+    token = asyncio.run(scenario())
+    assert len(Action("zt", "test", str, int).pack(token, 10 ** 6)) <= MAX_LENGTH
@@ -0,0 +1,92 @@
+import sqlite3
+
+
+def seed(db, clients=3, orders_per_client=4):
+    db.add_records_bulk(clients=[(f"K{n}", f"+99890{n:07d}", "") for n in range(clients)])
+    db.add_records_bulk(orders=[(client_id, "olma", 1)
+                                for client_id in range(1, clients + 1) for _ in range(orders_per_client)])
+
+
+def versions(db):
+    return db._get_version("data_version"), db._get_version("clients_version")
+
+
+def count(db, table):
+    with db._db.reader() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_delete_by_ids_in_chunks(fresh_db, monkeypatch):
+    seed(fresh_db)
+    monkeypatch.setattr(fresh_db, "DELETE_CHUNK", 2)
+    data, clients = versions(fresh_db)
+
+    # Takrorlangan va mavjud bo'lmagan id lar sanalmaydi
+    deleted, error = fresh_db.delete_orders([1, 2, 3, 3, 5, 999])
+    assert (deleted, error) == (4, None)
+    assert count(fresh_db, "orders") == 8
+    assert versions(fresh_db) == (data + 1, clients)
+
+
+def test_delete_clients_cascades_orders(fresh_db, monkeypatch):
+    seed(fresh_db)
+    monkeypatch.setattr(fresh_db, "DELETE_CHUNK", 1)
+    data, clients = versions(fresh_db)
+
+    assert fresh_db.delete_clients([1, 3]) == (2, None)
+    assert count(fresh_db, "clients") == 1
+    assert count(fresh_db, "orders") == 4
+    assert versions(fresh_db) == (data + 1, clients + 1)
+    assert fresh_db.get_sales_stats()["total"] == (4, 4)
+
+
+def test_delete_nothing_keeps_versions(fresh_db):
+    seed(fresh_db)
+    before = versions(fresh_db)
+    assert fresh_db.delete_orders([]) == (0, None)
+    assert fresh_db.delete_clients([999]) == (0, None)
+    assert fresh_db.delete_orders_before(0) == (0, None)
+    assert versions(fresh_db) == before
+
+
+def test_failed_chunk_rolls_back_everything(fresh_db, monkeypatch):
+    seed(fresh_db)
+    monkeypatch.setattr(fresh_db, "DELETE_CHUNK", 2)
+    before = versions(fresh_db)
+    with fresh_db._db.writer() as conn:
+        # 3-bo'lakdagi (id 5) buyurtma o'chirilganda xato
+        conn.execute("""
+            CREATE TRIGGER fail_on_5 BEFORE DELETE ON orders WHEN old.id = 5
+            BEGIN SELECT RAISE(ABORT, 'fail'); END
+        """)
+
+    deleted, error = fresh_db.delete_orders(range(1, 7))
+    assert deleted == 0 and "fail" in error
+    assert count(fresh_db, "orders") == 12
+    assert versions(fresh_db) == before
+
+
+def test_delete_orders_before(fresh_db):
+    seed(fresh_db)
+    with fresh_db._db.writer() as conn:
+        conn.execute("UPDATE orders SET created_at = 1000 WHERE id <= 5")
+        conn.execute("UPDATE orders SET created_at = 2000 WHERE id = 6")
+    data, clients = versions(fresh_db)
+
+    assert fresh_db.count_orders_before(2000) == 5
+    assert fresh_db.delete_orders_before(2000) == (5, None)
+    assert count(fresh_db, "orders") == 7
+    assert count(fresh_db, "clients") == 3
+    assert versions(fresh_db) == (data + 1, clients)
+    assert fresh_db.get_sales_stats()["total"] == (7, 7)
+
+
+def test_delete_orders_before_reports_error(fresh_db, monkeypatch):
+    seed(fresh_db)
+
+    class Failing:
+        def writer(self):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(fresh_db, "_db", Failing())
+    assert fresh_db.delete_orders_before(10 ** 10) == (0, "database is locked")
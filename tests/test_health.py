@@ -0,0 +1,18 @@
+from database.connection import ConnectionManager
+
+
+def test_check_db_does_not_take_the_writer(fresh_db, monkeypatch):
+    def no_writer(self):
+        raise AssertionError("check_db yozish qulfini olmasligi kerak")
+
+    monkeypatch.setattr(ConnectionManager, "writer", no_writer)
+    assert fresh_db.check_db() >= 0
+
+
+def test_row_counts_come_from_rollups(fresh_db):
+    fresh_db.add_user(1, "u", "U", "")
+    fresh_db.add_records_bulk(clients=[("A", "+998901111111", ""), ("B", "+998902222222", "")])
+    fresh_db.add_records_bulk(orders=[(1, "olma", 2), (2, "nok", 1), (1, "olma", 1)])
+    fresh_db.delete_order(2)
+
+    assert fresh_db.get_row_counts() == {"users": 1, "clients": 2, "orders": 2, "sessions": 0}
@@ -0,0 +1,37 @@
+import asyncio
+
+from bot import heartbeat
+
+
+class FakeOutbound:
+    def qsize(self):
+        return 0
+
+
+def test_loop_survives_unexpected_errors(monkeypatch):
+    calls = []
+
+    async def save_heartbeat(worker, snapshot):
+        calls.append(worker)
+        if len(calls) == 1:
+            raise RuntimeError("kutilmagan xato")
+
+    async def sync_ban_cache():
+        pass
+
+    monkeypatch.setattr(heartbeat, "HEARTBEAT_INTERVAL", 0.01)
+    monkeypatch.setattr(heartbeat, "save_heartbeat", save_heartbeat)
+    monkeypatch.setattr(heartbeat, "sync_ban_cache", sync_ban_cache)
+
+    async def scenario():
+        task = asyncio.create_task(heartbeat.heartbeat_loop("w", FakeOutbound()))
+        await asyncio.sleep(0.1)
+        assert not task.done()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(scenario())
+    assert len(calls) > 2
@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from bot.handlers import imports
+
+
+def write_csv(tmp_path, rows):
+    path = tmp_path / "import.csv"
+    path.write_text("ism,telefon,manzil,mahsulot,miqdor\n" + "".join(rows), encoding="utf-8")
+    return str(path)
+
+
+def test_stop_reports_committed_rows(tmp_path, monkeypatch):
+    rows = [f"A{n},+99890{n:07d},x,olma,1\n" for n in range(12)]
+    rows.insert(3, "yomon,telefon,,,\n")
+    path = write_csv(tmp_path, rows)
+    saved = []
+
+    def import_records(chunk):
+        if saved:
+            raise sqlite3.OperationalError("database is locked")
+        saved.append(list(chunk))
+        return len(chunk), len(chunk)
+
+    monkeypatch.setattr(imports, "CHUNK_SIZE", 5)
+    monkeypatch.setattr(imports, "import_records", import_records)
+
+    with pytest.raises(imports.ImportStopped) as stopped:
+        imports.run_import(path, "import.csv")
+
+    stats = stopped.value.stats
+    # 1-qator sarlavha, 4-qator xato: birinchi bo'lak (5 ta yozuv) 7-qatorda saqlangan
+    assert len(saved[0]) == 5
+    assert (stats["saved_rows"], stats["saved_line"], stats["orders"], stats["errors"]) == (6, 7, 5, 1)
+    text = imports._stopped_text(stopped.value)
+    assert "7-qatordan keyin" in text and "8-qatordan" in text
+
+
+def test_stop_before_any_commit(tmp_path, monkeypatch):
+    path = write_csv(tmp_path, ["A,+998901234567,x,olma,1\n"])
+
+    def import_records(chunk):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(imports, "import_records", import_records)
+    with pytest.raises(imports.ImportStopped) as stopped:
+        imports.run_import(path, "import.csv")
+    assert stopped.value.stats["saved_rows"] == 0
+    assert "Hech narsa saqlanmadi" in imports._stopped_text(stopped.value)
+
+
+def test_import_records_dedups_clients_by_phone(fresh_db):
+    fresh_db.add_client("Eski", "+998901111111", "")
+    records = [
+        ("Yangi", "+998901111111", "", "olma", 2),    # mavjud klient: faqat buyurtma
+        ("B", "+998902222222", "manzil", "nok", 1),
+        ("B takror", "+998902222222", "", "olma", 3),  # bo'lak ichida takror: bitta klient
+        ("C", "+998903333333", "", None, None),      # faqat klient
+    ]
+
+    assert fresh_db.import_records(records) == (2, 3)
+    clients = fresh_db.get_clients()
+    assert [(name, phone) for _, name, phone, _ in clients] == [
+        ("Eski", "+998901111111"), ("B", "+998902222222"), ("C", "+998903333333"),
+    ]
+    orders = fresh_db.get_orders()
+    assert [(name, product, amount) for _, name, _, _, product, amount, _ in orders] == [
+        ("Eski", "olma", 2), ("B", "nok", 1), ("B", "olma", 3),
+    ]
+    # Qayta import: klientlar qo'shilmaydi, buyurtmalar esa yana qo'shiladi (shuning uchun ImportStopped hisoboti)
+    assert fresh_db.import_records(records) == (0, 3)
+
+
+def test_run_import_end_to_end(tmp_path, fresh_db, monkeypatch):
+    monkeypatch.setattr(imports, "import_records", fresh_db.import_records)
+    path = write_csv(tmp_path, ["A,+998901234567,x,olma,2 kg\n", "\n", "A2,998901234567,,nok,1\n"])
+
+    stats = imports.run_import(path, "import.csv")
+    assert (stats["rows"], stats["clients"], stats["orders"], stats["saved_line"]) == (2, 1, 2, 4)
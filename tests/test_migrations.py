@@ -0,0 +1,91 @@
+import sqlite3
+from array import array
+
+from database import db, models
+from database.connection import ConnectionManager
+
+
+def make_v1_db(path):
+    # Eski bot yaratgan baza: faqat asosiy jadvallar, created_at va indekslar yo'q
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    models._create_base_tables(cursor)
+    cursor.execute("PRAGMA user_version = 1")
+    cursor.executemany("INSERT INTO clients(name, phone, address) VALUES(?,?,?)", [
+        ("Ali Valiyev", "+998901111111", "Toshkent"),
+        ("Olim Karimov", "+998902222222", "Samarqand"),
+    ])
+    cursor.executemany("INSERT INTO orders(client_id, product, amount, date) VALUES(?,?,?,?)", [
+        (1, "olma", 3, "2024-01-05 10:00"),
+        (1, "nok", 2, "2024-01-05 18:30"),
+        (2, "olma", 5, "2024-02-10 09:15"),
+    ])
+    conn.commit()
+    conn.close()
+
+
+def columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def names(conn, kind):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+
+def test_v1_database_is_upgraded_to_latest(tmp_path, monkeypatch):
+    path = str(tmp_path / "crm.db")
+    make_v1_db(path)
+
+    models.init_db(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(models.MIGRATIONS)
+        assert "created_at" in columns(conn, "orders")
+        assert {"sessions", "clients_fts", "orders_fts", "sales_daily", "sales_products", "sales_clients",
+                "heartbeats", "throttle"} <= names(conn, "table")
+        assert {"idx_orders_client_id", "idx_orders_created_at", "idx_clients_phone",
+                "idx_sessions_expires_at"} <= names(conn, "index")
+        assert set(models.INSERT_TRIGGERS) <= names(conn, "trigger")
+
+        # created_at eski date matnidan to'ldirilgan
+        rows = conn.execute("""
+            SELECT created_at, CAST(strftime('%s', date, 'utc') AS INTEGER) FROM orders ORDER BY id
+        """).fetchall()
+        assert all(created_at is not None and created_at == expected for created_at, expected in rows)
+
+        # Rollup jadvallar mavjud buyurtmalardan to'ldirilgan
+        assert conn.execute("SELECT day, orders, amount FROM sales_daily ORDER BY day").fetchall() == [
+            ("2024-01-05", 2, 5), ("2024-02-10", 1, 5)]
+        assert conn.execute("SELECT product, orders, amount FROM sales_products ORDER BY product").fetchall() == [
+            ("nok", 1, 2), ("olma", 2, 8)]
+        assert conn.execute("SELECT client_id, orders, amount FROM sales_clients ORDER BY client_id").fetchall() == [
+            (1, 2, 5), (2, 1, 5)]
+    finally:
+        conn.close()
+
+    # Eski yozuvlar qidiruvda topiladi
+    manager = ConnectionManager(path)
+    monkeypatch.setattr(db, "_db", manager)
+    monkeypatch.setattr(db, "_client_ids", (None, array("q")))
+    try:
+        assert [row[1] for row in db.search_clients("olim")] == ["Olim Karimov"]
+        assert sorted(row[0] for row in db.search_orders("olma")) == [1, 3]
+    finally:
+        manager.close()
+
+
+def test_init_db_is_idempotent(tmp_path):
+    path = str(tmp_path / "crm.db")
+    make_v1_db(path)
+    models.init_db(path)
+    models.init_db(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(models.MIGRATIONS)
+        # Qayta ishga tushirish rollup'larni ikki marta sanamaydi
+        assert conn.execute("SELECT SUM(orders) FROM sales_daily").fetchone()[0] == 3
+        assert conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0] == 3
+    finally:
+        conn.close()
@@ -0,0 +1,49 @@
+def add_clients(db, n):
+    db.add_records_bulk(clients=[(f"K{i}", f"+99890{i:07d}", "") for i in range(n)])
+
+
+def test_ordinals_follow_list_order(fresh_db):
+    add_clients(fresh_db, 5)
+    assert fresh_db.resolve_client_ordinals([1, 3, 5]) == [1, 3, 5]
+
+    # O'chirilgandan keyin raqamlar siljiydi: ro'yxatdagi 2-o'rin endi id=3
+    fresh_db.delete_clients([2, 4])
+    assert fresh_db.resolve_client_ordinals([1, 2, 3]) == [1, 3, 5]
+    assert fresh_db.get_client_id_by_ordinal(2) == 3
+    assert fresh_db.get_client_ordinals([1, 3, 4, 5]) == [1, 2, None, 3]
+    assert fresh_db.get_client_ordinal(5) == 3
+
+
+def test_out_of_range_ordinals(fresh_db):
+    assert fresh_db.resolve_client_ordinals([1]) == [None]
+    add_clients(fresh_db, 2)
+    assert fresh_db.resolve_client_ordinals([0, -1, 3, 2]) == [None, None, None, 2]
+    assert fresh_db.get_client_id_by_ordinal(0) is None
+    assert fresh_db.resolve_client_ordinals([]) == []
+
+
+def test_cache_follows_clients_version(fresh_db):
+    add_clients(fresh_db, 2)
+    assert fresh_db.resolve_client_ordinals([3]) == [None]
+
+    fresh_db.add_client("Yangi", "+998909999999")
+    assert fresh_db.resolve_client_ordinals([3]) == [3]
+    fresh_db.delete_client(1)
+    assert fresh_db.resolve_client_ordinals([1, 3]) == [2, None]
+
+
+def test_cache_is_reused_until_clients_change(fresh_db):
+    add_clients(fresh_db, 3)
+    ids = fresh_db._client_id_array()
+
+    # Faqat buyurtma qo'shilsa clients_version o'zgarmaydi: massiv qayta o'qilmaydi
+    fresh_db.add_order(1, "olma", 1)
+    assert fresh_db._client_id_array() is ids
+
+    # Bazaga to'g'ridan-to'g'ri yozilgan klient versiya oshmaguncha ko'rinmaydi
+    with fresh_db._db.writer() as conn:
+        conn.execute("INSERT INTO clients(name, phone) VALUES ('Tashqi', '+998900000000')")
+    assert fresh_db.resolve_client_ordinals([4]) == [None]
+    with fresh_db._db.writer() as conn:
+        fresh_db._bump_data_version(conn, clients=True)
+    assert fresh_db.resolve_client_ordinals([4]) == [4]
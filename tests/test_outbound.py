@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from bot.outbound import OutboundQueue
+
+
+class FakeBot:
+    def __init__(self, latency):
+        self.latency = latency
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        self.sent.append((chat_id, text))
+        return text
+
+
+def test_throughput_is_not_capped_by_latency():
+    bot = FakeBot(latency=0.1)
+
+    async def scenario():
+        queue = OutboundQueue(bot, global_rate=200)
+        start = time.monotonic()
+        await asyncio.gather(*(queue.send_message(chat_id, "hi") for chat_id in range(20)))
+        elapsed = time.monotonic() - start
+        await queue.close()
+        return elapsed
+
+    # Ketma-ket yuborilsa 20 * 0.1 = 2 s bo'lardi
+    assert asyncio.run(scenario()) < 0.6
+    assert len(bot.sent) == 20
+
+
+def test_in_flight_is_bounded():
+    bot = FakeBot(latency=0.05)
+
+    async def scenario():
+        queue = OutboundQueue(bot, global_rate=1000, max_in_flight=3)
+        await asyncio.gather(*(queue.send_message(chat_id, "hi") for chat_id in range(10)))
+        await queue.close()
+
+    asyncio.run(scenario())
+    assert bot.max_in_flight == 3
+
+
+def test_one_chat_is_sent_in_order():
+    bot = FakeBot(latency=0.02)
+
+    async def scenario():
+        queue = OutboundQueue(bot, per_chat_interval=0.01, global_rate=1000)
+        # kwargs bilan: birlashtirilmaydi
+        futures = [queue.send_message(1, str(n), disable_notification=True) for n in range(5)]
+        await asyncio.gather(*futures)
+        await queue.close()
+
+    asyncio.run(scenario())
+    assert bot.sent == [(1, str(n)) for n in range(5)]
+    assert bot.max_in_flight == 1
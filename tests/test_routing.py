@@ -0,0 +1,201 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.dispatcher.handler import CancelHandler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from bot.routing import Router
+
+
+def make_message(text=None, user_id=1, **extra):
+    data = {"message_id": 1, "date": 0, "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"}}
+    if text is not None:
+        data["text"] = text
+    data.update(extra)
+    return types.Message.to_object(data)
+
+
+def route(router, message):
+    return asyncio.run(router.resolve_message(message))
+
+
+async def handler_a(*args):
+    pass
+
+
+async def handler_b(*args):
+    pass
+
+
+async def handler_c(*args):
+    pass
+
+
+async def stale(*args):
+    pass
+
+
+# -------------------- Callback'lar --------------------
+def test_longest_prefix_wins():
+    router = Router()
+    router.callback("p", parser=str)(handler_a)
+    router.callback("pa", parser=str)(handler_b)
+
+    assert router.route_callback("pax") == (handler_b, ("x",))
+    assert router.route_callback("pbx") == (handler_a, ("bx",))
+
+
+def test_path_diverging_after_prefix_uses_last_matched_prefix():
+    router = Router()
+    router.callback("p", parser=str)(handler_a)
+    router.callback("pab", parser=str)(handler_b)
+    # "pa" da prefiks yo'q, "pac" da daraxt tugaydi: oxirgi mos prefiks — "p"
+    assert router.route_callback("pac") == (handler_a, ("ac",))
+    assert router.route_callback("pa") == (handler_a, ("a",))
+
+
+def test_longest_prefix_parse_error_does_not_try_shorter_prefix():
+    router = Router()
+    router.callback("p", parser=str)(handler_a)
+    router.callback("pa", parser=int)(handler_b)
+    router.stale(stale)
+
+    assert router.route_callback("pa7") == (handler_b, (7,))
+    assert router.route_callback("pax") == (stale, ())
+
+
+def test_exact_and_prefix_on_same_path():
+    router = Router()
+    router.callback("b")(handler_a)
+    router.callback("b.", parser=int)(handler_b)
+
+    assert router.route_callback("b") == (handler_a, ())
+    assert router.route_callback("b.5") == (handler_b, (5,))
+
+
+def test_exact_requires_full_match():
+    router = Router()
+    router.callback("back")(handler_a)
+
+    assert router.route_callback("backx") is None
+    assert router.route_callback("bac") is None
+
+
+def test_unmatched_callback_goes_to_stale_handler():
+    router = Router()
+    router.callback("n.", parser=int)(handler_a)
+    router.stale(stale)
+
+    assert router.route_callback("unknown") == (stale, ())
+    assert router.route_callback("") == (stale, ())
+    # Parser ValueError berdi — handler chaqirilmaydi
+    assert router.route_callback("n.abc") == (stale, ())
+
+
+def test_unmatched_callback_without_stale_handler():
+    router = Router()
+    router.callback("n.", parser=int)(handler_a)
+
+    assert router.route_callback("n.abc") is None
+
+
+# -------------------- Xabarlar --------------------
+def make_router(state=None):
+    async def get_state(user_id):
+        return state
+
+    router = Router(state=get_state)
+    router.command("start")(handler_a)
+    router.on_state("flow")(handler_b)
+    router.text("/start", "Menu")(handler_c)
+    return router
+
+
+def test_command_before_state():
+    assert route(make_router("flow"), make_message("/start")).handler is handler_a
+
+
+def test_command_is_case_insensitive_and_ignores_bot_mention():
+    assert route(make_router(), make_message("/START@test_bot")).handler is handler_a
+
+
+def test_state_before_text():
+    assert route(make_router("flow"), make_message("Menu")).handler is handler_b
+
+
+def test_text_without_state():
+    assert route(make_router(), make_message("Menu")).handler is handler_c
+    assert route(make_router("other"), make_message("Menu")).handler is handler_c
+
+
+def test_unknown_command_goes_through_state_and_text():
+    assert route(make_router("flow"), make_message("/help")).handler is handler_b
+
+
+def test_fallback_order_and_non_text_messages():
+    router = make_router("flow")
+    router.fallback(lambda message: message.contact is not None)(stale)
+    router.fallback(lambda message: True)(handler_c)
+
+    contact = make_message(contact={"phone_number": "+998901234567", "first_name": "Test"})
+    assert route(router, contact).handler is stale
+    # Matnsiz xabar holat va tugmalarni chetlab o'tadi
+    assert route(router, make_message(sticker=None)).handler is handler_c
+    assert route(make_router("flow"), make_message("anything")).handler is handler_b
+    assert route(make_router(), make_message("anything")) is None
+
+
+# -------------------- Dispatcher --------------------
+class _DropAll(BaseMiddleware):
+    """ThrottlingMiddleware o'rnida: har bir xabarni bekor qiladi."""
+
+    async def on_process_message(self, message, data):
+        raise CancelHandler()
+
+
+def dispatch(router, message, *middlewares):
+    bot = Bot(token="123456:" + "A" * 35)
+    dp = Dispatcher(bot)
+    for middleware in middlewares:
+        dp.middleware.setup(middleware)
+    router.setup(dp)
+    Bot.set_current(bot)
+    update = types.Update.to_object({"update_id": 1, "message": message.to_python()})
+    return asyncio.run(dp.process_update(update))
+
+
+def make_counting_router(calls, state="flow"):
+    async def get_state(user_id):
+        calls.append(user_id)
+        return state
+
+    router = Router(state=get_state)
+    router.command("start")(handler_a)
+    router.on_state("flow")(handler_b)
+    router.text("Menu")(handler_c)
+    return router
+
+
+def test_state_is_not_read_before_middlewares():
+    calls = []
+    dispatch(make_counting_router(calls), make_message("Menu"), _DropAll())
+    assert calls == []
+
+
+def test_state_is_not_read_for_known_commands():
+    calls = []
+    dispatch(make_counting_router(calls), make_message("/start"))
+    assert calls == []
+
+
+def test_state_handler_runs_after_middlewares():
+    calls, handled = [], []
+    router = make_counting_router(calls)
+
+    @router.on_state("flow")
+    async def in_flow(message):
+        handled.append(message.text)
+
+    dispatch(router, make_message("Menu"))
+    assert calls == [1] and handled == ["Menu"]
@@ -0,0 +1,63 @@
+def seed(db):
+    db.add_records_bulk(clients=[("Ali Valiyev", "+998901111111", "Toshkent, Chilonzor"),
+                                 ("Olim Karimov", "+998902222222", "Samarqand")])
+    db.add_order(1, "Olma qizil", 3)
+    db.add_order(2, "Nok", 2)
+
+
+def client_names(db, text):
+    return [row[1] for row in db.search_clients(text)]
+
+
+def order_products(db, text):
+    return [row[4] for row in db.search_orders(text)]
+
+
+def test_new_rows_are_searchable(fresh_db):
+    seed(fresh_db)
+    assert client_names(fresh_db, "ali") == ["Ali Valiyev"]
+    assert client_names(fresh_db, "chilon") == ["Ali Valiyev"]
+    assert client_names(fresh_db, "olim sam") == ["Olim Karimov"]
+    assert order_products(fresh_db, "qiz") == ["Olma qizil"]
+
+    # import_records ham triggerlar orqali indeksga tushadi
+    fresh_db.import_records([("Bahrom", "+998903333333", "Buxoro", "Uzum", 4)])
+    assert client_names(fresh_db, "bahrom") == ["Bahrom"]
+    assert order_products(fresh_db, "uzum") == ["Uzum"]
+
+
+def test_deleted_rows_leave_the_index(fresh_db):
+    seed(fresh_db)
+    fresh_db.delete_order(1)
+    assert order_products(fresh_db, "olma") == []
+
+    # Klient o'chirilsa, CASCADE bilan o'chgan buyurtmalari ham indeksdan chiqadi
+    fresh_db.delete_client(2)
+    assert client_names(fresh_db, "olim") == []
+    assert order_products(fresh_db, "nok") == []
+    with fresh_db._db.reader() as conn:
+        assert conn.execute("INSERT INTO orders_fts(orders_fts) VALUES ('integrity-check')").fetchall() == []
+        assert conn.execute("INSERT INTO clients_fts(clients_fts) VALUES ('integrity-check')").fetchall() == []
+
+
+def test_updated_rows_are_reindexed(fresh_db):
+    seed(fresh_db)
+    with fresh_db._db.writer() as conn:
+        conn.execute("UPDATE clients SET name = 'Anvar Valiyev' WHERE id = 1")
+        conn.execute("UPDATE orders SET product = 'Shaftoli' WHERE id = 1")
+        # product o'zgarmasa indeks tegilmaydi, lekin qidiruv natijasi baribir to'g'ri
+        conn.execute("UPDATE orders SET amount = 9 WHERE id = 2")
+
+    assert client_names(fresh_db, "ali") == []
+    assert client_names(fresh_db, "anvar") == ["Anvar Valiyev"]
+    assert order_products(fresh_db, "olma") == []
+    assert order_products(fresh_db, "shaft") == ["Shaftoli"]
+    assert [row[5] for row in fresh_db.search_orders("nok")] == [9]
+
+
+def test_query_text_is_not_fts_syntax(fresh_db):
+    seed(fresh_db)
+    assert fresh_db.search_clients("") == []
+    assert fresh_db.search_clients("  -*() ") == []
+    assert client_names(fresh_db, 'ali" OR "olim') == []
+    assert client_names(fresh_db, "ALI") == ["Ali Valiyev"]
@@ -0,0 +1,34 @@
+import asyncio
+import copy
+
+from bot import callbacks
+from bot.handlers import selection
+
+
+class FakeCallback:
+    message = None
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+
+def test_concurrent_toggles_keep_both_rows(monkeypatch):
+    async def slow_load(token, default=None):
+        # SQLite ombori kabi har safar yangi nusxa (xotiradagi ombor bir xil obyektni qaytaradi)
+        value = copy.deepcopy(await callbacks.load(token, default))
+        await asyncio.sleep(0.01)  # ikkinchi bosish shu oraliqda keladi
+        return value
+
+    async def show_selection(message, token, value):
+        pass
+
+    monkeypatch.setattr(selection, "load", slow_load)
+    monkeypatch.setattr(selection, "show_selection", show_selection)
+
+    async def scenario():
+        token = await callbacks.stash({"kind": "o", "ids": [], "page": ["n", 0, 1]})
+        await asyncio.gather(*(selection.select_toggle_callback(FakeCallback(), token, row_id)
+                               for row_id in (1, 2, 3)))
+        return await callbacks.load(token)
+
+    assert sorted(asyncio.run(scenario())["ids"]) == [1, 2, 3]
@@ -0,0 +1,157 @@
+import asyncio
+import types
+
+import pytest
+
+from bot import sessions
+from bot.sessions import AuthCache, FlowStore, MemorySessionStore, current_flow
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sessions, "time", types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+def test_get_before_and_after_ttl(clock):
+    async def scenario():
+        store = MemorySessionStore("test", ttl=10)
+        await store.set(1, {"step": 1})
+        clock.now += 9.9
+        assert await store.get(1) == {"step": 1}
+        assert await store.contains(1)
+        clock.now += 0.1
+        assert await store.get(1) is None
+        assert await store.get(1, "default") == "default"
+        assert not await store.contains(1)
+
+    asyncio.run(scenario())
+
+
+def test_set_refreshes_ttl(clock):
+    async def scenario():
+        store = MemorySessionStore("test", ttl=10)
+        await store.set(1, "a")
+        clock.now += 8
+        await store.set(1, "b")
+        clock.now += 8
+        assert await store.get(1) == "b"
+
+    asyncio.run(scenario())
+
+
+def test_expired_entries_are_evicted(clock):
+    async def scenario():
+        store = MemorySessionStore("test", ttl=10)
+        for key in range(5):
+            await store.set(key, key)
+            clock.now += 1
+        assert len(store) == 5
+        clock.now += 6  # 0..1 kalitlar eskirdi
+        assert len(store) == 3
+        # Yozish ham ro'yxat boshidagi eskirganlarni o'chiradi
+        clock.now += 2
+        await store.set("new", 1)
+        assert list(store._data) == [4, "new"]
+
+    asyncio.run(scenario())
+
+
+def test_pop_ignores_expired(clock):
+    async def scenario():
+        store = MemorySessionStore("test", ttl=10)
+        await store.set(1, "a")
+        await store.set(2, "b")
+        assert await store.pop(1) == "a"
+        assert await store.pop(1, "gone") == "gone"
+        clock.now += 10
+        assert await store.pop(2) is None
+
+    asyncio.run(scenario())
+
+
+def test_flows_share_one_conversation(clock):
+    async def scenario():
+        conversations = MemorySessionStore("conversations", ttl=60)
+        reset = FlowStore(conversations, "reset", ttl=10)
+        registration = FlowStore(conversations, "registration", ttl=60)
+
+        await reset.set(1, {"step": "phone"})
+        assert await current_flow(conversations, 1) == "reset"
+        assert await registration.get(1) is None
+        # Yangi jarayon eskisining o'rnini egallaydi
+        await registration.set(1, {"step": "name"})
+        assert await reset.get(1) is None
+        assert await reset.pop(1) is None
+        assert await current_flow(conversations, 1) == "registration"
+
+        await reset.set(2, {})
+        clock.now += 10
+        assert await reset.get(2) is None
+        assert await current_flow(conversations, 2) is None
+
+    asyncio.run(scenario())
+
+
+def test_auth_cache_reads_store_once(clock, monkeypatch):
+    store = MemorySessionStore("auth", ttl=100)
+    reads = []
+    original_get = store.get
+
+    async def counting_get(key, default=None):
+        reads.append(key)
+        return await original_get(key, default)
+
+    monkeypatch.setattr(store, "get", counting_get)
+
+    async def scenario():
+        auth = AuthCache(store)
+        await store.set(1, clock.now + 100)  # boshqa worker'da kirgan
+        assert await auth.contains(1)
+        assert await auth.contains(1)
+        assert reads == [1]
+        # Kirish muddati tugasa, store'dan qayta o'qiladi (u yerda ham eskirgan)
+        clock.now += 100
+        assert not await auth.contains(1)
+        assert reads == [1, 1]
+
+    asyncio.run(scenario())
+
+
+def test_auth_cache_invalidated_by_version(clock, monkeypatch):
+    version = [0]
+
+    async def get_auth_version():
+        return version[0]
+
+    async def bump_auth_version():
+        version[0] += 1
+
+    monkeypatch.setattr(sessions.aio, "get_auth_version", get_auth_version)
+    monkeypatch.setattr(sessions.aio, "bump_auth_version", bump_auth_version)
+
+    async def scenario():
+        store = MemorySessionStore("auth", ttl=100)
+        worker_a, worker_b = AuthCache(store), AuthCache(store)
+        await worker_a.sync()
+        await worker_b.sync()
+
+        await worker_a.add(1)
+        assert await worker_b.contains(1)
+        await worker_a.discard(1)
+        assert not await worker_a.contains(1)
+        # worker_b keshidan sync() gacha o'chmaydi
+        assert await worker_b.contains(1)
+        await worker_b.sync()
+        assert not await worker_b.contains(1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+def rollups(conn):
+    return {
+        "daily": conn.execute("SELECT day, orders, amount FROM sales_daily ORDER BY day").fetchall(),
+        "products": conn.execute("SELECT product, orders, amount FROM sales_products ORDER BY product").fetchall(),
+        "clients": conn.execute("SELECT client_id, orders, amount FROM sales_clients ORDER BY client_id").fetchall(),
+    }
+
+
+def aggregates(conn):
+    # Xuddi shu yig'indilar orders jadvalining o'zidan
+    day = "date(COALESCE(created_at, strftime('%s', date, 'utc')), 'unixepoch', 'localtime')"
+    return {
+        "daily": conn.execute(f"SELECT {day}, COUNT(*), SUM(amount) FROM orders GROUP BY 1 ORDER BY 1").fetchall(),
+        "products": conn.execute(
+            "SELECT COALESCE(product, ''), COUNT(*), SUM(amount) FROM orders GROUP BY 1 ORDER BY 1").fetchall(),
+        "clients": conn.execute(
+            "SELECT client_id, COUNT(*), SUM(amount) FROM orders GROUP BY 1 ORDER BY 1").fetchall(),
+    }
+
+
+def assert_in_sync(db):
+    with db._db.reader() as conn:
+        assert rollups(conn) == aggregates(conn)
+
+
+def seed(db):
+    db.add_records_bulk(clients=[("Ali", "+998901111111", ""), ("Vali", "+998902222222", "")])
+    db.add_order(1, "olma", 3)
+    db.add_order(1, "nok", 2)
+    db.add_order(2, "olma", 6)
+
+
+def test_insert_updates_rollups(fresh_db):
+    seed(fresh_db)
+    assert_in_sync(fresh_db)
+
+    stats = fresh_db.get_sales_stats()
+    assert stats["total"] == (3, 11)
+    assert stats["products"] == [("olma", 2, 9), ("nok", 1, 2)]
+    assert stats["clients"] == [("Vali", 1, 6), ("Ali", 2, 5)]
+    assert [(orders, amount) for _, orders, amount in stats["daily"]] == [(3, 11)]
+
+
+def test_delete_removes_empty_rollup_rows(fresh_db):
+    seed(fresh_db)
+    fresh_db.delete_order(2)
+    assert_in_sync(fresh_db)
+    with fresh_db._db.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sales_products WHERE product = 'nok'").fetchone()[0] == 0
+
+    # Klient o'chirilsa, buyurtmalari (CASCADE) rollup'lardan ham chiqadi
+    fresh_db.delete_client(1)
+    assert_in_sync(fresh_db)
+    assert fresh_db.get_sales_stats()["total"] == (1, 6)
+    assert fresh_db.get_sales_stats()["clients"] == [("Vali", 1, 6)]
+
+
+def test_update_moves_amounts_between_rollups(fresh_db):
+    seed(fresh_db)
+    with fresh_db._db.writer() as conn:
+        conn.execute("UPDATE orders SET product = 'nok', amount = 7 WHERE id = 3")
+        conn.execute("UPDATE orders SET client_id = 2 WHERE id = 1")
+        conn.execute("UPDATE orders SET created_at = created_at - 3 * 86400, date = NULL WHERE id = 2")
+    assert_in_sync(fresh_db)
+
+    stats = fresh_db.get_sales_stats()
+    assert stats["total"] == (3, 12)
+    assert stats["products"] == [("nok", 2, 9), ("olma", 1, 3)]
+    assert len(stats["daily"]) == 2
+
+
+def test_orders_without_amount_or_product(fresh_db):
+    seed(fresh_db)
+    with fresh_db._db.writer() as conn:
+        conn.execute("INSERT INTO orders(client_id, product, amount, created_at) VALUES (2, NULL, NULL, 0)")
+    with fresh_db._db.reader() as conn:
+        assert ("", 1, 0) in rollups(conn)["products"]
+    fresh_db.delete_orders_before(1)
+    assert_in_sync(fresh_db)
+    assert fresh_db.get_sales_stats()["total"] == (3, 11)
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from bot.middlewares import throttling
+from bot.middlewares.throttling import BucketTable, MemoryLimiter, SQLiteLimiter, ThrottlingMiddleware
+
+
+def test_consume_until_empty():
+    table = BucketTable(capacity=3, rate=1)
+    bucket = table.get("u", now=0)
+
+    assert [table.consume(bucket, now=0) for _ in range(4)] == [True, True, True, False]
+
+
+def test_refill_is_capped_at_capacity():
+    table = BucketTable(capacity=2, rate=1)
+    bucket = table.get("u", now=0)
+    table.consume(bucket, now=0)
+    table.consume(bucket, now=0)
+
+    assert not table.consume(bucket, now=0.5)
+    assert table.consume(bucket, now=1.5)
+    # Uzoq kutish ham sig'imdan ko'p token bermaydi
+    assert [table.consume(bucket, now=100) for _ in range(3)] == [True, True, False]
+
+
+def test_buckets_are_per_key():
+    table = BucketTable(capacity=1, rate=1)
+    assert table.consume(table.get("a", now=0), now=0)
+    assert table.consume(table.get("b", now=0), now=0)
+    assert not table.consume(table.get("a", now=0), now=0)
+
+
+def test_max_size_evicts_least_recently_used():
+    table = BucketTable(capacity=1, rate=0.001, max_size=2)
+    first = table.get("a", now=0)
+    table.get("b", now=0)
+    assert table.get("a", now=0) is first  # "a" endi eng oxirgi ishlatilgan
+    table.get("c", now=0)
+
+    assert len(table) == 2
+    assert table.get("a", now=0) is first
+    assert len(table) == 2
+
+
+def test_idle_buckets_expire_after_refill_time():
+    table = BucketTable(capacity=2, rate=1)
+    assert table.ttl == pytest.approx(2)
+    old = table.get("a", now=0)
+    table.consume(old, now=0)
+
+    table.get("b", now=1)
+    assert len(table) == 2
+    table.get("b", now=2.5)
+    assert len(table) == 1
+    # O'chirilgan bucket o'rniga to'la yangi bucket yaratiladi — natija bir xil
+    fresh = table.get("a", now=2.5)
+    assert fresh is not old and fresh.tokens == 2
+
+
+@pytest.mark.parametrize("workers, shared, expected", [
+    (1, "sqlite", MemoryLimiter),
+    (4, "sqlite", SQLiteLimiter),
+    (4, "memory", MemoryLimiter),
+])
+def test_sqlite_limiter_only_with_several_workers(monkeypatch, workers, shared, expected):
+    monkeypatch.setattr(throttling, "WORKER_COUNT", workers)
+    monkeypatch.setattr(throttling, "SHARED_BACKEND", shared)
+    assert type(ThrottlingMiddleware().limiter) is expected
+    assert type(ThrottlingMiddleware(backend="sqlite").limiter) is SQLiteLimiter
+
+
+def test_memory_limiter_warns_once_for_own_bucket():
+    async def scenario():
+        limiter = MemoryLimiter(2, 10, None, 60, 100)
+        return [await limiter.allow(1, 1) for _ in range(4)]
+
+    assert asyncio.run(scenario()) == [(True, False), (True, False), (False, True), (False, False)]
+
+
+def test_memory_limiter_chat_and_global_limits_do_not_warn():
+    async def scenario():
+        chat = MemoryLimiter(10, 1, None, 60, 100)
+        global_ = MemoryLimiter(10, 10, 1, 60, 100)
+        return ([await chat.allow(1, 5), await chat.allow(2, 5)],
+                [await global_.allow(1, 1), await global_.allow(2, 2)])
+
+    assert asyncio.run(scenario()) == ([(True, False), (False, False)], [(True, False), (False, False)])
+
+
+def test_no_global_limit_by_default():
+    async def scenario():
+        limiter = ThrottlingMiddleware(backend="memory").limiter
+        return [await limiter.allow(user_id, user_id) for user_id in range(1000)]
+
+    assert all(allowed for allowed, _ in asyncio.run(scenario()))